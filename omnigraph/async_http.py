@@ -0,0 +1,112 @@
+"""
+Created on 2026-10-17
+
+asyncio based HTTP requests for SPARQL servers
+
+@author: wf
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+
+
+@dataclass
+class AsyncResponse:
+    """
+    the parts of an aiohttp answer that Response and its callers use - read
+    completely before the connection goes back to the pool
+    """
+
+    status_code: int
+    text: str = ""
+    headers: dict = field(default_factory=dict)
+
+    def json(self) -> Any:
+        """
+        the body parsed as JSON
+        """
+        parsed = json.loads(self.text)
+        return parsed
+
+
+class AsyncHttp:
+    """
+    asyncio request layer alongside the requests based SparqlServer.make_request -
+    the endpoint probes of the stack status share one event loop and one
+    client session instead of one thread per blocking call
+    """
+
+    @staticmethod
+    def aiohttp():
+        """
+        Import the optional aiohttp module.
+
+        Returns:
+            the aiohttp module
+        """
+        try:
+            import aiohttp
+        except ImportError as ex:
+            raise ImportError("async requests need aiohttp - pip install pyomnigraph[async]") from ex
+        return aiohttp
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Check whether the optional aiohttp module is installed.
+
+        Returns:
+            True if async requests can be made
+        """
+        try:
+            cls.aiohttp()
+            available = True
+        except ImportError:
+            available = False
+        return available
+
+    @classmethod
+    def session(cls, auth: Optional[Tuple[str, str]] = None, limit: int = 100):
+        """
+        Create a client session - to be used as async context manager.
+
+        Args:
+            auth: user and password for basic auth
+            limit: the maximum number of simultaneous connections
+
+        Returns:
+            the aiohttp.ClientSession
+        """
+        aiohttp = cls.aiohttp()
+        basic_auth = aiohttp.BasicAuth(*auth) if auth else None
+        session = aiohttp.ClientSession(auth=basic_auth, connector=aiohttp.TCPConnector(limit=limit))
+        return session
+
+    @classmethod
+    async def request(cls, session, method: str, url: str, timeout: float = None, **kwargs) -> AsyncResponse:
+        """
+        Send a request with the keyword arguments requests.request takes.
+
+        Args:
+            session: the aiohttp.ClientSession
+            method: HTTP method (GET, POST, etc.)
+            url: Request URL
+            timeout: seconds for the whole request
+            **kwargs: headers, params, data and auth as for requests
+
+        Returns:
+            the AsyncResponse
+        """
+        aiohttp = cls.aiohttp()
+        auth = kwargs.pop("auth", None)
+        if auth is not None:
+            if not isinstance(auth, tuple):
+                # e.g. the digest auth of virtuoso - aiohttp knows basic auth only
+                raise ValueError(f"{type(auth).__name__} is not supported for async requests")
+            kwargs["auth"] = aiohttp.BasicAuth(*auth)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with session.request(method, url, timeout=client_timeout, **kwargs) as response:
+            text = await response.text(errors="replace")
+            async_response = AsyncResponse(status_code=response.status, text=text, headers=dict(response.headers))
+        return async_response
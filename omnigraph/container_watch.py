@@ -0,0 +1,329 @@
+"""
+Created on 2026-10-17
+
+Follow the boot of a docker container
+
+@author: wf
+"""
+
+import re
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class LogTail:
+    """
+    The recent log lines of the current boot of a container - read
+    incrementally from a timestamp cursor into a bounded ring buffer, with
+    the readiness patterns matched once on every new line.
+
+    stdout and stderr are deduplicated by a cursor of their own - a followed
+    log delivers them on separate threads, so a line of one stream may arrive
+    after a later line of the other.
+    """
+
+    streams = ("stdout", "stderr")
+
+    timestamp_regex = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z) (.*)$", re.DOTALL)
+
+    def __init__(self, container_name: str, ready_patterns: List[str] = None, max_lines: int = 1000):
+        """
+        Initialize the tail.
+
+        Args:
+            container_name: the container to read the log of
+            ready_patterns: regular expressions that all have to show up in the
+                log of a boot for the server to be considered started
+            max_lines: the number of recent lines to keep
+        """
+        self.container_name = container_name
+        self.ready_patterns = ready_patterns or []
+        self.lines: deque = deque(maxlen=max_lines)
+        self.lock = threading.Lock()
+        self.boot: Optional[str] = None
+        # the latest timestamp of any stream - where the next read starts
+        self.cursor: Optional[str] = None
+        # the latest timestamp per stream - older lines of a stream were added before
+        self.stream_cursors: Dict[str, Optional[str]] = dict.fromkeys(self.streams)
+        self.seen: set = set()
+
+    @staticmethod
+    def normalize_timestamp(timestamp: str) -> str:
+        """
+        Normalize the given RFC3339Nano UTC timestamp to nanoseconds - docker
+        strips trailing zeros of the fraction, which breaks comparing as strings.
+
+        Args:
+            timestamp: e.g. 2026-10-17T10:00:00.1Z
+
+        Returns:
+            e.g. 2026-10-17T10:00:00.100000000Z
+        """
+        normalized = timestamp
+        if timestamp and timestamp.endswith("Z"):
+            seconds, _dot, fraction = timestamp[:-1].partition(".")
+            normalized = f"{seconds}.{fraction[:9].ljust(9, '0')}Z"
+        return normalized
+
+    def reset(self, boot: Optional[str]):
+        """
+        Start over for the given boot.
+
+        Args:
+            boot: the StartedAt of the boot - the lines before are not read
+        """
+        with self.lock:
+            self.boot = boot
+            self.cursor = self.normalize_timestamp(boot) if boot else None
+            self.stream_cursors = dict.fromkeys(self.streams, self.cursor)
+            self.lines.clear()
+            self.seen = set()
+
+    @property
+    def ready_logged(self) -> bool:
+        """
+        True if every readiness pattern showed up in the log of the current boot
+        """
+        ready_logged = bool(self.ready_patterns) and len(self.seen) == len(self.ready_patterns)
+        return ready_logged
+
+    @classmethod
+    def split_timestamp(cls, line: str) -> Tuple[Optional[str], str]:
+        """
+        Split the docker timestamp of --timestamps from the given line.
+
+        Args:
+            line: the raw line
+
+        Returns:
+            (the normalized timestamp or None, the line without it)
+        """
+        timestamp = None
+        match = cls.timestamp_regex.match(line)
+        if match:
+            timestamp = cls.normalize_timestamp(match.group(1))
+            line = match.group(2)
+        return timestamp, line
+
+    def add_line(self, stream: str, line: str) -> bool:
+        """
+        Add the given raw line - prefixed with its docker timestamp if read with --timestamps.
+
+        Args:
+            stream: stdout or stderr
+            line: the line
+
+        Returns:
+            True if the line is new - False if it is not after the cursor of its stream
+        """
+        timestamp, line = self.split_timestamp(line)
+        with self.lock:
+            stream_cursor = self.stream_cursors.get(stream)
+            is_new = timestamp is None or stream_cursor is None or timestamp > stream_cursor
+            if is_new:
+                if timestamp:
+                    self.stream_cursors[stream] = timestamp
+                    if self.cursor is None or timestamp > self.cursor:
+                        self.cursor = timestamp
+                self.lines.append((stream, line))
+                for index, pattern in enumerate(self.ready_patterns):
+                    if index not in self.seen and re.search(pattern, line):
+                        self.seen.add(index)
+        return is_new
+
+    def refresh(self, read_logs: Callable[[Optional[str]], Tuple[str, str]], boot: Optional[str]) -> int:
+        """
+        Read the lines logged since the last refresh.
+
+        Args:
+            read_logs: reads the (stdout, stderr) lines with their timestamps from the given cursor on
+            boot: the StartedAt of the current boot - a new boot starts over
+
+        Returns:
+            the number of new lines
+        """
+        if boot != self.boot:
+            self.reset(boot)
+        stdout, stderr = read_logs(self.cursor)
+        stamped: List[Tuple[str, str, str]] = []
+        for stream, text in [("stdout", stdout), ("stderr", stderr)]:
+            for line in (text or "").splitlines(keepends=True):
+                timestamp, _text = self.split_timestamp(line)
+                stamped.append((timestamp or "", stream, line))
+        new_lines = 0
+        # the streams come one after the other - the timestamps interleave them
+        for _timestamp, stream, line in sorted(stamped, key=lambda entry: entry[0]):
+            if self.add_line(stream, line):
+                new_lines += 1
+        return new_lines
+
+    @property
+    def logs(self) -> str:
+        """
+        the recent lines in the layout of SparqlServer.refresh_logs
+        """
+        with self.lock:
+            stdout = "".join(line for stream, line in self.lines if stream == "stdout")
+            stderr = "".join(line for stream, line in self.lines if stream == "stderr")
+        logs = f"stdout:{stdout}\nstderr:{stderr}"
+        return logs
+
+
+class ContainerWatch:
+    """
+    Follows the log of a container with docker logs -f and its lifecycle with
+    docker events - so that waiting for readiness reacts on what the container
+    says and does instead of polling and re-reading the whole log.
+    """
+
+    # docker events actions that end the current boot
+    end_actions = ["die", "oom", "kill", "stop"]
+
+    def __init__(self, container_name: str, since: Optional[str] = None, log_tail: LogTail = None):
+        """
+        Initialize the watch.
+
+        Args:
+            container_name: the container to follow
+            since: only log lines after this timestamp - the StartedAt of the current boot
+            log_tail: the LogTail to add the followed lines to
+        """
+        self.container_name = container_name
+        self.since = since
+        self.log_tail = log_tail or LogTail(container_name)
+        self.lock = threading.Lock()
+        # set on every new log line or event - wakes up the waiting side
+        self.changed = threading.Event()
+        # set when docker events reports the end of the current boot
+        self.died = threading.Event()
+        self.end_action: Optional[str] = None
+        # set when docker logs -f returns - it does so when the container stops
+        self.log_ended = threading.Event()
+        self.procs: List[subprocess.Popen] = []
+        self.threads: List[threading.Thread] = []
+        self.active = False
+
+    def get_logs_cmd(self) -> List[str]:
+        """
+        the command following the log of the current boot
+        """
+        since_option = ["--since", self.since] if self.since else []
+        cmd = ["docker", "logs", "-f", "--timestamps", *since_option, self.container_name]
+        return cmd
+
+    def get_events_cmd(self) -> List[str]:
+        """
+        the command reporting the lifecycle events of the container
+        """
+        cmd = ["docker", "events", "--filter", f"container={self.container_name}", "--filter", "type=container"]
+        for action in self.end_actions:
+            cmd.extend(["--filter", f"event={action}"])
+        cmd.extend(["--format", "{{.Action}}"])
+        return cmd
+
+    def follow(self, stream, on_line: Callable[[str], None], on_end: Callable[[], None] = None):
+        """
+        Read the given stream line by line until it ends.
+
+        Args:
+            stream: the pipe to read
+            on_line: called for every line
+            on_end: called when the stream ended
+        """
+        for line in iter(stream.readline, ""):
+            on_line(line)
+            self.changed.set()
+        if on_end:
+            on_end()
+        self.changed.set()
+
+    def add_thread(self, stream, on_line: Callable[[str], None], on_end: Callable[[], None] = None):
+        thread = threading.Thread(target=self.follow, args=(stream, on_line, on_end), daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def on_event(self, line: str):
+        action = line.strip().split(":")[0]
+        if action in self.end_actions:
+            self.end_action = action
+            self.died.set()
+
+    def start(self) -> bool:
+        """
+        Start following the log and the events.
+
+        Returns:
+            True if the watch is active - False if docker is not available
+        """
+        try:
+            events_proc = subprocess.Popen(
+                self.get_events_cmd(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            self.procs.append(events_proc)
+            logs_proc = subprocess.Popen(
+                self.get_logs_cmd(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="replace"
+            )
+            self.procs.append(logs_proc)
+        except OSError:
+            self.close()
+            return False
+        self.add_thread(events_proc.stdout, self.on_event)
+        ended_streams = []
+
+        def on_log_end():
+            with self.lock:
+                ended_streams.append(True)
+                if len(ended_streams) == 2:
+                    self.log_ended.set()
+
+        self.add_thread(logs_proc.stdout, lambda line: self.log_tail.add_line("stdout", line), on_log_end)
+        self.add_thread(logs_proc.stderr, lambda line: self.log_tail.add_line("stderr", line), on_log_end)
+        self.active = True
+        return self.active
+
+    @property
+    def logs(self) -> str:
+        """
+        the recent log lines followed - in the layout of SparqlServer.refresh_logs
+        """
+        logs = self.log_tail.logs
+        return logs
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for a new log line or event.
+
+        Args:
+            timeout: the maximum seconds to wait
+
+        Returns:
+            True if something happened - False on timeout
+        """
+        happened = self.changed.wait(max(0.0, timeout))
+        self.changed.clear()
+        return happened
+
+    def close(self):
+        """
+        Stop following.
+        """
+        for proc in self.procs:
+            if proc.poll() is None:
+                proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        self.procs = []
+        self.threads = []
+        self.active = False
+
+    def __enter__(self) -> "ContainerWatch":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
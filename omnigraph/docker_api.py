@@ -0,0 +1,336 @@
+"""
+Created on 2026-10-17
+
+Talk to the Docker Engine API over its unix socket
+
+@author: wf
+"""
+
+import calendar
+import http.client
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from basemkit.docker_util import DockerUtil
+from basemkit.shell import ShellResult
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    a HTTP connection over a unix domain socket
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DockerApi:
+    """
+    A minimal Docker Engine API client with one persistent keep-alive
+    connection per thread - shared by all servers using the same socket.
+    """
+
+    default_socket = "/var/run/docker.sock"
+    instances: Dict[str, "DockerApi"] = {}
+    instances_lock = threading.Lock()
+
+    def __init__(self, socket_path: str = None, timeout: float = 30):
+        """
+        Initialize the client.
+
+        Args:
+            socket_path: the path of the docker socket - from DOCKER_HOST or the default if None
+            timeout: seconds a request may take
+        """
+        if socket_path is None:
+            docker_host = os.environ.get("DOCKER_HOST", "")
+            socket_path = docker_host[len("unix://") :] if docker_host.startswith("unix://") else self.default_socket
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.available: Optional[bool] = None
+
+    @classmethod
+    def get_instance(cls, socket_path: str = None) -> "DockerApi":
+        """
+        Get the shared client for the given socket.
+
+        Args:
+            socket_path: the path of the docker socket
+
+        Returns:
+            the DockerApi
+        """
+        with cls.instances_lock:
+            key = socket_path or ""
+            if key not in cls.instances:
+                cls.instances[key] = cls(socket_path)
+            api = cls.instances[key]
+        return api
+
+    def get_connection(self) -> UnixHTTPConnection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+            self.local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def request(self, method: str, path: str, params: Dict[str, Any] = None) -> Tuple[int, bytes]:
+        """
+        Send a request over my persistent connection - reconnecting once if the
+        daemon closed the idle connection.
+
+        Args:
+            method: the HTTP method
+            path: the API path e.g. /containers/json
+            params: the query parameters
+
+        Returns:
+            (HTTP status, body)
+
+        Raises:
+            OSError or http.client.HTTPException if the daemon is not reachable
+        """
+        url = f"{path}?{urlencode(params)}" if params else path
+        for attempt in range(2):
+            connection = self.get_connection()
+            try:
+                connection.request(method, url)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                self.close()
+                if attempt == 1:
+                    raise
+        return response.status, body
+
+    def is_available(self) -> bool:
+        """
+        Check once whether the daemon answers on my socket.
+
+        Returns:
+            True if GET /_ping succeeds
+        """
+        if self.available is None:
+            available = False
+            if os.path.exists(self.socket_path):
+                try:
+                    status, _body = self.request("GET", "/_ping")
+                    available = status == 200
+                except (OSError, http.client.HTTPException):
+                    available = False
+            self.available = available
+        return self.available
+
+    @staticmethod
+    def container_path(container_name: str, action: str = "") -> str:
+        path = f"/containers/{quote(container_name, safe='')}"
+        if action:
+            path += f"/{action}"
+        return path
+
+    def inspect(self, container_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Inspect the given container.
+
+        Args:
+            container_name: the name of the container
+
+        Returns:
+            the container JSON - None if there is no such container
+        """
+        container = None
+        status, body = self.request("GET", self.container_path(container_name, "json"))
+        if status == 200:
+            container = json.loads(body)
+        return container
+
+    def containers(self, all_containers: bool = True) -> List[Dict[str, Any]]:
+        """
+        List the containers as docker ps does.
+
+        Args:
+            all_containers: include the stopped containers
+
+        Returns:
+            the container summaries
+        """
+        status, body = self.request("GET", "/containers/json", {"all": "1" if all_containers else "0"})
+        containers = json.loads(body) if status == 200 else []
+        return containers
+
+    @staticmethod
+    def to_unix_timestamp(timestamp: str) -> str:
+        """
+        Convert the given RFC3339Nano UTC timestamp to the seconds.nanoseconds of the API.
+
+        Args:
+            timestamp: e.g. 2026-10-17T10:00:00.5Z
+
+        Returns:
+            e.g. 1792231200.500000000
+        """
+        seconds, _dot, fraction = timestamp.rstrip("Z").partition(".")
+        epoch = calendar.timegm(time.strptime(seconds, "%Y-%m-%dT%H:%M:%S"))
+        unix_timestamp = f"{epoch}.{fraction[:9].ljust(9, '0')}"
+        return unix_timestamp
+
+    @staticmethod
+    def demux(body: bytes) -> Tuple[str, str]:
+        """
+        Split the multiplexed log stream of a container without tty into stdout and stderr.
+
+        Args:
+            body: the raw stream - 8 byte frame headers of stream type and size
+
+        Returns:
+            (stdout, stderr)
+        """
+        streams = {1: bytearray(), 2: bytearray()}
+        if body[:1] in (b"\x00", b"\x01", b"\x02") and body[1:4] == b"\x00\x00\x00":
+            offset = 0
+            while offset + 8 <= len(body):
+                stream = body[offset]
+                size = int.from_bytes(body[offset + 4 : offset + 8], "big")
+                streams.get(stream, streams[1]).extend(body[offset + 8 : offset + 8 + size])
+                offset += 8 + size
+        else:
+            # a tty container sends its output as is
+            streams[1].extend(body)
+        output = (streams[1].decode(errors="replace"), streams[2].decode(errors="replace"))
+        return output
+
+    def logs(self, container_name: str, since: str = None, timestamps: bool = False) -> Tuple[str, str]:
+        """
+        Get the log of the given container.
+
+        Args:
+            container_name: the name of the container
+            since: only lines from this RFC3339 timestamp on
+            timestamps: prefix every line with its timestamp
+
+        Returns:
+            (stdout, stderr)
+        """
+        params = {"stdout": "1", "stderr": "1", "timestamps": "1" if timestamps else "0"}
+        if since:
+            params["since"] = self.to_unix_timestamp(since)
+        status, body = self.request("GET", self.container_path(container_name, "logs"), params)
+        if status != 200:
+            raise http.client.HTTPException(f"logs of {container_name}: HTTP {status} {body[:200]!r}")
+        output = self.demux(body)
+        return output
+
+
+class DockerApiUtil(DockerUtil):
+    """
+    DockerUtil for the Docker Engine API - the commands without an API
+    counterpart here and every call failing to reach the daemon run the CLI.
+    """
+
+    # docker commands that map to a container API call: method, action, statuses that mean success
+    api_cmds = {
+        "start": ("POST", "start", (204, 304)),
+        "stop": ("POST", "stop", (204, 304)),
+        "restart": ("POST", "restart", (204,)),
+        "kill": ("POST", "kill", (204,)),
+        "rm": ("DELETE", "", (204,)),
+    }
+
+    def __init__(self, api: DockerApi, **kwargs):
+        """
+        Initialize the util.
+
+        Args:
+            api: the DockerApi to use
+            **kwargs: the arguments of DockerUtil
+        """
+        super().__init__(**kwargs)
+        self.api = api
+
+    def inspect(self) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve full .State of the Docker container.
+
+        Returns:
+            dict: the State or None if there is no such container
+        """
+        try:
+            container = self.api.inspect(self.container_name)
+            state = container.get("State") if container else None
+        except (OSError, http.client.HTTPException):
+            state = super().inspect()
+        return state
+
+    def read_logs(self, since: str = None) -> Tuple[str, str]:
+        """
+        Read the log lines from the given timestamp on, each prefixed with its timestamp.
+
+        Args:
+            since: the RFC3339 timestamp
+
+        Returns:
+            (stdout, stderr)
+        """
+        output = self.api.logs(self.container_name, since=since, timestamps=True)
+        return output
+
+    def api_result(self, cmd: str, ok: bool, stdout: str = "", stderr: str = "") -> ShellResult:
+        """
+        Wrap the outcome of an API call as ShellResult - logged as run_docker_cmd does.
+        """
+        container_name = self.container_name
+        proc = subprocess.CompletedProcess(args=f"docker {cmd} {container_name}", returncode=0 if ok else 1)
+        proc.stdout = stdout
+        proc.stderr = stderr
+        if ok:
+            if cmd != "logs":
+                self.log.log("✅", container_name, f"{cmd} container {container_name}")
+        else:
+            self.log.log("❌", container_name, f"Failed to {cmd} container {container_name} - {stderr}")
+        shell_result = ShellResult(proc, ok)
+        return shell_result
+
+    def run_docker_cmd(self, cmd: str, options: str = "", args: str = "") -> ShellResult:
+        """
+        run the given docker command - over the API if it has a plain counterpart
+        """
+        shell_result = None
+        if not options and not args and (cmd in self.api_cmds or cmd in ("logs", "info")):
+            try:
+                if cmd == "logs":
+                    stdout, stderr = self.api.logs(self.container_name)
+                    shell_result = self.api_result(cmd, True, stdout, stderr)
+                elif cmd == "info":
+                    status, body = self.api.request("GET", "/info")
+                    shell_result = self.api_result(cmd, status == 200, body.decode(errors="replace"))
+                else:
+                    method, action, ok_statuses = self.api_cmds[cmd]
+                    status, body = self.api.request(method, self.api.container_path(self.container_name, action))
+                    ok = status in ok_statuses
+                    shell_result = self.api_result(cmd, ok, stderr="" if ok else body.decode(errors="replace"))
+            except (OSError, http.client.HTTPException):
+                shell_result = None
+        if shell_result is None:
+            shell_result = super().run_docker_cmd(cmd, options, args)
+        return shell_result
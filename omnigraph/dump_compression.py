@@ -0,0 +1,151 @@
+"""
+Created on 2026-10-17
+
+Compressed RDF dump files - gzip and zstd
+
+@author: wf
+"""
+
+import gzip
+import shutil
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+
+class DumpCompression(Enum):
+    """
+    the compressions a dump file may come in - recognized by the file suffix
+    """
+
+    NONE = ""
+    GZ = "gz"
+    ZST = "zst"
+
+    @property
+    def suffix(self) -> str:
+        """
+        the file name suffix of this compression e.g. .gz - empty for NONE
+        """
+        suffix = f".{self.value}" if self.value else ""
+        return suffix
+
+    @property
+    def content_encoding(self) -> Optional[str]:
+        """
+        the HTTP Content-Encoding a compressed upload is sent with
+        """
+        encodings = {DumpCompression.GZ: "gzip", DumpCompression.ZST: "zstd"}
+        content_encoding = encodings.get(self)
+        return content_encoding
+
+    @classmethod
+    def by_label(cls, label: Optional[str]) -> "DumpCompression":
+        """
+        Get the compression for the given label.
+
+        Args:
+            label: gz, zst or None/"none" for uncompressed
+
+        Returns:
+            the DumpCompression
+        """
+        if not label or label == "none":
+            compression = cls.NONE
+        else:
+            compression = cls(label)
+        return compression
+
+    @classmethod
+    def of_path(cls, path: Path) -> "DumpCompression":
+        """
+        Get the compression of the given dump file from its suffix.
+
+        Args:
+            path: the dump file
+
+        Returns:
+            the DumpCompression - NONE for an unknown suffix
+        """
+        compression = cls.NONE
+        for candidate in (cls.GZ, cls.ZST):
+            if Path(path).name.endswith(candidate.suffix):
+                compression = candidate
+        return compression
+
+    def strip_suffix(self, name: str) -> str:
+        """
+        Get the given file name without my suffix.
+
+        Args:
+            name: the file name
+
+        Returns:
+            the name of the uncompressed file
+        """
+        if self.suffix and name.endswith(self.suffix):
+            name = name[: -len(self.suffix)]
+        return name
+
+    @staticmethod
+    def zstandard():
+        """
+        Import the optional zstandard module.
+
+        Returns:
+            the zstandard module
+        """
+        try:
+            import zstandard
+        except ImportError as ex:
+            raise ImportError("zstd compressed dumps need zstandard - pip install pyomnigraph[compress]") from ex
+        return zstandard
+
+    def open_read(self, path: Path) -> BinaryIO:
+        """
+        Open the given dump file for reading its uncompressed content.
+
+        Args:
+            path: the dump file
+
+        Returns:
+            a binary file object yielding the uncompressed bytes
+        """
+        if self == DumpCompression.GZ:
+            stream = gzip.open(path, "rb")
+        elif self == DumpCompression.ZST:
+            stream = self.zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        else:
+            stream = open(path, "rb")
+        return stream
+
+    def open_write(self, path: Path) -> BinaryIO:
+        """
+        Open the given dump file for writing compressed content.
+
+        Args:
+            path: the dump file
+
+        Returns:
+            a binary file object compressing what is written to it
+        """
+        if self == DumpCompression.GZ:
+            stream = gzip.open(path, "wb")
+        elif self == DumpCompression.ZST:
+            stream = self.zstandard().ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+        else:
+            stream = open(path, "wb")
+        return stream
+
+    def decompress(self, path: Path, target: Path):
+        """
+        Decompress the given dump file to the target path.
+
+        Args:
+            path: the compressed dump file
+            target: the path of the uncompressed file
+        """
+        part_path = target.with_name(f"{target.name}.part")
+        with self.open_read(path) as source, open(part_path, "wb") as sink:
+            shutil.copyfileobj(source, sink, 1024 * 1024)
+        part_path.replace(target)
@@ -0,0 +1,194 @@
+"""
+Created on 2026-10-17
+
+Manifest of the chunks of an RDF dump
+
+@author: wf
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from basemkit.yamlable import lod_storable
+from tabulate import tabulate
+
+
+@dataclass
+class ChunkRecord:
+    """
+    what is known about a single downloaded chunk
+    """
+
+    file_name: str
+    offset: int
+    limit: int
+    byte_size: int  # size of the file on disk
+    sha256: str  # of the file on disk
+    # an estimate for reporting - not a completeness check, see RdfDumpDownloader.estimate_triples
+    approx_triple_count: Optional[int]
+    latency: float  # seconds from request to the complete file
+    endpoint: str
+    after: Optional[str] = None  # keyset page bounds (after, until]
+    until: Optional[str] = None
+    fetched_at: Optional[str] = None
+
+
+@lod_storable
+class DumpManifest:
+    """
+    The manifest.json next to the chunks of a dump - resume, verify and
+    reporting work from it instead of re-reading and re-parsing every file.
+    """
+
+    dataset: Optional[str] = None
+    endpoint: Optional[str] = None
+    chunks: Dict[str, ChunkRecord] = field(default_factory=dict)
+    # the (after, until] ranges of a keyset dump - a resume does not walk the keys again
+    key_ranges: List[List[Optional[str]]] = field(default_factory=list)
+
+    # records between two saves - a killed process refetches at most these
+    save_every = 10
+
+    def __post_init__(self):
+        self.path = None
+        self.lock = threading.Lock()
+        self.unsaved = 0
+
+    @staticmethod
+    def manifest_path(output_dir: Path) -> Path:
+        """
+        the path of the manifest of the given dump directory
+        """
+        path = Path(output_dir) / "manifest.json"
+        return path
+
+    @classmethod
+    def of_dir(cls, output_dir: Path) -> "DumpManifest":
+        """
+        Load the manifest of the given dump directory - an empty one if there is none yet.
+
+        Args:
+            output_dir: the directory of the dump files
+
+        Returns:
+            the DumpManifest
+        """
+        path = cls.manifest_path(output_dir)
+        if path.exists():
+            manifest = cls.load_from_json_file(path)
+        else:
+            manifest = cls()
+        manifest.path = path
+        return manifest
+
+    @staticmethod
+    def file_sha256(path: Path) -> str:
+        """
+        Compute the sha256 of the given file block by block.
+
+        Args:
+            path: the file
+
+        Returns:
+            the hex digest
+        """
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(block)
+        hexdigest = sha256.hexdigest()
+        return hexdigest
+
+    def save(self):
+        """
+        Save me atomically next to the chunks.
+        """
+        with self.lock:
+            part_path = self.path.with_name(f"{self.path.name}.part")
+            self.save_to_json_file(str(part_path), indent=2)
+            part_path.replace(self.path)
+            self.unsaved = 0
+
+    def add(self, record: ChunkRecord):
+        """
+        Add the record of a written chunk - thread safe, saved every save_every records.
+
+        Args:
+            record: the chunk record
+        """
+        if record.fetched_at is None:
+            record.fetched_at = datetime.now().isoformat()
+        with self.lock:
+            self.chunks[record.file_name] = record
+            self.unsaved += 1
+            save_now = self.unsaved >= self.save_every
+        if save_now:
+            self.save()
+
+    def is_complete(self, path: Path) -> bool:
+        """
+        Check whether the given chunk file was completely written.
+
+        A file without a record or with a different size is not trusted.
+
+        Args:
+            path: the chunk file
+
+        Returns:
+            True if the chunk needs no refetch
+        """
+        record = self.chunks.get(path.name)
+        complete = record is not None and path.exists() and path.stat().st_size == record.byte_size
+        return complete
+
+    def verify(self, output_dir: Path) -> Dict[str, str]:
+        """
+        Check every recorded chunk against its file.
+
+        Args:
+            output_dir: the directory of the dump files
+
+        Returns:
+            file name to problem for every chunk that does not match its record
+        """
+        problems = {}
+        for file_name, record in sorted(self.chunks.items()):
+            path = Path(output_dir) / file_name
+            if not path.exists():
+                problems[file_name] = "missing"
+            elif path.stat().st_size != record.byte_size:
+                problems[file_name] = f"size {path.stat().st_size} != {record.byte_size}"
+            elif self.file_sha256(path) != record.sha256:
+                problems[file_name] = "sha256 mismatch"
+        return problems
+
+    def summary(self, table_format: str = "simple") -> str:
+        """
+        Get a summary table of the dump.
+
+        Args:
+            table_format: the tabulate format
+
+        Returns:
+            the table markup
+        """
+        records = list(self.chunks.values())
+        total_bytes = sum(record.byte_size for record in records)
+        total_triples = sum(record.approx_triple_count or 0 for record in records)
+        total_latency = sum(record.latency for record in records)
+        rows = [
+            ["chunks", len(records)],
+            ["triples (approx)", total_triples],
+            ["bytes", total_bytes],
+            ["fetch time (s)", f"{total_latency:.1f}"],
+            ["triples/s", f"{total_triples / total_latency:.0f}" if total_latency else "-"],
+        ]
+        if records:
+            slowest = max(records, key=lambda record: record.latency)
+            rows.append(["slowest chunk", f"{slowest.file_name} {slowest.latency:.1f} s"])
+        markup = tabulate(rows, headers=["dump", f"{self.dataset}@{self.endpoint}"], tablefmt=table_format)
+        return markup
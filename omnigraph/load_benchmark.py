@@ -0,0 +1,362 @@
+"""
+Created on 2026-10-17
+
+Benchmark the load paths of the servers on synthetic datasets
+
+@author: wf
+"""
+
+import csv
+import os
+import re
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from basemkit.yamlable import lod_storable
+from tabulate import tabulate
+
+from omnigraph.rdfgen import RdfGenerator
+from omnigraph.server_config import LoadPath
+from omnigraph.sparql_server import SparqlServer
+
+
+@dataclass
+class LoadRecord:
+    """
+    the measurement of loading a synthetic dataset over one load path of a server
+    """
+
+    server: str
+    load_path: str
+    size: int  # triples generated
+    files: int
+    loaded: int = 0  # files the load path reported as loaded
+    triples: int = 0  # counted after the load
+    secs: float = 0.0
+    triples_per_sec: float = 0.0
+    # cgroup memory of the server and the loader containers while loading - page cache included
+    peak_mem_mb: Optional[float] = None
+    data_dir_mb: float = 0.0  # after the load - without the staged dumps
+    error: Optional[str] = None
+
+
+@lod_storable
+class LoadBenchmarkResult:
+    """
+    the records of a load benchmark run
+    """
+
+    records: List[LoadRecord] = field(default_factory=list)
+
+    def save(self, output_dir: Path) -> List[Path]:
+        """
+        Save me as load_benchmark.json and load_benchmark.csv.
+
+        Args:
+            output_dir: the directory to save to
+
+        Returns:
+            the paths written
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        json_path = output_dir / "load_benchmark.json"
+        self.save_to_json_file(str(json_path), indent=2)
+        csv_path = output_dir / "load_benchmark.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(LoadRecord.__dataclass_fields__))
+            writer.writeheader()
+            for record in self.records:
+                writer.writerow(asdict(record))
+        paths = [json_path, csv_path]
+        return paths
+
+    def as_table(self, table_format: str = "simple") -> str:
+        """
+        Get the records as table.
+
+        Args:
+            table_format: the tabulate format
+
+        Returns:
+            the table markup
+        """
+        rows = []
+        for record in self.records:
+            rows.append(
+                [
+                    record.server,
+                    record.load_path,
+                    record.size,
+                    record.triples,
+                    f"{record.secs:.1f}",
+                    f"{record.triples_per_sec:,.0f}",
+                    f"{record.peak_mem_mb:.0f}" if record.peak_mem_mb is not None else "-",
+                    f"{record.data_dir_mb:.1f}",
+                    record.error or "",
+                ]
+            )
+        headers = ["server", "path", "size", "triples", "secs", "triples/s", "peak mem MB", "data MB", "error"]
+        markup = tabulate(rows, headers=headers, tablefmt=table_format)
+        return markup
+
+
+class ContainerMemorySampler:
+    """
+    Samples the memory usage of a container with docker stats in the background
+    and keeps the peak - together with the containers started while sampling,
+    which are the loader containers of the bulkload and build paths.
+    """
+
+    units = {"b": 1, "kib": 1024, "mib": 1024**2, "gib": 1024**3, "kb": 1e3, "mb": 1e6, "gb": 1e9}
+
+    def __init__(self, container_name: str, interval: float = 1.0):
+        """
+        Initialize the sampler.
+
+        Args:
+            container_name: the container to watch
+            interval: seconds between samples
+        """
+        self.container_name = container_name
+        self.interval = interval
+        self.peak_mb = None
+        # the containers that ran before - not part of the load
+        self.others = set()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def parse_mem_usage(cls, mem_usage: str) -> Optional[float]:
+        """
+        Parse the MemUsage column of docker stats e.g. 123.4MiB / 7.6GiB.
+
+        Args:
+            mem_usage: the column text
+
+        Returns:
+            the used memory in MB or None if not parseable
+        """
+        mb = None
+        match = re.match(r"\s*([\d.]+)\s*([a-zA-Z]+)", mem_usage)
+        if match and match.group(2).lower() in cls.units:
+            mb = float(match.group(1)) * cls.units[match.group(2).lower()] / 1024**2
+        return mb
+
+    @classmethod
+    def parse_stats(cls, stats: str) -> Dict[str, float]:
+        """
+        Parse the lines of docker stats with the container name and the MemUsage column separated by a tab.
+
+        Args:
+            stats: the docker stats output
+
+        Returns:
+            the used memory in MB by container name
+        """
+        usage = {}
+        for line in stats.splitlines():
+            name, _tab, mem_usage = line.partition("\t")
+            mb = cls.parse_mem_usage(mem_usage)
+            if mb is not None:
+                usage[name.strip()] = mb
+        return usage
+
+    def read_stats(self) -> Dict[str, float]:
+        """
+        Read the memory usage of all running containers with one docker stats.
+
+        Returns:
+            the used memory in MB by container name - empty if docker stats failed
+        """
+        cmd = ["docker", "stats", "--no-stream", "--format", "{{.Name}}\t{{.MemUsage}}"]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            usage = self.parse_stats(result.stdout) if result.returncode == 0 else {}
+        except (OSError, subprocess.SubprocessError):
+            usage = {}
+        return usage
+
+    def add_sample(self, usage: Dict[str, float]):
+        """
+        Keep the peak of the memory used by my container and the containers started since I was entered.
+
+        Args:
+            usage: the used memory in MB by container name
+        """
+        watched = [mb for name, mb in usage.items() if name == self.container_name or name not in self.others]
+        if watched:
+            mb = sum(watched)
+            if self.peak_mb is None or mb > self.peak_mb:
+                self.peak_mb = mb
+
+    def sample(self):
+        while not self.stop_event.wait(self.interval):
+            self.add_sample(self.read_stats())
+
+    def __enter__(self) -> "ContainerMemorySampler":
+        usage = self.read_stats()
+        self.others = set(usage) - {self.container_name}
+        self.add_sample(usage)
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        self.thread.join()
+
+
+class LoadBenchmark:
+    """
+    Runs every supported load path of every server on synthetic datasets of
+    growing size - to choose the load path per store from data.
+    """
+
+    default_sizes = [10_000, 100_000, 1_000_000, 10_000_000]
+
+    def __init__(self, servers: Dict[str, SparqlServer], work_dir: Path, sizes: List[int] = None, seed: int = 42):
+        """
+        Initialize the benchmark.
+
+        Args:
+            servers: the servers to benchmark - started by the caller
+            work_dir: the directory for the datasets and results
+            sizes: the dataset sizes in triples
+            seed: the seed of the synthetic datasets
+        """
+        self.servers = servers
+        self.work_dir = Path(work_dir)
+        self.sizes = sizes or self.default_sizes
+        self.seed = seed
+        self.result = LoadBenchmarkResult()
+        # the servers holding data of an earlier measurement
+        self.loaded = set()
+
+    def dataset_dir(self, size: int) -> Path:
+        """
+        Get the directory of the synthetic dataset of the given size - generated on first use.
+
+        Args:
+            size: the number of triples
+
+        Returns:
+            the dumps directory
+        """
+        dumps_dir = self.work_dir / "datasets" / f"gen_{size}_{self.seed}"
+        marker = dumps_dir / ".complete"
+        if not marker.exists():
+            RdfGenerator(size, seed=self.seed).generate(dumps_dir)
+            marker.touch()
+        return dumps_dir
+
+    @staticmethod
+    def dir_size(path: Path, exclude: Path = None) -> int:
+        """
+        Get the bytes used by the files below the given directory - every inode counted once.
+
+        Args:
+            path: the directory
+            exclude: a directory whose files are not counted where they are linked to
+
+        Returns:
+            the number of bytes
+        """
+        excluded = set()
+        if exclude and Path(exclude).exists():
+            excluded = {(stat.st_dev, stat.st_ino) for stat in (p.stat() for p in Path(exclude).iterdir())}
+        seen = set()
+        total = 0
+        for root, _dirs, files in os.walk(path):
+            for name in files:
+                try:
+                    stat = os.lstat(os.path.join(root, name))
+                except OSError:
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                if key not in seen and key not in excluded:
+                    seen.add(key)
+                    total += stat.st_size
+        return total
+
+    def load(self, server: SparqlServer, load_path: LoadPath, record: LoadRecord):
+        """
+        Load the configured dumps over the given path, timed and with the container memory sampled.
+
+        Args:
+            server: the emptied server
+            load_path: the load path
+            record: the LoadRecord to fill in
+        """
+        with ContainerMemorySampler(server.config.container_name) as sampler:
+            start_time = time.time()
+            record.loaded = server.load_dump_files(path=load_path)
+            record.secs = time.time() - start_time
+        record.peak_mem_mb = sampler.peak_mb
+        record.triples = server.count_triples()
+        if record.secs > 0 and record.triples > 0:
+            record.triples_per_sec = record.triples / record.secs
+        if record.loaded < record.files:
+            record.error = f"{record.loaded}/{record.files} files loaded"
+
+    def measure(self, server: SparqlServer, load_path: LoadPath, size: int) -> LoadRecord:
+        """
+        Load the dataset of the given size over the given path into the emptied server.
+
+        Args:
+            server: the server
+            load_path: the load path
+            size: the dataset size
+
+        Returns:
+            the LoadRecord
+        """
+        dumps_dir = self.dataset_dir(size)
+        record = LoadRecord(
+            server=server.name, load_path=load_path.value, size=size, files=len(list(dumps_dir.glob("dump_*")))
+        )
+        configured_dumps_dir = server.config.dumps_dir
+        force = server.env.force
+        try:
+            server.config.dumps_dir = str(dumps_dir)
+            # what an earlier measurement loaded is cleared without --force - data of
+            # the server from before the benchmark stays protected
+            server.env.force = force or server.name in self.loaded
+            try:
+                remaining = server.clear()
+            finally:
+                server.env.force = force
+            if remaining:
+                record.error = f"{remaining} triples left after clear - use --force"
+            else:
+                self.loaded.add(server.name)
+                self.load(server, load_path, record)
+                if server.config.base_data_dir:
+                    record.data_dir_mb = self.dir_size(server.config.base_data_dir, exclude=dumps_dir) / 1024**2
+        except Exception as ex:
+            record.error = str(ex)
+        finally:
+            server.config.dumps_dir = configured_dumps_dir
+        return record
+
+    def run(self) -> LoadBenchmarkResult:
+        """
+        Run the benchmark - the servers one after the other, smallest dataset first.
+
+        Returns:
+            the LoadBenchmarkResult
+        """
+        for server in self.servers.values():
+            for size in self.sizes:
+                for load_path in server.load_paths:
+                    record = self.measure(server, load_path, size)
+                    self.result.records.append(record)
+                    status = "❌" if record.error else "✅"
+                    rate = f"{record.secs:.1f} s {record.triples_per_sec:,.0f} triples/s"
+                    msg = f"{load_path.value} of {size:,} triples: {rate}"
+                    server.log.log(status, server.config.container_name, f"{msg} {record.error or ''}".strip())
+        return self.result
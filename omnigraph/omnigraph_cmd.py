@@ -4,18 +4,79 @@ Created on 2025-05-28
 @author: wf
 """
 
+import sys
+import threading
+import time
 from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List
 
+from basemkit.argparse_action import StoreDictKeyPair
+from basemkit.shell import ShellResult
 from lodstorage.prefix_config import PrefixConfigs
+from tabulate import tabulate
 
 from omnigraph.basecmd import BaseCmd
 from omnigraph.compose import ComposeGenerator
+from omnigraph.load_benchmark import LoadBenchmark
 from omnigraph.ominigraph_paths import OmnigraphPaths
 from omnigraph.omniserver import OmniServer
+from omnigraph.query_benchmark import QueryBenchmark
 from omnigraph.rdf_dataset import RdfDataset
 from omnigraph.sparql_server import ServerEnv, SparqlServer
+from omnigraph.stack_status import StackStatus
+
+
+class PrefixedStdout:
+    """
+    stdout for concurrent server commands - every complete line a thread
+    writes is prefixed with the server that thread works for
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def set_prefix(self, prefix: str):
+        """
+        Prefix the lines of the current thread - None for none.
+        """
+        self.finish()
+        self.local.prefix = prefix
+        self.local.pending = ""
+
+    def finish(self):
+        """
+        Write the unterminated rest of the current thread's output.
+        """
+        pending = getattr(self.local, "pending", "")
+        if pending:
+            self.local.pending = ""
+            self.write_line(pending + "\n")
+
+    def write_line(self, line: str):
+        with self.lock:
+            self.stream.write(f"{self.local.prefix} {line}")
+
+    def write(self, text: str) -> int:
+        prefix = getattr(self.local, "prefix", None)
+        if prefix is None:
+            with self.lock:
+                self.stream.write(text)
+        else:
+            self.local.pending += text
+            *lines, self.local.pending = self.local.pending.split("\n")
+            for line in lines:
+                self.write_line(line + "\n")
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
 
 
 class OmnigraphCmd(BaseCmd):
@@ -54,10 +115,71 @@ class OmnigraphCmd(BaseCmd):
             default=str(self.default_yaml_path),
             help="Path to server configuration YAML file [default: %(default)s]",
         )
+        parser.add_argument(
+            "--benchmark-load",
+            action="store_true",
+            help="time every load path of the servers on synthetic datasets - after the commands [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--benchmark-sizes",
+            type=int,
+            nargs="+",
+            default=LoadBenchmark.default_sizes,
+            help="triples of the synthetic benchmark datasets [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--benchmark-dir",
+            default=str(self.ogp.omnigraph_dir / "benchmark"),
+            help="directory for the benchmark datasets and results [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--benchmark-queries",
+            action="store_true",
+            help="time the named queries on the servers - after the commands [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--queries",
+            default=str(self.ogp.examples_dir / "queries.yaml"),
+            help="named queries to benchmark [default: %(default)s]",
+        )
+        parser.add_argument("--query-names", nargs="+", help="names of the queries to benchmark - all if not given")
+        parser.add_argument(
+            "--query-param",
+            action=StoreDictKeyPair,
+            dest="query_params",
+            metavar="KEY=VALUE,KEY=VALUE...",
+            help="parameter values overriding the defaults of the queries",
+        )
+        parser.add_argument("--runs", type=int, default=5, help="measured runs per query [default: %(default)s]")
+        parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs per query [default: %(default)s]")
+        parser.add_argument(
+            "--query-timeout", type=float, default=30.0, help="seconds a query may take [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--query-timeouts",
+            action=StoreDictKeyPair,
+            metavar="NAME=SECONDS,NAME=SECONDS...",
+            help="seconds per query name overriding --query-timeout",
+        )
+        parser.add_argument(
+            "--clients", type=int, default=1, help="concurrent clients per query [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--count-triples",
+            action="store_true",
+            help="count triples for the status of several servers and before and after a liveload"
+            " - expensive on big stores [default: %(default)s]",
+        )
         parser.add_argument("--cmd", nargs="+", help=f"commands to execute on servers: {self.available_cmds}")
         parser.add_argument(
             "-df", "--doc-format", default="plain", help="The document format to use [default: %(default)s]"
         )
+        parser.add_argument(
+            "--docker-backend",
+            choices=["cli", "api"],
+            default="cli",
+            help="run the docker command or talk to the Docker Engine API over its unix socket [default: %(default)s]",
+        )
         parser.add_argument(
             "-gepy",
             "--endpoints-yaml",
@@ -69,9 +191,23 @@ class OmnigraphCmd(BaseCmd):
             action="store_true",
             help="Include inactive servers in available server list[default: %(default)s]",
         )
+        parser.add_argument(
+            "--load-workers",
+            type=int,
+            default=1,
+            help="number of files to liveload concurrently on servers declaring concurrent_writes"
+            " - a file split into several requests by the liveload_batch_size of its server gets its"
+            " blank nodes replaced by urn:omnigraph:genid: IRIs [default: %(default)s]",
+        )
         parser.add_argument(
             "-l", "--list-servers", action="store_true", help="List available servers [default: %(default)s]"
         )
+        parser.add_argument(
+            "--parallel",
+            type=int,
+            default=1,
+            help="number of servers to run the commands on concurrently [default: %(default)s]",
+        )
         parser.add_argument(
             "--compose",
             action="store_true",
@@ -145,6 +281,20 @@ class OmnigraphCmd(BaseCmd):
         else:
             server.config.dumps_dir = self.ogp.dumps_dir / dataset.id
 
+    @staticmethod
+    def is_failure(result) -> bool:
+        """
+        Check whether the given result of a server command reports a failure.
+
+        Args:
+            result: what the command returned
+
+        Returns:
+            True for False and for a failed ShellResult
+        """
+        failure = result is False or (isinstance(result, ShellResult) and not result.success)
+        return failure
+
     def run_single_cmd(self, server: SparqlServer, cmd: str) -> bool:
         """
         Run a single command on a server.
@@ -156,14 +306,15 @@ class OmnigraphCmd(BaseCmd):
         Returns:
             bool: True if command was successfully run
         """
+        success = False
         s_cmd_factory = self.server_cmds.get(cmd)
         s_cmd = s_cmd_factory(server) if s_cmd_factory else None
         if s_cmd:
-            s_cmd.run(verbose=not self.quiet)
-            return True
+            result = s_cmd.run(verbose=not self.quiet)
+            success = not self.is_failure(result)
         else:
             print(f"unsupported command {cmd}")
-            return False
+        return success
 
     def load_iterator(self, server):
         """
@@ -179,11 +330,18 @@ class OmnigraphCmd(BaseCmd):
         if not self.quiet:
             print(f"Loaded {total_datasets} dataset(s)")
 
-    def run_cmds(self, server: SparqlServer, cmds: List[str]) -> bool:
+    def run_cmds(self, server: SparqlServer, cmds: List[str]) -> List[str]:
         """
         Run commands on a specific server.
+
+        Args:
+            server: Server instance
+            cmds: the command names
+
+        Returns:
+            the commands that failed or are not supported
         """
-        handled = False
+        failed = []
         if cmds:
             for cmd in cmds:
                 # issue #38: upload needs the per-dataset dumps_dir just like load
@@ -193,9 +351,64 @@ class OmnigraphCmd(BaseCmd):
                     cmd_iterator = iter([None])  # Single iteration
 
                 for _ in cmd_iterator:
-                    if self.run_single_cmd(server, cmd):
-                        handled = True
-        return handled
+                    if not self.run_single_cmd(server, cmd) and cmd not in failed:
+                        failed.append(cmd)
+        return failed
+
+    def run_server_cmds(self, server: SparqlServer, cmds: List[str], stdout: PrefixedStdout) -> dict:
+        """
+        Run the commands on the given server with its output prefixed and timed.
+
+        Args:
+            server: Server instance
+            cmds: the command names
+            stdout: the prefixing stdout
+
+        Returns:
+            the summary row of the server
+        """
+        stdout.set_prefix(f"[{server.name}]")
+        start_time = time.time()
+        result = "✅"
+        try:
+            if not self.quiet:
+                print(f"{server.flag}  {server.full_name}:")
+            failed = self.run_cmds(server, cmds=cmds)
+            if failed:
+                result = f"❌ {' '.join(failed)}"
+        except Exception as ex:
+            server.handle_exception(str(cmds), ex)
+            result = f"❌ {ex}"
+        finally:
+            stdout.set_prefix(None)
+        row = {"server": server.name, "result": result, "secs": f"{time.time() - start_time:.1f}"}
+        return row
+
+    def run_cmds_parallel(self, cmds: List[str], workers: int) -> List[dict]:
+        """
+        Run the commands on the servers concurrently - each server's command
+        sequence in its own thread, so that the stack takes as long as its slowest server.
+
+        Args:
+            cmds: the command names
+            workers: the number of servers to work on at the same time
+
+        Returns:
+            the summary rows - one per server
+        """
+        stdout = PrefixedStdout(sys.stdout)
+        sys.stdout = stdout
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self.run_server_cmds, server, cmds, stdout) for server in self.servers.values()
+                ]
+                rows = [future.result() for future in futures]
+        finally:
+            sys.stdout = stdout.stream
+        table_format = self.args.doc_format if self.args.doc_format != "plain" else "simple"
+        print(tabulate(rows, headers="keys", tablefmt=table_format))
+        return rows
 
     def handle_args(self, args: Namespace):
         """
@@ -207,7 +420,14 @@ class OmnigraphCmd(BaseCmd):
         super().handle_args(args)
         self.all_servers = {}
         if Path(self.args.config).exists():
-            env = ServerEnv(force=self.force, debug=self.debug, verbose=self.args.verbose)
+            env = ServerEnv(
+                force=self.force,
+                debug=self.debug,
+                verbose=self.args.verbose,
+                load_workers=self.args.load_workers,
+                docker_backend=self.args.docker_backend,
+                count_triples=self.args.count_triples,
+            )
             patch_config = None
             if self.args.test:
                 patch_config = lambda config: OmniServer.patch_test_config(config, self.ogp)
@@ -252,15 +472,97 @@ class OmnigraphCmd(BaseCmd):
             markup = self.omni_server.list_servers(self.all_servers, table_format)
             print(markup)
 
-        cmds = list(self.args.cmd or [])
+        self.run_cmd_sequence(list(self.args.cmd or []))
+
+        if self.args.benchmark_load:
+            self.benchmark_load()
+
+        if self.args.benchmark_queries:
+            self.benchmark_queries()
+
+    def run_cmd_sequence(self, cmds: List[str]):
+        """
+        Run the given command sequence on the selected servers - with several
+        servers each status shows one table for the stack at its position in the sequence.
+
+        Args:
+            cmds: the command names in the order given
+        """
+        if "status" in cmds and len(self.servers) > 1:
+            segment = []
+            for cmd in cmds:
+                if cmd == "status":
+                    self.run_servers_cmds(segment)
+                    segment = []
+                    self.stack_status()
+                else:
+                    segment.append(cmd)
+            self.run_servers_cmds(segment)
+        else:
+            self.run_servers_cmds(cmds)
+
+    def run_servers_cmds(self, cmds: List[str]):
+        """
+        Run the given commands on all selected servers - concurrently with --parallel.
+
+        Args:
+            cmds: the command names
+        """
         if len(cmds) > 0:
-            for server in self.servers.values():
-                if not self.quiet:
-                    print(f"{server.flag}  {server.full_name}:")
-                try:
-                    self.run_cmds(server, cmds=cmds)
-                except Exception as ex:
-                    server.handle_exception(str(self.args.cmd), ex)
+            if self.args.parallel > 1 and len(self.servers) > 1:
+                self.run_cmds_parallel(cmds, self.args.parallel)
+            else:
+                for server in self.servers.values():
+                    if not self.quiet:
+                        print(f"{server.flag}  {server.full_name}:")
+                    try:
+                        self.run_cmds(server, cmds=cmds)
+                    except Exception as ex:
+                        server.handle_exception(str(self.args.cmd), ex)
+
+    def stack_status(self):
+        """
+        Show the status of the selected servers as one table.
+        """
+        stack_status = StackStatus(self.servers, count_triples=self.args.count_triples)
+        rows = stack_status.collect()
+        table_format = self.args.doc_format if self.args.doc_format != "plain" else "simple"
+        print(StackStatus.as_table(rows, table_format))
+
+    def benchmark_load(self):
+        """
+        Benchmark the load paths of the selected servers and save the results.
+        """
+        benchmark = LoadBenchmark(self.servers, self.args.benchmark_dir, sizes=self.args.benchmark_sizes)
+        result = benchmark.run()
+        paths = result.save(self.args.benchmark_dir)
+        table_format = self.args.doc_format if self.args.doc_format != "plain" else "simple"
+        print(result.as_table(table_format))
+        if not self.quiet:
+            print(f"results saved to {', '.join(str(path) for path in paths)}")
+
+    def benchmark_queries(self):
+        """
+        Benchmark the named queries on the selected servers and save the results.
+        """
+        queries = QueryBenchmark.load_queries(self.args.queries, self.args.query_names)
+        timeouts = {name: float(secs) for name, secs in (self.args.query_timeouts or {}).items()}
+        benchmark = QueryBenchmark(
+            self.servers,
+            queries,
+            runs=self.args.runs,
+            warmup=self.args.warmup,
+            timeout=self.args.query_timeout,
+            timeouts=timeouts,
+            clients=self.args.clients,
+            params=self.args.query_params,
+        )
+        result = benchmark.run()
+        paths = result.save(self.args.benchmark_dir)
+        table_format = self.args.doc_format if self.args.doc_format != "plain" else "simple"
+        print(result.as_table(table_format))
+        if not self.quiet:
+            print(f"results saved to {', '.join(str(path) for path in paths)}")
 
 
 def main():
@@ -0,0 +1,323 @@
+"""
+Created on 2026-10-17
+
+Benchmark the named queries on the servers
+
+@author: wf
+"""
+
+import csv
+import hashlib
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from basemkit.yamlable import lod_storable
+from lodstorage.params import Params
+from lodstorage.query import Query, QueryManager
+from tabulate import tabulate
+
+from omnigraph.sparql_server import SparqlServer
+
+
+@dataclass
+class QueryTiming:
+    """
+    the latencies of a named query on a server
+    """
+
+    server: str
+    query: str
+    runs: int = 0  # successful measured runs
+    min_ms: Optional[float] = None
+    median_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+    result_count: Optional[int] = None
+    result_hash: Optional[str] = None  # of the values of a single row result e.g. an aggregate
+    errors: int = 0
+    timeouts: int = 0
+    agrees: Optional[bool] = None  # result count and single row values same as on the other servers
+    error: Optional[str] = None  # the last error message
+
+
+@lod_storable
+class QueryBenchmarkResult:
+    """
+    the timings of a query benchmark run
+    """
+
+    timings: List[QueryTiming] = field(default_factory=list)
+
+    def save(self, output_dir: Path) -> List[Path]:
+        """
+        Save me as query_benchmark.json and query_benchmark.csv.
+
+        Args:
+            output_dir: the directory to save to
+
+        Returns:
+            the paths written
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        json_path = output_dir / "query_benchmark.json"
+        self.save_to_json_file(str(json_path), indent=2)
+        csv_path = output_dir / "query_benchmark.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(QueryTiming.__dataclass_fields__))
+            writer.writeheader()
+            for timing in self.timings:
+                writer.writerow(asdict(timing))
+        paths = [json_path, csv_path]
+        return paths
+
+    def as_table(self, table_format: str = "simple") -> str:
+        """
+        Get the timings as table.
+
+        Args:
+            table_format: the tabulate format
+
+        Returns:
+            the table markup
+        """
+
+        def ms(value: Optional[float]) -> str:
+            return f"{value:.1f}" if value is not None else "-"
+
+        rows = []
+        for timing in self.timings:
+            agrees = {True: "✅", False: "❌", None: "-"}[timing.agrees]
+            rows.append(
+                [
+                    timing.query,
+                    timing.server,
+                    timing.runs,
+                    ms(timing.min_ms),
+                    ms(timing.median_ms),
+                    ms(timing.p95_ms),
+                    ms(timing.max_ms),
+                    timing.result_count if timing.result_count is not None else "-",
+                    agrees,
+                    f"{timing.errors}/{timing.timeouts}",
+                ]
+            )
+        headers = [
+            "query",
+            "server",
+            "runs",
+            "min ms",
+            "median ms",
+            "p95 ms",
+            "max ms",
+            "results",
+            "agree",
+            "err/timeout",
+        ]
+        markup = tabulate(rows, headers=headers, tablefmt=table_format)
+        return markup
+
+
+class QueryBenchmark:
+    """
+    Runs each named query a number of times per server after a warmup - from
+    concurrent clients if asked for - and compares the result counts across servers.
+    """
+
+    def __init__(
+        self,
+        servers: Dict[str, SparqlServer],
+        queries: Dict[str, Query],
+        runs: int = 5,
+        warmup: int = 1,
+        timeout: float = 30.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        clients: int = 1,
+        params: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the benchmark.
+
+        Args:
+            servers: the servers to query
+            queries: the named queries
+            runs: measured runs per query and server
+            warmup: unmeasured runs before
+            timeout: seconds a query may take
+            timeouts: seconds per query name overriding the timeout
+            clients: number of concurrent clients running the measured runs
+            params: parameter values overriding the defaults of the queries
+        """
+        self.servers = servers
+        self.queries = queries
+        self.runs = runs
+        self.warmup = warmup
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.clients = max(1, clients)
+        self.params = params or {}
+        self.result = QueryBenchmarkResult()
+
+    @staticmethod
+    def load_queries(yaml_path: Path, query_names: List[str] = None) -> Dict[str, Query]:
+        """
+        Load the named queries of the given queries.yaml.
+
+        Args:
+            yaml_path: the path of the queries yaml file
+            query_names: the names of the queries to use - all if None
+
+        Returns:
+            the queries by name
+        """
+        qm = QueryManager(lang="sparql", queriesPath=str(yaml_path), with_default=False)
+        queries = {
+            name: query for name, query in qm.queriesByName.items() if query_names is None or name in query_names
+        }
+        return queries
+
+    def get_sparql(self, query: Query) -> str:
+        """
+        Get the SPARQL of the given query with its parameters applied.
+
+        Args:
+            query: the named query
+
+        Returns:
+            the query text
+        """
+        values = {param.name: param.default_value for param in query.param_list}
+        values.update(self.params)
+        params = Params(query.query, with_audit=False)
+        sparql = query.query
+        if params.has_params:
+            params.set(values)
+            sparql = params.apply_parameters()
+        return sparql
+
+    def run_query(self, server: SparqlServer, sparql: str, timeout: float) -> tuple:
+        """
+        Run the given query once.
+
+        Args:
+            server: the server to query
+            sparql: the query
+            timeout: seconds the query may take
+
+        Returns:
+            (latency in seconds, result count or None, result hash or None, the exception if any)
+        """
+        result_count = None
+        result_hash = None
+        error = None
+        start_time = time.perf_counter()
+        response = server.make_request(
+            "POST",
+            server.config.sparql_url,
+            headers={"Accept": "application/sparql-results+json"},
+            data={"query": sparql},
+            timeout=timeout,
+        )
+        latency = time.perf_counter() - start_time
+        try:
+            if response.error:
+                raise response.error
+            if not response.success:
+                raise Exception(f"HTTP {response.response.status_code}: {response.response.text[:200]}")
+            json_result = response.response.json()
+            if "boolean" in json_result:
+                result_count = 1 if json_result["boolean"] else 0
+            else:
+                bindings = json_result["results"]["bindings"]
+                result_count = len(bindings)
+                if result_count == 1:
+                    result_hash = self.get_result_hash(bindings[0])
+        except Exception as ex:
+            error = ex
+        return latency, result_count, result_hash, error
+
+    @staticmethod
+    def get_result_hash(binding: dict) -> str:
+        """
+        Get a hash of the values of the given result row - an aggregate like
+        TripleCount answers a single row whatever the count, so its values are
+        compared instead of the row count.
+
+        Blank node labels and datatypes differ between servers and are left out.
+
+        Args:
+            binding: the SPARQL JSON binding of the row
+
+        Returns:
+            the hex digest
+        """
+        values = sorted(
+            (var, "_:" if term.get("type") == "bnode" else term.get("value")) for var, term in binding.items()
+        )
+        result_hash = hashlib.sha256(repr(values).encode()).hexdigest()[:16]
+        return result_hash
+
+    def measure(self, server: SparqlServer, name: str, query: Query) -> QueryTiming:
+        """
+        Measure the given query on the given server.
+
+        Args:
+            server: the server to query
+            name: the name of the query
+            query: the query
+
+        Returns:
+            the QueryTiming
+        """
+        timing = QueryTiming(server=server.name, query=name)
+        sparql = self.get_sparql(query)
+        timeout = self.timeouts.get(name, self.timeout)
+        for _i in range(self.warmup):
+            self.run_query(server, sparql, timeout)
+        with ThreadPoolExecutor(max_workers=self.clients) as executor:
+            outcomes = list(executor.map(lambda _i: self.run_query(server, sparql, timeout), range(self.runs)))
+        latencies = []
+        for latency, result_count, result_hash, error in outcomes:
+            if error is None:
+                latencies.append(latency * 1000)
+                timing.result_count = result_count
+                timing.result_hash = result_hash
+            elif isinstance(error, requests.Timeout):
+                timing.timeouts += 1
+                timing.error = f"timeout after {timeout} s"
+            else:
+                timing.errors += 1
+                timing.error = str(error)
+        if latencies:
+            latencies.sort()
+            timing.runs = len(latencies)
+            timing.min_ms = latencies[0]
+            timing.median_ms = statistics.median(latencies)
+            timing.p95_ms = latencies[math.ceil(0.95 * len(latencies)) - 1]
+            timing.max_ms = latencies[-1]
+        return timing
+
+    def run(self) -> QueryBenchmarkResult:
+        """
+        Run every query on every server and check the agreement of the result
+        counts - and of the values of single row results.
+
+        Returns:
+            the QueryBenchmarkResult
+        """
+        for name, query in self.queries.items():
+            timings = [self.measure(server, name, query) for server in self.servers.values()]
+            results = {
+                (timing.result_count, timing.result_hash) for timing in timings if timing.result_count is not None
+            }
+            for timing in timings:
+                if timing.result_count is not None:
+                    timing.agrees = len(results) == 1
+            self.result.timings.extend(timings)
+        return self.result
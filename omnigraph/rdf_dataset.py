@@ -5,6 +5,7 @@ Created on 2025-05-30
 """
 
 from dataclasses import dataclass, field
+from enum import Enum
 from typing import Dict, Optional
 
 from basemkit.yamlable import lod_storable
@@ -15,6 +16,15 @@ from lodstorage.sparql import SPARQL
 from omnigraph.version import Version
 
 
+class Pagination(Enum):
+    """
+    the ways a CONSTRUCT dump is cut into pages
+    """
+
+    OFFSET = "offset"  # OFFSET n LIMIT m - deep offsets make the endpoint re-scan
+    KEYSET = "keyset"  # ordered ranges of the page key - each page costs about the same
+
+
 @dataclass
 class RdfDataset:
     """
@@ -37,6 +47,14 @@ class RdfDataset:
     # https://foundation.wikimedia.org/wiki/Policy:Wikimedia_Foundation_User-Agent_Policy
     user_agent: Optional[str] = None  # defaults to Version.user_agent
     calls_per_minute: Optional[int] = None  # rate limit an endpoint asks for
+    # how the dump is paged - offset or keyset, the latter by ordered ranges of
+    # the page_key variable which the select_pattern has to bind
+    pagination: Optional[str] = "offset"
+    page_key: Optional[str] = "?s"
+    # retry policy for failed pages - a Retry-After of the endpoint overrides the backoff
+    max_attempts: Optional[int] = 4  # attempts per page and pass
+    backoff_base: Optional[float] = 2.0  # seconds before the first retry - doubled for every further one
+    backoff_jitter: Optional[float] = 0.5  # random share of the backoff added to spread the workers
     # fields to be configured by post_init
     id: Optional[str] = field(default=None)
     count_query: Optional[Query] = field(default=None)
@@ -126,6 +144,95 @@ class RdfDataset:
         count = int(count)
         return count
 
+    @property
+    def pagination_strategy(self) -> Pagination:
+        """
+        the configured pagination
+
+        Returns:
+            the Pagination - raises ValueError for an unknown name
+        """
+        pagination = Pagination(self.pagination or Pagination.OFFSET.value)
+        return pagination
+
+    @staticmethod
+    def as_sparql_string(value: str) -> str:
+        """
+        Quote the given value as a SPARQL string literal.
+
+        Args:
+            value: the raw string
+
+        Returns:
+            the quoted and escaped literal
+        """
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+        literal = f'"{escaped}"'
+        return literal
+
+    def get_key_filter(self, after: Optional[str], until: Optional[str] = None) -> str:
+        """
+        Get the FILTER restricting the page key to the range (after, until].
+
+        Args:
+            after: the exclusive lower bound or None for the first page
+            until: the inclusive upper bound or None for the last page
+
+        Returns:
+            the FILTER clause - empty if the range is unbounded
+        """
+        key = f"STR({self.page_key})"
+        conditions = []
+        if after is not None:
+            conditions.append(f"{key} > {self.as_sparql_string(after)}")
+        if until is not None:
+            conditions.append(f"{key} <= {self.as_sparql_string(until)}")
+        key_filter = f"FILTER({' && '.join(conditions)})" if conditions else ""
+        return key_filter
+
+    def get_keyset_boundary_query(self, after: Optional[str], limit: int) -> str:
+        """
+        Generate the SELECT query for the page key that closes a keyset page.
+
+        The key of the limit-th solution after the given key closes the page -
+        all solutions sharing that key belong to the same page, so no triple is
+        split across pages. No index serves the ORDER BY of the string values, so
+        the endpoint scans and sorts the solutions after the key for every page.
+
+        Args:
+            after: the key that closed the previous page or None for the first page
+            limit: the number of solutions per page
+
+        Returns:
+            SPARQL SELECT query string binding ?key
+        """
+        query = f"""
+        SELECT (STR({self.page_key}) AS ?key)
+        WHERE     {{ {self.select_pattern} {self.get_key_filter(after)} }}
+        ORDER BY STR({self.page_key})
+        OFFSET {limit - 1}
+        LIMIT 1
+        """
+        return query
+
+    def get_keyset_construct_query(self, after: Optional[str], until: Optional[str]) -> str:
+        """
+        Generate the CONSTRUCT query for the keyset page (after, until] - the
+        FILTER on the string values is not index served either.
+
+        Args:
+            after: the exclusive lower key bound or None for the first page
+            until: the inclusive upper key bound or None for the last page
+
+        Returns:
+            SPARQL CONSTRUCT query string
+        """
+        query = f"""
+        CONSTRUCT {{ {self.construct_template} }}
+        WHERE     {{ {self.select_pattern} {self.get_key_filter(after, until)} }}
+        """
+        return query
+
     def getTryItUrl(self, database: str = "blazegraph") -> str:
         """
         return the "try it!" url for the given database
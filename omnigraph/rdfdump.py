@@ -6,25 +6,190 @@ Created on 2025-05-26
 Download RDF dump via paginated CONSTRUCT queries.
 """
 
+import io
+import os
+import random
+import threading
 import time
 from argparse import Namespace
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import requests
 from lodstorage.rdf_format import RdfFormat
-from lodstorage.sparql import SPARQL
 from tqdm import tqdm
 
-from omnigraph.rdf_dataset import RdfDataset, RdfDatasets
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_manifest import ChunkRecord, DumpManifest
+from omnigraph.dump_splitter import DumpSplitter
+from omnigraph.rdf_dataset import Pagination, RdfDataset, RdfDatasets
 from omnigraph.version import Version
 
 
+class TokenBucket:
+    """
+    A thread safe token bucket shared by all download workers, so that the
+    combined request rate stays within the calls_per_minute of an endpoint
+    however many pages are fetched concurrently.
+    """
+
+    def __init__(self, calls_per_minute: float, capacity: int = 1):
+        """
+        Initialize the token bucket.
+
+        Args:
+            calls_per_minute: the sustained request rate
+            capacity: the number of requests that may burst
+        """
+        self.rate = calls_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available and take it.
+
+        Returns:
+            the number of seconds spent waiting
+        """
+        waited = 0.0
+        acquired = False
+        while not acquired:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    acquired = True
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            if not acquired:
+                time.sleep(wait)
+                waited += wait
+        return waited
+
+
+class PageFetchError(Exception):
+    """
+    an endpoint refused a page with an HTTP error status
+    """
+
+    def __init__(self, status_code: int, text: str, retry_after: Optional[str] = None):
+        super().__init__(f"HTTP {status_code}: {text[:500]}")
+        self.status_code = status_code
+        self.retry_after = self.parse_retry_after(retry_after)
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header.
+
+        Args:
+            value: delay seconds or an HTTP date
+
+        Returns:
+            the seconds to wait - None if there is no valid header
+        """
+        seconds = None
+        if value:
+            try:
+                seconds = max(0.0, float(value))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(value)
+                    seconds = max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    seconds = None
+        return seconds
+
+
+@dataclass
+class RetryPolicy:
+    """
+    how often and how patiently a failed page is fetched again
+    """
+
+    max_attempts: int = 4
+    backoff_base: float = 2.0
+    backoff_jitter: float = 0.5
+    # no single backoff waits longer than this
+    max_backoff: float = 300.0
+
+    @classmethod
+    def of_dataset(cls, dataset: RdfDataset) -> "RetryPolicy":
+        """
+        Get the retry policy configured for the given dataset.
+
+        Args:
+            dataset: the RdfDataset
+
+        Returns:
+            the RetryPolicy - defaults for unset fields
+        """
+        policy = cls()
+        if dataset.max_attempts is not None:
+            policy.max_attempts = max(1, dataset.max_attempts)
+        if dataset.backoff_base is not None:
+            policy.backoff_base = dataset.backoff_base
+        if dataset.backoff_jitter is not None:
+            policy.backoff_jitter = dataset.backoff_jitter
+        return policy
+
+    @staticmethod
+    def is_retryable(ex: Exception) -> bool:
+        """
+        Check whether the given fetch error may pass on a later attempt.
+
+        Args:
+            ex: the exception of the fetch
+
+        Returns:
+            True for a timeout, a dropped connection, a 429 or a 5xx status
+        """
+        retryable = isinstance(ex, (requests.Timeout, requests.ConnectionError)) or (
+            isinstance(ex, PageFetchError) and (ex.status_code == 429 or ex.status_code >= 500)
+        )
+        return retryable
+
+    def get_delay(self, attempt: int, ex: Optional[Exception] = None) -> float:
+        """
+        Get the seconds to wait after the given failed attempt.
+
+        Args:
+            attempt: the number of the failed attempt - starting at 1
+            ex: the exception of the attempt - its Retry-After wins
+
+        Returns:
+            the backoff in seconds
+        """
+        retry_after = getattr(ex, "retry_after", None)
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = self.backoff_base * 2 ** (attempt - 1)
+            delay += random.uniform(0, self.backoff_jitter * delay)
+        delay = min(delay, self.max_backoff)
+        return delay
+
+
 class RdfDumpDownloader:
     """
     Downloads an RDF dump from a SPARQL endpoint via
     paginated CONSTRUCT queries.
     """
 
+    # the size of the blocks a page is streamed to disk in
+    block_size = 1024 * 1024
+    # seconds to wait for a page
+    timeout = 60
+
     def __init__(self, dataset: RdfDataset, output_path: str, args: Optional[Namespace] = None):
         """
         Initialize the RDF dump downloader.
@@ -38,11 +203,6 @@ class RdfDumpDownloader:
         self.rdf_format = RdfFormat.by_label(args.rdf_format)
         self.dataset = dataset
         self.endpoint_url = dataset.endpoint_url
-        self.sparql = SPARQL(
-            self.endpoint_url,
-            agent=dataset.user_agent or Version.user_agent,
-            calls_per_minute=dataset.calls_per_minute,
-        )
         self.output_path = output_path
         self.limit = args.limit if args else 10000
         self.max_count = args.max_count if args and args.max_count is not None else dataset.expected_solutions or 200000
@@ -50,35 +210,568 @@ class RdfDumpDownloader:
         self.force = args.force if args else False
         self.endpoint_error = None
         self.debug = args.debug if args else False
+        self.workers = max(1, getattr(args, "workers", None) or 1)
+        # one bucket for all workers - the endpoint sees the sum of their requests.
+        # The rate is the one of the dataset's SPARQL client, which applies the
+        # lodstorage default to endpoints that do not ask for a rate of their own
+        calls_per_minute = dataset.sparql.rate_limiter.calls_per_minute if dataset.sparql else dataset.calls_per_minute
+        self.token_bucket = TokenBucket(calls_per_minute or 60)
+        self.stop_event = threading.Event()
+        self.pagination = dataset.pagination_strategy
+        self.compression = DumpCompression.by_label(getattr(args, "compress", None))
+        self.manifest: Optional[DumpManifest] = None
+        # (after, until] page key ranges of a keyset dump
+        self.key_ranges: List[Tuple[Optional[str], Optional[str]]] = []
+        self.timeout = getattr(args, "timeout", None) or self.timeout
+        # adaptive page size - grow while pages come back fast, halve when shed
+        self.adaptive = getattr(args, "adaptive", False)
+        self.target_latency = getattr(args, "target_latency", None) or self.timeout / 6
+        self.min_limit = getattr(args, "min_limit", None) or max(1, self.limit // 10)
+        self.max_limit = getattr(args, "max_limit", None) or self.limit * 10
+        self.retry_policy = RetryPolicy.of_dataset(dataset)
+        # seconds spent waiting for retries - shown apart from the fetch time
+        self.backoff_time = 0.0
+        self.backoff_lock = threading.Lock()
+        # chunk index to last error of the pages queued for a later pass
+        self.failed_chunks: Dict[int, str] = {}
 
-    def fetch_chunk(self, offset: int, rdf_format: str = "turtle") -> str:
+    def walk_key_ranges(self) -> Iterator[int]:
         """
-        Fetch a chunk of RDF data in the given format using direct HTTP POST.
+        Walk the ordered page keys of the dataset to find the keyset pages -
+        each page is yielded as soon as its range is known, so that its
+        download runs while the walk goes on.
+
+        A boundary query sorts the solutions after the previous key by their
+        string value which no index serves - every boundary query scans the
+        select pattern, so the walk costs one scan per page. The ranges found
+        go to the manifest as they come and a resume continues the walk after
+        the last of them.
+
+        Yields:
+            the index of the next range in self.key_ranges
+        """
+        for chunk_idx in range(len(self.key_ranges)):
+            yield chunk_idx
+        last_page = bool(self.key_ranges) and self.key_ranges[-1][1] is None
+        after = self.key_ranges[-1][1] if self.key_ranges else None
+        while not last_page and not self.stop_event.is_set():
+            self.token_bucket.acquire()
+            query = self.dataset.get_keyset_boundary_query(after, self.limit)
+            if self.debug:
+                print(query)
+            until = self.dataset.sparql.getValue(query, "key")
+            self.key_ranges.append((after, until))
+            with self.manifest.lock:
+                self.manifest.key_ranges.append([after, until])
+            yield len(self.key_ranges) - 1
+            last_page = until is None
+            after = until
+
+    def get_page_query(self, chunk_idx: int) -> str:
+        """
+        Get the CONSTRUCT query for the given chunk.
+
+        Args:
+            chunk_idx: index of the chunk
+
+        Returns:
+            the CONSTRUCT query of the page
+        """
+        if self.pagination == Pagination.KEYSET:
+            after, until = self.key_ranges[chunk_idx]
+            query = self.dataset.get_keyset_construct_query(after, until)
+        else:
+            query = self.dataset.get_construct_query(chunk_idx * self.limit, self.limit)
+        return query
+
+    def fetch_chunk_to_file(self, offset: int, filename: Path, query: Optional[str] = None) -> int:
+        """
+        Fetch a chunk and stream it to the given file block by block, so that
+        memory stays flat whatever the page size.
+
+        The body goes to a .part file next to the target which is renamed into
+        place only when complete - a killed process leaves no truncated chunk
+        behind that a resume would take for finished.
 
         Args:
-            offset: Query offset
-            rdf_format: RDF format label
+            offset: Query offset - for messages
+            filename: the path to write the chunk to
+            query: the page query - an OFFSET page at the given offset if None
 
         Returns:
-            RDF content as string
+            the number of uncompressed bytes written - 0 for an empty answer, which writes no file
         """
-        query = self.dataset.get_construct_query(offset, self.limit)
+        if query is None:
+            query = self.dataset.get_construct_query(offset, self.limit)
         if self.debug:
             print(query)
-        content = self.sparql.post_query_direct(query=query, rdf_format=rdf_format)
-        if not content:
+        headers = {
+            "Accept": self.rdf_format.mime_type,
+            "User-Agent": self.dataset.user_agent or Version.user_agent,
+        }
+        part_path = filename.with_name(f"{filename.name}.part")
+        byte_count = 0
+        has_content = False
+        with requests.post(
+            self.endpoint_url, data={"query": query}, headers=headers, timeout=self.timeout, stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise PageFetchError(response.status_code, response.text, response.headers.get("Retry-After"))
+            try:
+                with self.compression.open_write(part_path) as f:
+                    for block in response.iter_content(chunk_size=self.block_size):
+                        if byte_count == 0 and b"<html" in block[:200].lower():
+                            # a throttle or error page must not end up as a turtle chunk
+                            raise Exception(
+                                f"non-RDF answer at offset {offset} from {self.endpoint_url}: {block[:200]!r}"
+                            )
+                        has_content = has_content or bool(block.strip())
+                        f.write(block)
+                        byte_count += len(block)
+                if has_content:
+                    os.replace(part_path, filename)
+            finally:
+                if part_path.exists():
+                    part_path.unlink()
+        if not has_content:
             # an empty answer is a finding, not a silent skip - see #64
             print(f"empty chunk at offset {offset} from {self.endpoint_url}")
-        elif "<html" in content[:200].lower():
-            # a throttle or error page would otherwise be written as turtle
-            print(f"non-RDF answer at offset {offset} from {self.endpoint_url}: {content[:200]!r}")
+            byte_count = 0
         if self.debug:
-            print(f"Chunk {offset}: content length = {len(content) if content else 0}")
-        return content
+            print(f"Chunk {offset}: content length = {byte_count}")
+        return byte_count
+
+    def chunk_path(self, output_dir: Path, chunk_idx: int) -> Path:
+        """
+        Get the path of the dump file for the given chunk.
+
+        Args:
+            output_dir: the directory for the dump files
+            chunk_idx: index of the chunk
+
+        Returns:
+            the path of the chunk's dump file
+        """
+        path = output_dir / f"dump_{chunk_idx:06d}{self.rdf_format.extension}{self.compression.suffix}"
+        return path
+
+    def estimate_triples(self, filename: Path) -> Optional[int]:
+        """
+        Estimate the triples of the given chunk file by streaming its statements
+        through the DumpSplitter scanner - no graph is built, so memory stays
+        flat and the workers are not serialized by a parse.
+
+        The scanner counts one triple per statement and per ; or , - the triples
+        of collections and nested [ ] property lists are missed, so the estimate
+        is for reporting only and must not be used to check a chunk for completeness.
+
+        Args:
+            filename: the chunk file
+
+        Returns:
+            the estimated number of triples or None for the formats the scanner does not cover
+        """
+        triple_count = None
+        if self.rdf_format == RdfFormat.TURTLE:
+            triple_count = 0
+            with self.compression.open_read(filename) as binary:
+                stream = io.TextIOWrapper(binary, encoding="utf-8")
+                for _statement, statement_triples, _is_directive in DumpSplitter(1).statements(stream, "turtle"):
+                    triple_count += statement_triples
+        return triple_count
+
+    def add_chunk_record(
+        self,
+        chunk_idx: int,
+        filename: Path,
+        latency: float,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ):
+        """
+        Record a written chunk in the manifest.
+
+        Args:
+            chunk_idx: index of the chunk
+            filename: the chunk file
+            latency: seconds the fetch took
+            offset: the offset of the page - chunk_idx * self.limit if None
+            limit: the size of the page - self.limit if None
+        """
+        after, until = self.key_ranges[chunk_idx] if self.pagination == Pagination.KEYSET else (None, None)
+        record = ChunkRecord(
+            file_name=filename.name,
+            offset=chunk_idx * self.limit if offset is None else offset,
+            limit=self.limit if limit is None else limit,
+            byte_size=filename.stat().st_size,
+            sha256=DumpManifest.file_sha256(filename),
+            approx_triple_count=self.estimate_triples(filename),
+            latency=round(latency, 3),
+            endpoint=self.endpoint_url,
+            after=after,
+            until=until,
+        )
+        self.manifest.add(record)
+
+    def backoff(self, delay: float):
+        """
+        Wait before a retry - cut short when the download stops.
+
+        Args:
+            delay: the seconds to wait
+        """
+        start_time = time.monotonic()
+        self.stop_event.wait(delay)
+        with self.backoff_lock:
+            self.backoff_time += time.monotonic() - start_time
+
+    def fetch_with_retries(self, offset: int, filename: Path, query: str) -> Tuple[int, float]:
+        """
+        Fetch a page, retrying a retryable failure as the retry policy says.
+
+        Args:
+            offset: Query offset - for messages
+            filename: the path to write the chunk to
+            query: the page query
+
+        Returns:
+            the number of bytes written and the seconds the successful attempt took
+        """
+        result = None
+        attempt = 1
+        while result is None:
+            self.token_bucket.acquire()
+            try:
+                start_time = time.monotonic()
+                byte_count = self.fetch_chunk_to_file(offset=offset, filename=filename, query=query)
+                result = (byte_count, time.monotonic() - start_time)
+            except Exception as e:
+                if (
+                    attempt >= self.retry_policy.max_attempts
+                    or not self.retry_policy.is_retryable(e)
+                    or self.stop_event.is_set()
+                ):
+                    raise
+                delay = self.retry_policy.get_delay(attempt, e)
+                print(f"retry {attempt}/{self.retry_policy.max_attempts - 1} at offset {offset} in {delay:.1f} s: {e}")
+                self.backoff(delay)
+                attempt += 1
+        return result
+
+    def download_chunk(self, chunk_idx: int, filename: Path) -> bool:
+        """
+        Fetch and write a single chunk - called from the worker threads.
+
+        Args:
+            chunk_idx: index of the chunk
+            filename: the path to write the chunk to
+
+        Returns:
+            True if the chunk was written
+        """
+        written = False
+        # an empty page or a permanent refusal ends the dump - pages not started yet are skipped
+        if not self.stop_event.is_set():
+            offset = chunk_idx * self.limit
+            try:
+                query = self.get_page_query(chunk_idx)
+                byte_count, latency = self.fetch_with_retries(offset, filename, query)
+                if byte_count > 0:
+                    self.add_chunk_record(chunk_idx, filename, latency)
+                self.failed_chunks.pop(chunk_idx, None)
+            except Exception as e:
+                if self.retry_policy.is_retryable(e):
+                    # a page that still fails is queued for a later pass instead
+                    # of ending a dump of hours on one transient 502 or 429
+                    self.failed_chunks[chunk_idx] = str(e)
+                    print(f"page at offset {offset} queued for a later pass: {e}")
+                    byte_count = None
+                else:
+                    # keep the refusal so a caller can tell endpoint weather from a
+                    # code defect - see #64: wikidata answers the count and then load
+                    # sheds the CONSTRUCT with a 502
+                    self.endpoint_error = str(e)
+                    print(f"Error at offset {offset}: {e}")
+                    byte_count = 0
+            if byte_count == 0:
+                self.stop_event.set()
+            elif byte_count:
+                written = True
+        return written
+
+    @staticmethod
+    def is_shedding(ex: Exception) -> bool:
+        """
+        Check whether the given fetch error means the endpoint sheds load -
+        a smaller page may pass where this one did not.
+
+        Args:
+            ex: the exception of the fetch
+
+        Returns:
+            True for a timeout, a dropped connection or a 5xx status
+        """
+        shedding = isinstance(ex, (requests.Timeout, requests.ConnectionError)) or (
+            isinstance(ex, PageFetchError) and ex.status_code >= 500
+        )
+        return shedding
+
+    def get_mismatched_chunks(self, total_chunks: int, adaptive: bool) -> List[str]:
+        """
+        Find the recorded chunks whose page bounds differ from the pages of this run -
+        skipping them by file name would duplicate or drop triples e.g. after a
+        different --limit or when a fixed size run follows an adaptive one.
+
+        Args:
+            total_chunks: the number of fixed size pages
+            adaptive: True if the pages are adaptive - their offsets must follow on each other
+
+        Returns:
+            the file names of the mismatched chunks
+        """
+        mismatched = []
+        prefix = "dump_"
+        suffix = f"{self.rdf_format.extension}{self.compression.suffix}"
+        offset = 0
+        expected_idx = 0
+        for file_name, record in sorted(self.manifest.chunks.items()):
+            chunk_no = file_name[len(prefix) : -len(suffix)]
+            if not file_name.startswith(prefix) or not file_name.endswith(suffix) or not chunk_no.isdigit():
+                continue
+            chunk_idx = int(chunk_no)
+            if adaptive:
+                matches = chunk_idx == expected_idx and record.offset == offset
+                offset = record.offset + record.limit
+                expected_idx = chunk_idx + 1
+            elif self.pagination == Pagination.KEYSET:
+                matches = chunk_idx < len(self.key_ranges) and (record.after, record.until) == tuple(
+                    self.key_ranges[chunk_idx]
+                )
+            else:
+                matches = chunk_idx < total_chunks and (record.offset, record.limit) == (
+                    chunk_idx * self.limit,
+                    self.limit,
+                )
+            if not matches:
+                mismatched.append(file_name)
+        return mismatched
+
+    def get_resume_point(self, output_dir: Path) -> Tuple[int, int, int]:
+        """
+        Find where an adaptive dump continues from the page boundaries
+        recorded in the manifest.
+
+        Args:
+            output_dir: the directory for the dump files
+
+        Returns:
+            the next chunk index, its offset and the page size to continue with
+        """
+        chunk_idx = 0
+        offset = 0
+        limit = self.limit
+        if not self.force:
+            filename = self.chunk_path(output_dir, chunk_idx)
+            while self.manifest.is_complete(filename):
+                record = self.manifest.chunks[filename.name]
+                offset = record.offset + record.limit
+                limit = record.limit
+                chunk_idx += 1
+                filename = self.chunk_path(output_dir, chunk_idx)
+        return chunk_idx, offset, limit
+
+    def download_adaptive(self, output_dir: Path, actual_count: int) -> int:
+        """
+        Download the offset pages one after the other, adapting the page size
+        to the latency of the endpoint.
+
+        A page faster than half the target latency doubles the next one, a page
+        slower than the target halves it. A timeout or 5xx retries the same
+        offset with half the page size and the failed size is not tried again.
+        The page boundaries used are kept in the manifest for a resume.
+
+        Args:
+            output_dir: the directory for the dump files
+            actual_count: the number of solutions to fetch
+
+        Returns:
+            Number of chunks downloaded
+        """
+        chunk_count = 0
+        chunk_idx, offset, limit = self.get_resume_point(output_dir)
+        # the smallest page size that was shed - not grown to again
+        ceiling = None
+        # attempts at the current offset once the page size is down to min_limit
+        attempt = 1
+        pbar = None
+        if self.show_progress:
+            pbar = tqdm(
+                total=actual_count,
+                initial=min(offset, actual_count),
+                desc=f"Downloading RDF dump ({actual_count} results)",
+            )
+            if chunk_idx > 0:
+                pbar.set_postfix_str(f"resumed at offset {offset} with page size {limit}")
+        try:
+            while offset < actual_count and not self.stop_event.is_set():
+                filename = self.chunk_path(output_dir, chunk_idx)
+                self.token_bucket.acquire()
+                query = self.dataset.get_construct_query(offset, limit)
+                new_limit = limit
+                try:
+                    start_time = time.monotonic()
+                    byte_count = self.fetch_chunk_to_file(offset=offset, filename=filename, query=query)
+                    latency = time.monotonic() - start_time
+                except Exception as e:
+                    if self.is_shedding(e) and limit > self.min_limit:
+                        ceiling = limit if ceiling is None else min(ceiling, limit)
+                        new_limit = max(self.min_limit, limit // 2)
+                        print(f"page size {limit} → {new_limit} at offset {offset} after: {e}")
+                        limit = new_limit
+                        continue
+                    if self.retry_policy.is_retryable(e) and attempt < self.retry_policy.max_attempts:
+                        delay = self.retry_policy.get_delay(attempt, e)
+                        print(
+                            f"retry {attempt}/{self.retry_policy.max_attempts - 1} at offset {offset} in {delay:.1f} s: {e}"
+                        )
+                        self.backoff(delay)
+                        attempt += 1
+                        if pbar:
+                            pbar.set_postfix_str(f"backoff {self.backoff_time:.1f} s")
+                        continue
+                    # see #64 - keep the refusal for the caller
+                    self.endpoint_error = str(e)
+                    print(f"Error at offset {offset}: {e}")
+                    byte_count = 0
+                if byte_count == 0:
+                    self.stop_event.set()
+                else:
+                    self.add_chunk_record(chunk_idx, filename, latency, offset=offset, limit=limit)
+                    attempt = 1
+                    chunk_count += 1
+                    chunk_idx += 1
+                    offset += limit
+                    if pbar:
+                        pbar.update(min(limit, actual_count - pbar.n))
+                    if latency > self.target_latency:
+                        new_limit = max(self.min_limit, limit // 2)
+                    elif latency < self.target_latency / 2 and (ceiling is None or limit * 2 < ceiling):
+                        new_limit = min(self.max_limit, limit * 2)
+                    if new_limit != limit:
+                        if self.debug:
+                            print(f"page size {limit} → {new_limit} at offset {offset} ({latency:.1f} s)")
+                        limit = new_limit
+        finally:
+            if pbar:
+                pbar.close()
+        return chunk_count
+
+    def download_pages(
+        self, output_dir: Path, actual_count: int, total_chunks: int, chunk_indices: Optional[Iterable[int]] = None
+    ) -> int:
+        """
+        Download the pages, fetching up to self.workers chunks concurrently.
+
+        The chunk indices are taken only as the workers get free - a keyset
+        walk yielding them one boundary query after the other thus overlaps
+        with the downloads instead of preceding them.
+
+        Args:
+            output_dir: the directory for the dump files
+            actual_count: the number of solutions to fetch
+            total_chunks: the number of pages - an estimate while a keyset walk is running
+            chunk_indices: the chunks to download - all total_chunks if None
+
+        Returns:
+            Number of chunks downloaded
+        """
+        chunk_count = 0
+        skipped = 0
+        pbar = None
+        if self.show_progress:
+            pbar = tqdm(total=total_chunks, desc=f"Downloading RDF dump ({actual_count} results)")
+
+        self.failed_chunks = {}
+        try:
+            # the pages still failing after all attempts get one later pass
+            for later_pass in (False, True):
+                if later_pass:
+                    chunk_indices = [] if self.stop_event.is_set() else sorted(self.failed_chunks)
+                    if chunk_indices:
+                        print(f"later pass for {len(chunk_indices)} failed pages")
+                elif chunk_indices is None:
+                    chunk_indices = range(total_chunks)
+                pending = iter(chunk_indices)
+                exhausted = False
+                seen = 0
+                # a single worker submits and completes in chunk order just like the
+                # former sequential loop
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    futures = {}
+                    while not exhausted or futures:
+                        # two queued pages per worker keep them busy
+                        while not exhausted and len(futures) < 2 * self.workers:
+                            chunk_idx = next(pending, None)
+                            if chunk_idx is None:
+                                exhausted = True
+                                if pbar and not later_pass:
+                                    pbar.total = seen
+                                    pbar.refresh()
+                                continue
+                            seen += 1
+                            filename = self.chunk_path(output_dir, chunk_idx)
+                            # only a chunk the manifest vouches for is skipped - a file alone may be
+                            # the remains of a killed process
+                            if not later_pass and self.manifest.is_complete(filename) and not self.force:
+                                skipped += 1
+                                if pbar:
+                                    pbar.update(1)
+                                    self.show_retry_status(pbar, skipped)
+                                continue
+                            futures[executor.submit(self.download_chunk, chunk_idx, filename)] = chunk_idx
+                        if futures:
+                            done, _not_done = wait(futures, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                chunk_idx = futures.pop(future)
+                                written = future.result()
+                                if written:
+                                    chunk_count += 1
+                                if pbar:
+                                    # a queued page counts once it is written in the later pass
+                                    if written or (not later_pass and chunk_idx not in self.failed_chunks):
+                                        pbar.update(1)
+                                    self.show_retry_status(pbar, skipped)
+        finally:
+            if pbar:
+                pbar.close()
+        if self.failed_chunks:
+            failed_offsets = [chunk_idx * self.limit for chunk_idx in sorted(self.failed_chunks)]
+            last_error = self.failed_chunks[max(self.failed_chunks)]
+            self.endpoint_error = f"{len(self.failed_chunks)} pages failed at offsets {failed_offsets}: {last_error}"
+            print(self.endpoint_error)
+        return chunk_count
+
+    def show_retry_status(self, pbar: tqdm, skipped: int):
+        """
+        Show skipped files, backoff time and queued pages in the progress postfix.
+
+        Args:
+            pbar: the progress bar
+            skipped: the number of existing files skipped
+        """
+        status = []
+        if skipped:
+            status.append(f"skipped {skipped} existing files")
+        if self.backoff_time:
+            status.append(f"backoff {self.backoff_time:.1f} s")
+        if self.failed_chunks:
+            status.append(f"{len(self.failed_chunks)} queued")
+        pbar.set_postfix_str(", ".join(status))
 
     def download(self) -> int:
         """
-        Download the RDF dump in chunks.
+        Download the RDF dump in chunks - fixed size pages fetched by up to
+        self.workers concurrently or adaptive pages one after the other.
 
         Returns:
             Number of chunks downloaded
@@ -92,38 +785,35 @@ class RdfDumpDownloader:
         if actual_count == 0:
             # zero makes the loop a no-op - name it so a build log says why, #64
             print(f"count 0 from {self.endpoint_url} for {self.dataset.name} - nothing to download")
+        self.manifest = DumpManifest.of_dir(output_dir)
+        self.manifest.dataset = self.dataset.id or self.dataset.name
+        self.manifest.endpoint = self.endpoint_url
         total_chunks = (actual_count + self.limit - 1) // self.limit  # Round up
-        chunk_count = 0
-
-        iterator = range(total_chunks)
-        if self.show_progress:
-            iterator = tqdm(iterator, desc=f"Downloading RDF dump ({actual_count} results)")
-
-        for chunk_idx in iterator:
-            filename = output_dir / f"dump_{chunk_idx:06d}{self.rdf_format.extension}"
-            if filename.exists() and not self.force:
-                if self.show_progress:
-                    iterator.set_description(f"Skipping existing file: {filename}")
-                continue
-
-            offset = chunk_idx * self.limit
-            try:
-                content = self.fetch_chunk(offset=offset, rdf_format=self.rdf_format.label)
-            except Exception as e:
-                # keep the refusal so a caller can tell endpoint weather from a
-                # code defect - see #64: wikidata answers the count and then load
-                # sheds the CONSTRUCT with a 502
-                self.endpoint_error = str(e)
-                print(f"Error at offset {offset}: {e}")
-                break
-
-            if not content or content.strip() == "":
-                break
-
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(content)
-
-            chunk_count += 1
-            time.sleep(0.5)
-
+        chunk_indices = None
+        if self.pagination == Pagination.KEYSET:
+            if self.force:
+                self.manifest.key_ranges = []
+            # the ranges of an earlier walk are kept - the walk continues after them
+            self.key_ranges = [tuple(key_range) for key_range in self.manifest.key_ranges]
+            if self.key_ranges and self.key_ranges[-1][1] is None:
+                total_chunks = len(self.key_ranges)
+            chunk_indices = self.walk_key_ranges()
+        adaptive = self.adaptive and self.pagination == Pagination.OFFSET
+        if self.adaptive and not adaptive:
+            print(f"adaptive page size needs offset pagination - {self.dataset.name} keeps its keyset pages")
+        if not self.force:
+            mismatched = self.get_mismatched_chunks(total_chunks, adaptive)
+            if mismatched:
+                raise ValueError(
+                    f"{len(mismatched)} chunks in {output_dir} were dumped with other page bounds"
+                    f" e.g. {mismatched[0]} - use --force to dump {self.dataset.name} again"
+                )
+        self.stop_event.clear()
+        try:
+            if adaptive:
+                chunk_count = self.download_adaptive(output_dir, actual_count)
+            else:
+                chunk_count = self.download_pages(output_dir, actual_count, total_chunks, chunk_indices)
+        finally:
+            self.manifest.save()
         return chunk_count
@@ -9,10 +9,12 @@ Command line interface for RDF dump downloading.
 import os
 import webbrowser
 from argparse import ArgumentParser, Namespace
+from pathlib import Path
 
 from basemkit.argparse_action import StoreDictKeyPair
 
 from omnigraph.basecmd import BaseCmd
+from omnigraph.dump_manifest import DumpManifest
 from omnigraph.rdf_dataset import RdfDataset, RdfDatasets
 from omnigraph.rdfdump import RdfDumpDownloader
 
@@ -46,6 +48,41 @@ class RdfDumpCmd(BaseCmd):
             default=10000,
             help="Number of triples per request [default: %(default)s]",
         )
+        parser.add_argument(
+            "--adaptive",
+            action="store_true",
+            help="adapt the page size to the endpoint's latency - grow fast pages, halve slow or shed ones [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--target-latency",
+            type=float,
+            default=None,
+            help="seconds an adaptive page should take - a sixth of the timeout if not specified",
+        )
+        parser.add_argument(
+            "--min-limit",
+            type=int,
+            default=None,
+            help="smallest adaptive page size - a tenth of --limit if not specified",
+        )
+        parser.add_argument(
+            "--max-limit",
+            type=int,
+            default=None,
+            help="largest adaptive page size - ten times --limit if not specified",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="seconds to wait for a page [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--compress",
+            choices=["gz", "zst"],
+            default=None,
+            help="compress the dump files with gzip or zstd [default: %(default)s]",
+        )
         parser.add_argument("-l", "--list", action="store_true", help="List available datasets [default: %(default)s]")
         parser.add_argument(
             "--count", action="store_true", help="List available datasets with triple counts[default: %(default)s]"
@@ -71,7 +108,18 @@ class RdfDumpCmd(BaseCmd):
             help="npq parameter values overriding the dataset's params (issue #36)",
         )
         parser.add_argument("--no-progress", action="store_true", help="Disable progress bar")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of chunks to fetch concurrently - the dataset's calls_per_minute is shared by all workers [default: %(default)s]",
+        )
         parser.add_argument("--output-path", default=".", help="Path for dump files")
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="check the dump files against their manifest and report [default: %(default)s]",
+        )
         parser.add_argument("--tryit", action="store_true", help="open the try it! URL [default: %(default)s]")
 
         return parser
@@ -95,7 +143,30 @@ class RdfDumpCmd(BaseCmd):
         downloader = RdfDumpDownloader(dataset=dataset, output_path=dataset_dir, args=self.args)
 
         chunk_count = downloader.download()
-        print(f"Dataset {dataset_name}: Downloaded {chunk_count} {self.rdf_format.extension} files.")
+        extension = f"{self.rdf_format.extension}{downloader.compression.suffix}"
+        print(f"Dataset {dataset_name}: Downloaded {chunk_count} {extension} files.")
+
+    def verify_dataset(self, dataset_name: str, output_path: str) -> bool:
+        """
+        Verify the dump files of the given dataset against their manifest.
+
+        Args:
+            dataset_name: name of dataset
+            output_path: base output directory
+
+        Returns:
+            True if every recorded chunk matches its file
+        """
+        dataset_dir = Path(output_path) / dataset_name
+        manifest = DumpManifest.of_dir(dataset_dir)
+        print(manifest.summary())
+        problems = manifest.verify(dataset_dir)
+        for file_name, problem in problems.items():
+            print(f"❌ {file_name}: {problem}")
+        if not problems:
+            print(f"✅ {len(manifest.chunks)} chunks of {dataset_name} verified")
+        ok = not problems
+        return ok
 
     def handle_args(self, args: Namespace):
         """
@@ -138,6 +209,10 @@ class RdfDumpCmd(BaseCmd):
             for dataset_name, dataset in datasets.items():
                 self.download_dataset(dataset_name, dataset, output_path)
 
+        if self.args.verify:
+            for dataset_name in datasets.keys():
+                self.verify_dataset(dataset_name, output_path)
+
 
 def main():
     RdfDumpCmd.main()
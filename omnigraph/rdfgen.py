@@ -0,0 +1,200 @@
+"""
+Created on 2026-10-17
+
+Synthetic RDF dumps for offline load and query timing
+
+@author: wf
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_manifest import ChunkRecord, DumpManifest
+
+
+@dataclass
+class RdfGenConfig:
+    """
+    the shape of a synthetic dataset
+    """
+
+    triples: int = 10000
+    seed: int = 42  # the same seed gives the same dump
+    chunk_size: int = 100000  # triples per dump file
+    fan_out: int = 10  # triples per subject - the first one is its rdf:type
+    predicates: int = 10  # distinct predicates
+    classes: int = 5  # distinct classes
+    link_ratio: float = 0.3  # share of objects linking to another subject
+    typed_ratio: float = 0.5  # share of literals with a datatype
+    literal_size: int = 16  # mean length of the string literals
+    literal_distribution: str = "uniform"  # fixed, uniform or exponential
+
+
+class RdfGenerator:
+    """
+    Writes deterministic, seeded N-Triples compatible Turtle dumps in the
+    dump_NNNNNN chunk layout of the RdfDumpDownloader - with a manifest.json,
+    so that the dumps verify like downloaded ones.
+    """
+
+    base_iri = "http://example.org/gen/"
+    rdf_type = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+    xsd = "http://www.w3.org/2001/XMLSchema#"
+    literal_distributions = ["fixed", "uniform", "exponential"]
+
+    def __init__(self, triples: int = None, seed: int = None, config: RdfGenConfig = None, **kwargs):
+        """
+        Initialize the generator.
+
+        Args:
+            triples: the number of triples to generate - overrides the config
+            seed: the random seed - overrides the config
+            config: the shape of the dataset
+            **kwargs: further RdfGenConfig fields overriding the config
+        """
+        self.config = config or RdfGenConfig()
+        if triples is not None:
+            self.config.triples = triples
+        if seed is not None:
+            self.config.seed = seed
+        for key, value in kwargs.items():
+            setattr(self.config, key, value)
+        if self.config.literal_distribution not in self.literal_distributions:
+            raise ValueError(f"invalid literal distribution {self.config.literal_distribution}")
+        self.rng = None
+
+    @property
+    def subject_count(self) -> int:
+        fan_out = max(1, self.config.fan_out)
+        subject_count = max(1, -(-self.config.triples // fan_out))
+        return subject_count
+
+    def literal_length(self) -> int:
+        """
+        Draw the length of the next string literal.
+        """
+        mean = max(1, self.config.literal_size)
+        distribution = self.config.literal_distribution
+        if distribution == "fixed":
+            length = mean
+        elif distribution == "uniform":
+            length = self.rng.randint(1, 2 * mean - 1)
+        else:
+            length = max(1, int(self.rng.expovariate(1 / mean)))
+        return length
+
+    def string_literal(self) -> str:
+        """
+        the next string literal - lowercase words without characters to escape
+        """
+        length = self.literal_length()
+        chars = "abcdefghijklmnopqrstuvwxyz     "
+        text = "".join(self.rng.choice(chars) for _i in range(length))
+        literal = f'"{text}"'
+        return literal
+
+    def typed_literal(self) -> str:
+        """
+        the next literal with a datatype
+        """
+        rng = self.rng
+        kind = rng.randrange(6)
+        day = f"{rng.randint(1900, 2030):04d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if kind == 0:
+            value, datatype = str(rng.randint(-(10**6), 10**6)), "integer"
+        elif kind == 1:
+            value, datatype = f"{rng.uniform(-1000, 1000):.2f}", "decimal"
+        elif kind == 2:
+            value, datatype = f"{rng.uniform(-1, 1):.6e}", "double"
+        elif kind == 3:
+            value, datatype = rng.choice(["true", "false"]), "boolean"
+        elif kind == 4:
+            value, datatype = day, "date"
+        else:
+            value, datatype = f"{day}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z", "dateTime"
+        literal = f'"{value}"^^<{self.xsd}{datatype}>'
+        return literal
+
+    def triple_lines(self) -> Iterator[str]:
+        """
+        Generate the triples as lines - every call from the start of the seed.
+
+        Returns:
+            iterator of N-Triples lines
+        """
+        config = self.config
+        self.rng = random.Random(config.seed)
+        fan_out = max(1, config.fan_out)
+        subject_count = self.subject_count
+        for index in range(config.triples):
+            subject_index, position = divmod(index, fan_out)
+            subject = f"<{self.base_iri}s{subject_index}>"
+            if position == 0:
+                predicate = self.rdf_type
+                obj = f"<{self.base_iri}C{subject_index % max(1, config.classes)}>"
+            else:
+                predicate = f"<{self.base_iri}p{(position - 1) % max(1, config.predicates)}>"
+                draw = self.rng.random()
+                if draw < config.link_ratio:
+                    obj = f"<{self.base_iri}s{self.rng.randrange(subject_count)}>"
+                elif self.rng.random() < config.typed_ratio:
+                    obj = self.typed_literal()
+                else:
+                    obj = self.string_literal()
+            yield f"{subject} {predicate} {obj} .\n"
+
+    def generate(self, output_dir: Path, compression: DumpCompression = DumpCompression.NONE) -> List[Path]:
+        """
+        Write the dump files and their manifest - replacing the dump files
+        and manifest the directory already has.
+
+        Args:
+            output_dir: the directory for the dump files
+            compression: the compression of the dump files
+
+        Returns:
+            the paths of the written dump files
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for stale in output_dir.glob("dump_*"):
+            stale.unlink()
+        manifest = DumpManifest()
+        manifest.path = DumpManifest.manifest_path(output_dir)
+        manifest.dataset = f"rdfgen seed {self.config.seed}"
+        manifest.endpoint = "rdfgen"
+        chunk_size = max(1, self.config.chunk_size)
+        paths = []
+        f = None
+
+        def close_chunk():
+            f.close()
+            path = paths[-1]
+            offset = (len(paths) - 1) * chunk_size
+            record = ChunkRecord(
+                file_name=path.name,
+                offset=offset,
+                limit=chunk_size,
+                byte_size=path.stat().st_size,
+                sha256=DumpManifest.file_sha256(path),
+                approx_triple_count=min(chunk_size, self.config.triples - offset),
+                latency=0.0,
+                endpoint="rdfgen",
+            )
+            manifest.add(record)
+
+        for index, line in enumerate(self.triple_lines()):
+            if index % chunk_size == 0:
+                if f:
+                    close_chunk()
+                path = output_dir / f"dump_{len(paths):06d}.ttl{compression.suffix}"
+                paths.append(path)
+                f = compression.open_write(path)
+            f.write(line.encode("utf-8"))
+        if f:
+            close_chunk()
+        manifest.save()
+        return paths
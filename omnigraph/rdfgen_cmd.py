@@ -0,0 +1,136 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+
+Command line interface for synthetic RDF dump generation.
+"""
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+from omnigraph.basecmd import BaseCmd
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_manifest import DumpManifest
+from omnigraph.rdfgen import RdfGenConfig, RdfGenerator
+
+
+class RdfGenCmd(BaseCmd):
+    """
+    Command line interface for synthetic RDF dump generation.
+    """
+
+    def __init__(self):
+        """
+        Initialize command line interface.
+        """
+        super().__init__(description="Generate deterministic synthetic RDF dumps for offline load and query timing")
+
+    def get_arg_parser(self, description: str, version_msg: str) -> ArgumentParser:
+        """
+        Extend base parser with generator arguments.
+
+        Args:
+            description: CLI description string
+            version_msg: version display string
+
+        Returns:
+            ArgumentParser: extended argument parser
+        """
+        parser = super().get_arg_parser(description, version_msg)
+        defaults = RdfGenConfig()
+        parser.add_argument(
+            "-t", "--triples", type=int, default=defaults.triples, help="number of triples [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=defaults.seed,
+            help="seed - the same seed gives the same dump [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=defaults.chunk_size, help="triples per dump file [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--fan-out", type=int, default=defaults.fan_out, help="triples per subject [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--predicates", type=int, default=defaults.predicates, help="distinct predicates [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--classes", type=int, default=defaults.classes, help="distinct classes [default: %(default)s]"
+        )
+        parser.add_argument(
+            "--link-ratio",
+            type=float,
+            default=defaults.link_ratio,
+            help="share of objects linking to another subject [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--typed-ratio",
+            type=float,
+            default=defaults.typed_ratio,
+            help="share of literals with a datatype [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--literal-size",
+            type=int,
+            default=defaults.literal_size,
+            help="mean length of the string literals [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--literal-distribution",
+            choices=RdfGenerator.literal_distributions,
+            default=defaults.literal_distribution,
+            help="distribution of the string literal lengths [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--compress",
+            choices=["gz", "zst"],
+            default=None,
+            help="compress the dump files with gzip or zstd [default: %(default)s]",
+        )
+        parser.add_argument("--name", help="name of the dump directory - gen_<triples>_<seed> if not specified")
+        parser.add_argument("--output-path", default=".", help="Path for dump files")
+        parser.add_argument(
+            "-4o",
+            "--for-omnigraph",
+            action="store_true",
+            help="store dump at default omnigraph location [default: %(default)s]",
+        )
+        return parser
+
+    def handle_args(self, args: Namespace):
+        """
+        Handle parsed CLI arguments.
+
+        Args:
+            args: parsed namespace
+        """
+        super().handle_args(args)
+        if self.args.about:
+            self.about()
+        config = RdfGenConfig(
+            triples=args.triples,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            fan_out=args.fan_out,
+            predicates=args.predicates,
+            classes=args.classes,
+            link_ratio=args.link_ratio,
+            typed_ratio=args.typed_ratio,
+            literal_size=args.literal_size,
+            literal_distribution=args.literal_distribution,
+        )
+        output_path = self.ogp.dumps_dir if args.for_omnigraph else Path(args.output_path)
+        name = args.name or f"gen_{args.triples}_{args.seed}"
+        dump_dir = Path(output_path) / name
+        generator = RdfGenerator(config=config)
+        paths = generator.generate(dump_dir, DumpCompression.by_label(args.compress))
+        if not self.quiet:
+            print(DumpManifest.of_dir(dump_dir).summary())
+            print(f"Generated {len(paths)} dump files in {dump_dir}")
+
+
+def main():
+    RdfGenCmd.main()
@@ -103,6 +103,8 @@ class ServerStatus:
     docker_exit_code: Optional[int] = None
     # fields to be initialized by post_init
     logs: str = field(default=None)
+    # all ready_log_patterns of the server showed up in the log of the current boot
+    ready_logged: bool = False
     triple_count: int = field(default=None)
     timestamp: datetime = field(default=None)
     status_dict: Dict[str, str] = field(default_factory=dict)
@@ -133,7 +135,15 @@ class ServerEnv:
     """
 
     def __init__(
-        self, log: Log = None, shell: Shell = None, force: bool = False, debug: bool = False, verbose: bool = False
+        self,
+        log: Log = None,
+        shell: Shell = None,
+        force: bool = False,
+        debug: bool = False,
+        verbose: bool = False,
+        load_workers: int = 1,
+        docker_backend: str = "cli",
+        count_triples: bool = False,
     ):
         """
         Initialize server environment.
@@ -144,6 +154,10 @@ class ServerEnv:
             force: if True enable actions that are otherwise protected e.g. deletion of data
             debug: Enable debug mode
             verbose: Enable verbose output
+            load_workers: number of files to liveload concurrently - for servers with concurrent_writes
+            docker_backend: cli to run the docker command or api to talk to the Docker Engine API
+                over its unix socket - falling back to the cli if the socket is not available
+            count_triples: count the triples where it is optional e.g. before and after a liveload
         """
         if log is None:
             log = Log()
@@ -155,6 +169,9 @@ class ServerEnv:
         self.force = force
         self.debug = debug
         self.verbose = verbose
+        self.load_workers = max(1, load_workers or 1)
+        self.docker_backend = docker_backend
+        self.count_triples = count_triples
 
 
 @dataclass
@@ -198,6 +215,22 @@ class ServerConfig:
     ready_timeout: int = 20
     proxy_timeout: int = 5400  # e.g. apache server
     upload_timeout: int = 300
+    # the server takes uploads of several files at the same time - liveload
+    # then uses the load_workers of the environment, else one file at a time
+    concurrent_writes: bool = False
+    # triples per liveload request - N-Triples and Turtle dumps are split into
+    # batches of about this size, None uploads every file whole
+    liveload_batch_size: Optional[int] = None
+    # Content-Encodings e.g. gzip the upload endpoint decompresses itself -
+    # compressed dumps are decompressed client side for any other server
+    upload_content_encodings: Optional[list] = field(default_factory=list)
+    # the keep-alive connection pool of the server's requests session - probes
+    # and uploads reuse its connections instead of paying TCP/TLS setup each time
+    pool_size: int = 10  # connections kept alive per host
+    max_retries: int = 0  # retries of failed connects and of idempotent requests on 502/503/504
+    retry_backoff: float = 0.5  # backoff factor between these retries
+    # seconds a triple count is reused - loads and clears forget it earlier, 0 counts every time
+    triple_count_ttl: float = 30.0
     unforced_clear_limit = 100000  # maximumn number of triples that can be cleared without force option
     # fields to be configured by post_init
     base_url: Optional[str] = field(default=None)
@@ -7,9 +7,11 @@ Franz AllegroGraph SPARQL support
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
 from omnigraph.server_config import ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import Response, ServerConfig, ServerEnv, SparqlServer
+from omnigraph.upload_stream import UploadContent
 
 
 @dataclass
@@ -65,6 +67,8 @@ class AllegroGraph(SparqlServer):
     Dockerized Franz AllegroGraph SPARQL server
     """
 
+    ready_log_patterns = ["scheduler process started"]
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the AllegroGraph manager.
@@ -121,6 +125,16 @@ class AllegroGraph(SparqlServer):
             self.repo_created = True
         return available
 
+    def get_native_triple_count(self) -> Optional[int]:
+        """
+        the size AllegroGraph keeps per repository
+        """
+        triple_count = None
+        response = self.make_request("GET", f"{self.config.base_url}/repositories/{self.config.dataset}/size")
+        if response.success:
+            triple_count = int(response.response.text.strip())
+        return triple_count
+
     def status(self) -> ServerStatus:
         """
         Get server status information.
@@ -129,8 +143,7 @@ class AllegroGraph(SparqlServer):
             ServerStatus object with status information
         """
         server_status = super().status()
-        logs = server_status.logs
-        if logs and "scheduler process started" in logs and self.endpoint_answers():
+        if server_status.ready_logged and self.endpoint_answers():
             server_status.at = ServerLifecycleState.READY
         if server_status.at == ServerLifecycleState.READY and self.repo_created:
             self.add_triple_count2_server_status(server_status)
@@ -155,6 +168,7 @@ class AllegroGraph(SparqlServer):
                 data={"update": update_query},
                 timeout=self.config.upload_timeout,
             )
+            self.invalidate_triple_count()
             result = resp.response
             if not resp.success:
                 status = resp.response.status_code if resp.response else "unknown"
@@ -163,12 +177,13 @@ class AllegroGraph(SparqlServer):
             error = ex
         return result, error
 
-    def upload_request(self, file_content: bytes) -> Response:
+    def upload_request(self, file_content: UploadContent, content_encoding: Optional[str] = None) -> Response:
         """
         Upload RDF via the statements endpoint of the repository.
 
         Args:
-            file_content: the RDF payload to upload
+            file_content: the RDF payload to upload - bytes or a stream
+            content_encoding: the Content-Encoding of a compressed payload
 
         Returns:
             Response of the upload request
@@ -176,7 +191,7 @@ class AllegroGraph(SparqlServer):
         response = self.make_request(
             "POST",
             self.config.upload_url,
-            headers={"Content-Type": self.rdf_format.mime_type},
+            headers=self.get_upload_headers(content_encoding),
             data=file_content,
             timeout=self.config.upload_timeout,
         )
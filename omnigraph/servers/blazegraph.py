@@ -6,10 +6,11 @@ Created on 2025-05-27
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 import re
 import os
-import shutil
 
+from omnigraph.dump_compression import DumpCompression
 from omnigraph.server_config import LoadPath, ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import ServerConfig, ServerEnv, SparqlServer
 
@@ -146,10 +147,11 @@ class Blazegraph(SparqlServer):
             # stage the dumps under data_dir so the container sees them at /data/dumps
             stage_dir = Path(self.config.base_data_dir) / "dumps"
             stage_dir.mkdir(parents=True, exist_ok=True)
-            for file in files:
-                target = stage_dir / file.name
-                if not target.exists():
-                    shutil.copy2(file, target)
+            # the DataLoader reads gzip itself - zstd dumps are decompressed into the stage
+            native = (DumpCompression.NONE, DumpCompression.GZ)
+            loader_files = self.stage_decompressed(files, stage_dir, native=native)
+            # the running container would not see a bind mount made below its volume now
+            self.stage_files(loader_files, stage_dir)
             xml = self.get_dataloader_xml("/data/dumps")
             response = self.make_request(
                 "POST",
@@ -166,6 +168,19 @@ class Blazegraph(SparqlServer):
                 self.log.log("❌", container_name, f"DataLoader failed: {error_msg}")
         return loaded_count
 
+    def get_native_triple_count(self) -> Optional[int]:
+        """
+        the fast range count of the namespace - Blazegraph answers ESTCARD
+        requests from its index counters without visiting the triples
+        """
+        triple_count = None
+        response = self.make_request("GET", self.config.sparql_url, params={"ESTCARD": ""})
+        if response.success:
+            match = re.search(r'rangeCount="(\d+)"', response.response.text)
+            if match:
+                triple_count = int(match.group(1))
+        return triple_count
+
     def status(self) -> ServerStatus:
         """
         Get server status information.
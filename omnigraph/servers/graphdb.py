@@ -7,6 +7,8 @@ Ontotext GraphDB SPARQL support
 """
 
 from dataclasses import dataclass
+from typing import Optional
+
 from omnigraph.server_config import ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import ServerConfig, ServerEnv, SparqlServer
 
@@ -73,6 +75,8 @@ class GraphDB(SparqlServer):
     Dockerized Ontotext GraphDB SPARQL server
     """
 
+    ready_log_patterns = ["Started GraphDB"]
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the GraphDB manager.
@@ -163,6 +167,7 @@ class GraphDB(SparqlServer):
                 data={"update": update_query},
                 timeout=self.config.upload_timeout,
             )
+            self.invalidate_triple_count()
             result = resp.response
             if not resp.success:
                 status = resp.response.status_code if resp.response else "unknown"
@@ -171,6 +176,18 @@ class GraphDB(SparqlServer):
             error = ex
         return result, error
 
+    def get_native_triple_count(self) -> Optional[int]:
+        """
+        the size GraphDB keeps per repository - the total of explicit and
+        inferred statements as COUNT(*) sees them
+        """
+        triple_count = None
+        response = self.make_request("GET", f"{self.config.base_url}/rest/repositories/{self.config.dataset}/size")
+        if response.success:
+            size = response.response.json()
+            triple_count = int(size["total"]) if isinstance(size, dict) else int(size)
+        return triple_count
+
     def status(self) -> ServerStatus:
         """
         Check GraphDB server status from container logs.
@@ -179,12 +196,10 @@ class GraphDB(SparqlServer):
         ServerStatus object with status information
         """
         server_status = super().status()
-        logs = server_status.logs
-        if logs:
-            # the log line survives a restart, so it only qualifies the container -
-            # readiness is decided by the endpoint answering, as for jena, #50
-            if "Started GraphDB" in logs and self.endpoint_answers():
-                server_status.at = ServerLifecycleState.READY
+        # the log line survives a restart, so it only qualifies the container -
+        # readiness is decided by the endpoint answering, as for jena, #50
+        if server_status.ready_logged and self.endpoint_answers():
+            server_status.at = ServerLifecycleState.READY
 
         if server_status.at == ServerLifecycleState.READY:
             if self.repo_created:
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List
 
+from omnigraph.dump_compression import DumpCompression
 from omnigraph.server_config import LoadPath, ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import ServerConfig, ServerEnv, SparqlServer
 
@@ -62,6 +63,8 @@ class Jena(SparqlServer):
     Dockerized Jena Fuseki SPARQL server
     """
 
+    ready_log_patterns = ["Creating dataset", r"Fuseki is available :-\)"]
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the Jena Fuseki manager.
@@ -80,10 +83,9 @@ class Jena(SparqlServer):
         ServerStatus object with status information
         """
         server_status = super().status()
-        logs = server_status.logs
         # the log lines survive a restart, so they only qualify the container -
         # readiness is decided by the endpoint answering, see issue #50
-        if logs and "Creating dataset" in logs and "Fuseki is available :-)" in logs:
+        if server_status.ready_logged:
             if self.endpoint_answers():
                 server_status.at = ServerLifecycleState.READY
 
@@ -113,14 +115,19 @@ class Jena(SparqlServer):
         single-writer - the server must be stopped while the loader runs.
 
         Args:
-            files: dump files to load (from the dumps directory)
+            files: dump files to load (from the dumps directory or the stage directory)
 
         Returns:
             the docker run command string
         """
         loc = f"/fuseki/databases/{self.config.dataset}"
         dumps_dir = Path(self.config.dumps_dir)
-        file_args = " ".join(f"/dumps/{file.name}" for file in files)
+        # decompressed dumps are staged in the data directory mounted at /fuseki
+        stage_dir = self.get_stage_dir() if self.config.base_data_dir else None
+        file_args = " ".join(
+            f"/fuseki/{stage_dir.name}/{file.name}" if file.parent == stage_dir else f"/dumps/{file.name}"
+            for file in files
+        )
         command = (
             f"docker run --rm {self.config.docker_user_flag} --entrypoint java "
             f"-v {self.config.base_data_dir}:/fuseki "
@@ -131,6 +138,13 @@ class Jena(SparqlServer):
         )
         return command
 
+    def get_stage_dir(self) -> Path:
+        """
+        the directory zstd dumps are decompressed into for tdb2.tdbloader
+        """
+        stage_dir = Path(self.config.base_data_dir) / "staged_dumps"
+        return stage_dir
+
     @property
     def load_paths(self) -> list:
         return [LoadPath.LIVELOAD, LoadPath.BULKLOAD]
@@ -154,6 +168,9 @@ class Jena(SparqlServer):
         if not files:
             self.log.log("⚠️", container_name, f"No dump files found for pattern: {file_pattern}")
         else:
+            # RIOT reads gzip by the file suffix - zstd is decompressed first
+            native = (DumpCompression.NONE, DumpCompression.GZ)
+            files = self.stage_decompressed(files, self.get_stage_dir(), native=native)
             self.stop()
             loader_cmd = self.get_tdbloader_command(files)
             shell_result = self.run_shell_command(
@@ -15,13 +15,26 @@ with the prompt:
 @author: wf
 """
 
+import os
+import re
+import shlex
 import shutil
-from dataclasses import dataclass
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 
+from basemkit.yamlable import lod_storable
+from tqdm import tqdm
 
+from omnigraph.dump_compression import DumpCompression
 from omnigraph.server_config import LoadPath, ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import Response, ServerConfig, ServerEnv, SparqlServer
+from omnigraph.upload_stream import UploadContent
 
 
 @dataclass
@@ -73,6 +86,39 @@ class MillenniumDBConfig(ServerConfig):
         return docker_run_command
 
 
+@dataclass
+class BuildRecord:
+    """
+    timing of a single MillenniumDB build - for comparison between runs
+    """
+
+    started_at: str
+    files: int
+    byte_size: int  # of the uncompressed input
+    prepare_secs: float  # staging, decompression and validation
+    import_secs: float
+    triples: int = 0
+    triples_per_sec: float = 0.0
+
+
+@lod_storable
+class BuildHistory:
+    """
+    the builds of a MillenniumDB database - kept next to it
+    """
+
+    dataset: Optional[str] = None
+    builds: List[BuildRecord] = field(default_factory=list)
+
+    @classmethod
+    def of_path(cls, path: Path) -> "BuildHistory":
+        """
+        Load the history at the given path - an empty one if there is none yet.
+        """
+        history = cls.load_from_json_file(str(path)) if path.exists() else cls()
+        return history
+
+
 class MillenniumDB(SparqlServer):
     """
     Dockerized MillenniumDB SPARQL server
@@ -112,65 +158,273 @@ class MillenniumDB(SparqlServer):
                 f"Database already exists at {db_dir}"
             )
             return
-        if db_dir.exists():
-            # the leftovers of an aborted import - mdb import refuses a non
-            # empty target directory, so the stale remains have to go first
-            shutil.rmtree(db_dir)
-            self.log.log("⚠️", self.config.container_name, f"removed stale database remains at {db_dir}")
+        record = self.build_database()
+        if record is None:
+            raise RuntimeError(f"mdb-import of {self.config.dataset} failed")
+        self.record_build(record)
 
-        # Find RDF files to import
-        dumps_dir = Path(self.config.dumps_dir) if self.config.dumps_dir else data_dir
-        rdf_files = list(dumps_dir.glob(f"*{self.rdf_format.extension}"))
+    def get_import_files(self, file_pattern: str = None) -> List[Path]:
+        """
+        Get the dump files to import - from the dumps_dir or else the data directory.
 
-        if not rdf_files:
-            self.log.log("⚠️", self.config.container_name, f"No RDF files found in {dumps_dir}")
-            # mdb import refuses to run without input files, so an empty store is
-            # produced from an empty dump - the database has to exist to be served
-            empty_dir = data_dir / "empty_dumps"
-            empty_dir.mkdir(parents=True, exist_ok=True)
-            empty_file = empty_dir / f"empty{self.rdf_format.extension}"
-            empty_file.write_text("")
-            dumps_dir = empty_dir
-            import_files = [str(empty_file)]
+        Args:
+            file_pattern: Glob pattern for dump files
+
+        Returns:
+            sorted list of dump file paths
+        """
+        if self.config.dumps_dir:
+            files = self.get_dump_files(file_pattern)
         else:
-            import_files = [str(f) for f in rdf_files]
+            data_dir = Path(self.config.base_data_dir)
+            files = sorted(
+                {
+                    file
+                    for compression in DumpCompression
+                    for file in data_dir.glob(f"*{self.rdf_format.extension}{compression.suffix}")
+                }
+            )
+        return files
 
-        # Run mdb-import to create database
-        self.log.log(
-            "✅",
-            self.config.container_name,
-            f"Importing {len(import_files)} files into database..."
-        )
+    @staticmethod
+    def validate_dump(path: Path) -> Optional[str]:
+        """
+        Check that the given plain dump file ends with a complete statement -
+        a truncated download is found before the import instead of by it.
+
+        Args:
+            path: the uncompressed dump file
+
+        Returns:
+            the problem found or None if the file looks complete
+        """
+        problem = None
+        size = path.stat().st_size
+        with open(path, "rb") as f:
+            f.seek(max(0, size - 65536))
+            tail = f.read().decode("utf-8", errors="replace")
+        lines = [line.strip() for line in tail.splitlines()]
+        content = [line for line in lines if line and not line.startswith("#")]
+        if content:
+            last_line = content[-1]
+            if not (last_line.endswith(".") or re.search(r"\.\s*#[^\"'>]*$", last_line)):
+                problem = f"{path.name} ends with an incomplete statement: {last_line[-60:]}"
+        return problem
+
+    def prepare_dump(self, file: Path, stage_dir: Path) -> Path:
+        """
+        Make the given dump file readable for mdb import and validate it - a plain
+        file is read where it is, a compressed one is decompressed into the stage directory.
+
+        Args:
+            file: the dump file - possibly compressed
+            stage_dir: the directory for the decompressed files
 
-        # Build import command
-        # Map both dumps_dir and data_dir to container
-        files_arg = " ".join([f"/import/{Path(f).name}" for f in import_files])
+        Returns:
+            the plain file to import
+
+        Raises:
+            ValueError: if the dump is incomplete
+        """
+        plain_file = self.stage_decompressed([file], stage_dir)[0]
+        problem = self.validate_dump(plain_file)
+        if problem:
+            raise ValueError(problem)
+        return plain_file
+
+    def prepare_dumps(self, files: List[Path], stage_dir: Path) -> List[Path]:
+        """
+        Decompress and validate the dump files in parallel.
+
+        Args:
+            files: the dump files
+            stage_dir: the directory for the decompressed files
 
+        Returns:
+            the plain files in the order of the dump files
+
+        Raises:
+            ValueError: listing every incomplete dump
+        """
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        wanted = {
+            DumpCompression.of_path(file).strip_suffix(file.name)
+            for file in files
+            if DumpCompression.of_path(file) != DumpCompression.NONE
+        }
+        for stale in stage_dir.iterdir():
+            if stale.name not in wanted:
+                stale.unlink()
+        workers = min(len(files), os.cpu_count() or 1) or 1
+        plain_files = []
+        problems = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.prepare_dump, file, stage_dir) for file in files]
+            for future in futures:
+                try:
+                    plain_files.append(future.result())
+                except ValueError as ex:
+                    problems.append(str(ex))
+        if problems:
+            raise ValueError("; ".join(problems))
+        return plain_files
+
+    def get_import_command(self, import_files: List[Path], data_dir: Path) -> List[str]:
+        """
+        Get the mdb import command for the given files - the directories of the
+        files outside the data directory are mounted read-only instead of staging
+        the files, so a big plain dump is not copied.
+
+        Args:
+            import_files: the plain files on the host
+            data_dir: the host data directory - mounted at /data
+
+        Returns:
+            the docker run command as argument list
+        """
+        mounts = {}
+        container_files = []
+        for file in (file.resolve() for file in import_files):
+            if file.is_relative_to(data_dir.resolve()):
+                container_files.append(f"/data/{file.relative_to(data_dir.resolve()).as_posix()}")
+            else:
+                if file.parent not in mounts:
+                    mounts[file.parent] = f"/import{len(mounts) or ''}"
+                container_files.append(f"{mounts[file.parent]}/{file.name}")
         # run as the invoking user - a root owned database in the bind mount can
         # not be removed by the test user, which is what broke CI
-        import_cmd = (
-            f"docker run --rm {self.config.docker_platform_flag}{self.config.docker_user_flag} "
-            f"-v {dumps_dir}:/import "
-            f"-v {data_dir}:/data "
-            f"{self.config.image} "
-            f"mdb import {files_arg} /data/{self.config.dataset}"
-        )
+        import_cmd = ["docker", "run", "--rm"]
+        import_cmd.extend(shlex.split(self.config.docker_platform_flag))
+        import_cmd.extend(shlex.split(self.config.docker_user_flag))
+        for host_dir, container_dir in mounts.items():
+            import_cmd.extend(["-v", f"{host_dir}:{container_dir}:ro"])
+        import_cmd.extend(["-v", f"{data_dir}:/data", self.config.image, "mdb", "import"])
+        import_cmd.extend(container_files)
+        import_cmd.append(f"/data/{self.config.dataset}")
+        return import_cmd
+
+    def run_import(self, import_cmd: List[str]) -> tuple:
+        """
+        Run the import streaming its output into a progress bar of the triples reported.
 
-        import_result = self.shell.run(import_cmd, tee=self.verbose)
+        Args:
+            import_cmd: the import command as argument list
 
-        if import_result.returncode != 0:
-            self.log.log(
-                "❌",
-                self.config.container_name,
-                f"Import failed: {import_result.stderr}"
+        Returns:
+            (returncode, the last triple count reported, the last lines of output)
+        """
+        triples_re = re.compile(r"([\d][\d,.']*)\s+triples", re.IGNORECASE)
+        tail = deque(maxlen=20)
+        triples = 0
+        try:
+            process = subprocess.Popen(
+                import_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
             )
-            raise RuntimeError(f"mdb-import failed: {import_result.stderr}")
+        except OSError as ex:
+            return 127, triples, [f"{import_cmd[0]}: {ex}"]
+        with tqdm(desc=f"mdb import {self.config.dataset}", unit=" triples", unit_scale=True, leave=False) as pbar:
+            for line in process.stdout:
+                tail.append(line.rstrip())
+                if self.verbose:
+                    print(line, end="")
+                match = triples_re.search(line)
+                if match:
+                    count = int(re.sub(r"[,.']", "", match.group(1)))
+                    if count > triples:
+                        pbar.update(count - triples)
+                        triples = count
+                else:
+                    pbar.set_postfix_str(line.strip()[:40])
+        returncode = process.wait()
+        return returncode, triples, list(tail)
+
+    def get_build_history_path(self) -> Path:
+        """
+        the build history next to the database
+        """
+        history_path = Path(self.config.base_data_dir) / f"{self.config.dataset}.builds.json"
+        return history_path
 
-        self.log.log(
-            "✅",
-            self.config.container_name,
-            f"Database created at {db_dir}"
+    def record_build(self, record: BuildRecord):
+        """
+        Add the given build to the history and compare it with the previous one.
+
+        Args:
+            record: the BuildRecord
+        """
+        if record.import_secs > 0:
+            record.triples_per_sec = record.triples / record.import_secs
+        history_path = self.get_build_history_path()
+        history = BuildHistory.of_path(history_path)
+        history.dataset = self.config.dataset
+        msg = (
+            f"imported {record.triples:,} triples from {record.files} file(s) in "
+            f"{record.prepare_secs:.1f}+{record.import_secs:.1f} s - {record.triples_per_sec:,.0f} triples/s"
         )
+        if history.builds:
+            msg += f" (previous build: {history.builds[-1].triples_per_sec:,.0f} triples/s)"
+        history.builds.append(record)
+        history.save_to_json_file(str(history_path), indent=2)
+        self.log.log("✅", self.config.container_name, msg)
+
+    def build_database(self, file_pattern: str = None) -> Optional[BuildRecord]:
+        """
+        Build the database with mdb import - stage, decompress and validate the
+        dumps in parallel, then import them with the progress shown.
+
+        Args:
+            file_pattern: Glob pattern for dump files
+
+        Returns:
+            the BuildRecord of the import - to be recorded by the caller - or None if it failed
+        """
+        container_name = self.config.container_name
+        data_dir = Path(self.config.base_data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        db_dir = data_dir / self.config.dataset
+        if db_dir.exists():
+            # the leftovers of an aborted import - mdb import refuses a non
+            # empty target directory, so the stale remains have to go first
+            shutil.rmtree(db_dir)
+            self.log.log("⚠️", container_name, f"removed stale database remains at {db_dir}")
+        record = None
+        started_at = datetime.now().isoformat()
+        prepare_start = time.time()
+        files = self.get_import_files(file_pattern)
+        stage_dir = data_dir / "staged_dumps"
+        if not files:
+            self.log.log("⚠️", container_name, "No RDF files found to import")
+            # mdb import refuses to run without input files, so an empty store is
+            # produced from an empty dump - the database has to exist to be served
+            empty_dir = data_dir / "empty_dumps"
+            empty_dir.mkdir(parents=True, exist_ok=True)
+            files = [empty_dir / f"empty{self.rdf_format.extension}"]
+            files[0].write_text("")
+        try:
+            plain_files = self.prepare_dumps(files, stage_dir)
+        except ValueError as ex:
+            self.log.log("❌", container_name, f"invalid dumps: {ex}")
+            return record
+        prepare_secs = time.time() - prepare_start
+        byte_size = sum(file.stat().st_size for file in plain_files)
+        self.log.log("✅", container_name, f"Importing {len(plain_files)} files into database...")
+        import_start = time.time()
+        returncode, triples, tail = self.run_import(self.get_import_command(plain_files, data_dir))
+        import_secs = time.time() - import_start
+        if returncode != 0:
+            output = "\n".join(tail)
+            self.log.log("❌", container_name, f"Import failed: {output}")
+        else:
+            record = BuildRecord(
+                started_at=started_at,
+                files=len(plain_files),
+                byte_size=byte_size,
+                prepare_secs=prepare_secs,
+                import_secs=import_secs,
+                triples=triples,
+            )
+            self.log.log("✅", container_name, f"Database created at {db_dir}")
+        return record
 
     def status(self) -> ServerStatus:
         """
@@ -200,7 +454,7 @@ class MillenniumDB(SparqlServer):
 
         return server_status
 
-    def upload_request(self, file_content: bytes) -> Response:
+    def upload_request(self, file_content: UploadContent, content_encoding: Optional[str] = None) -> Response:
         """
         MillenniumDB doesn't support HTTP upload.
         Data must be imported using mdb-import before server starts.
@@ -231,11 +485,17 @@ class MillenniumDB(SparqlServer):
 
     def build_from_dump_files(self, file_pattern: str = None) -> int:
         """
-        Override load_dump_files to explain MillenniumDB's import process.
+        Rebuild the database from the dump files and restart the server on it.
 
         For MillenniumDB, data must be imported during database creation,
-        not after the server is running. This method will restart the server
-        with a fresh import if called.
+        not after the server is running - the import runs before the restart,
+        so a failed import is reported by the build, not by the start.
+
+        Args:
+            file_pattern: Glob pattern for dump files
+
+        Returns:
+            Number of files loaded successfully
         """
         self.log.log(
             "ℹ️",
@@ -247,20 +507,12 @@ class MillenniumDB(SparqlServer):
         self.stop()
         self.rm()
 
-        # Remove existing database directory to force reimport
-        db_dir = Path(self.config.base_data_dir) / self.config.dataset
-        if db_dir.exists():
-            shutil.rmtree(db_dir)
-            self.log.log(
-                "✅",
-                self.config.container_name,
-                f"Removed existing database at {db_dir}"
-            )
-
-        # Start will trigger pre_create which does the import
-        started = self.start()
-
-        if started:
+        loaded_count = 0
+        record = self.build_database(file_pattern)
+        # the database is a new one - whether the import succeeded or not
+        self.invalidate_triple_count()
+        if record is not None and self.start():
+            loaded_count = record.files
             # Count triples to verify import
             count = self.count_triples()
             self.log.log(
@@ -268,9 +520,12 @@ class MillenniumDB(SparqlServer):
                 self.config.container_name,
                 f"Database imported with {count:,} triples"
             )
-            return 1  # Return 1 to indicate success
-        else:
-            return 0
+            if not record.triples:
+                # the import output did not report a count
+                record.triples = max(count, 0)
+        if record is not None:
+            self.record_build(record)
+        return loaded_count
 
     def get_web_url(self) -> str:
         """
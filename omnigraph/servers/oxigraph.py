@@ -59,6 +59,8 @@ class Oxigraph(SparqlServer):
     Dockerized Oxigraph SPARQL server
     """
 
+    ready_log_patterns = ["Listening for requests at|Oxigraph server started"]
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the Oxigraph manager.
@@ -77,13 +79,7 @@ class Oxigraph(SparqlServer):
             ServerStatus object with status information
         """
         server_status = super().status()
-        logs = server_status.logs
-
-        if (
-            logs
-            and ("Listening for requests at" in logs or "Oxigraph server started" in logs)
-            and self.endpoint_answers()
-        ):
+        if server_status.ready_logged and self.endpoint_answers():
             # Also try a lightweight HTTP request to confirm it's actually responding
             response = self.make_request("GET", self.config.status_url)
             if response.success:
@@ -4,15 +4,19 @@ Created on 2025-05-28
 @author: wf
 """
 
+import json
 import os
-import shutil
 from configparser import ConfigParser, ExtendedInterpolation
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import rdflib
+from basemkit.yamlable import lod_storable
 
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_manifest import DumpManifest
+from omnigraph.dump_splitter import DumpBatch, DumpSplitter
 from omnigraph.server_config import LoadPath, ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import (
     Response,
@@ -21,6 +25,7 @@ from omnigraph.sparql_server import (
     SparqlServer,
     Step,
 )
+from omnigraph.upload_stream import UploadContent, UploadStream
 
 
 class QLeverfile:
@@ -83,6 +88,70 @@ class QLeverfile:
             self.config.write(f)
 
 
+@dataclass
+class InputFingerprint:
+    """
+    what identifies an input file of an index build
+    """
+
+    size: int
+    mtime: float
+    sha256: str
+
+
+@lod_storable
+class IndexFingerprint:
+    """
+    The inputs the QLever index was last built from - kept next to the
+    meta-data.json of the index so that an unchanged rebuild can be skipped.
+    """
+
+    inputs: Dict[str, InputFingerprint] = field(default_factory=dict)
+    # the meta-data.json of the index built from these inputs
+    meta_data_mtime: Optional[float] = None
+
+    @classmethod
+    def of_files(cls, files: List[Path], previous: Optional["IndexFingerprint"] = None) -> "IndexFingerprint":
+        """
+        Fingerprint the given input files.
+
+        The sha256 of a file whose size and mtime are unchanged is taken from
+        the previous fingerprint instead of reading the file again.
+
+        Args:
+            files: the input files
+            previous: the fingerprint of the last build if any
+
+        Returns:
+            the IndexFingerprint
+        """
+        fingerprint = cls()
+        for file in files:
+            stat = file.stat()
+            known = previous.inputs.get(file.name) if previous else None
+            if known and known.size == stat.st_size and known.mtime == stat.st_mtime:
+                sha256 = known.sha256
+            else:
+                sha256 = DumpManifest.file_sha256(file)
+            fingerprint.inputs[file.name] = InputFingerprint(size=stat.st_size, mtime=stat.st_mtime, sha256=sha256)
+        return fingerprint
+
+    def same_inputs(self, other: "IndexFingerprint") -> bool:
+        """
+        Check whether the other fingerprint has the same input content - mtimes may differ.
+
+        Args:
+            other: the fingerprint to compare with
+
+        Returns:
+            True if the same files with the same size and hash are fingerprinted
+        """
+        mine = {name: (record.size, record.sha256) for name, record in self.inputs.items()}
+        theirs = {name: (record.size, record.sha256) for name, record in other.inputs.items()}
+        same = mine == theirs
+        return same
+
+
 @dataclass
 class QLeverConfig(ServerConfig):
     """
@@ -104,6 +173,9 @@ class QLever(SparqlServer):
     Dockerized QLever SPARQL server
     """
 
+    # triples per INSERT DATA update if no liveload_batch_size is configured
+    default_batch_size = 10000
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the QLever server manager.
@@ -114,6 +186,20 @@ class QLever(SparqlServer):
         """
         super().__init__(config=config, env=env)
 
+    def endpoint_ready(self, response: Response) -> bool:
+        """
+        Check the answer of my status url - the root answers 404 while the index
+        is served, so any answer but a 5xx says I am ready.
+
+        Args:
+            response: the answer to a GET of my status url
+
+        Returns:
+            True if the answer says I am ready
+        """
+        ready = response.response is not None and response.response.status_code < 500
+        return ready
+
     def status(self) -> ServerStatus:
         """
         Check QLever server status from container logs.
@@ -316,42 +402,151 @@ class QLever(SparqlServer):
         if qlever_file is None:
             self.log.log("❌", container_name, f"no Qleverfile in {data_dir} - run start (setup-config) first")
             return loaded_count
+        fingerprint_path = self.get_fingerprint_path(qlever_file)
+        previous = IndexFingerprint.load_from_json_file(str(fingerprint_path)) if fingerprint_path.exists() else None
+        fingerprint = IndexFingerprint.of_files(files, previous)
+        if self.is_index_current(qlever_file, fingerprint, previous):
+            self.log.log("✅", container_name, f"index of {len(files)} unchanged file(s) is current - rebuild skipped")
+            if not self.endpoint_answers():
+                self.run_shell_command(f"cd {data_dir};qlever start --server-container {container_name}")
+            loaded_count = len(files)
+            return loaded_count
         # stage the dumps in the data directory and register them as input files.
         # build replaces the store, so previously staged dumps are removed first and
         # same named files are overwritten - otherwise the index is built from the
         # union of every dataset ever loaded, or from stale content of the same
         # file name of another dataset, see issue #40
-        wanted = {file.name for file in files}
-        for stale in data_dir.glob(f"*{self.rdf_format.extension}"):
-            if stale.name not in wanted:
-                stale.unlink()
-                self.log.log("✅", container_name, f"removed stale dump {stale.name}")
-        for file in files:
-            target = data_dir / file.name
-            shutil.copy2(file, target)
-        input_files = " ".join(file.name for file in files)
+        # zstd dumps are decompressed into the data directory - gzip is read by
+        # the zcat of CAT_INPUT_FILES inside the index container
+        native = (DumpCompression.NONE, DumpCompression.GZ)
+        loader_files = self.stage_decompressed(files, data_dir, native=native)
+        wanted = {file.name for file in loader_files}
+        for compression in DumpCompression:
+            for stale in data_dir.glob(f"*{self.rdf_format.extension}{compression.suffix}"):
+                if stale.name not in wanted:
+                    stale.unlink()
+                    self.log.log("✅", container_name, f"removed stale dump {stale.name}")
+        # the index container starts after staging - bind mounts are visible to it
+        self.stage_files(loader_files, data_dir, allow_bind_mount=True)
+        input_files = " ".join(file.name for file in loader_files)
         qlever_file.set("index", "INPUT_FILES", input_files)
+        gzipped = any(DumpCompression.of_path(file) == DumpCompression.GZ for file in loader_files)
+        # zcat -f passes uncompressed files through unchanged
+        cat_command = "zcat -f" if gzipped else "cat"
+        qlever_file.set("index", "CAT_INPUT_FILES", f"{cat_command} ${{INPUT_FILES}}")
         qlever_file.save()
+        # a failed build must not pass as current
+        fingerprint_path.unlink(missing_ok=True)
+        self.invalidate_triple_count()
         # build replaces the store - the server has to let go of the index first
         self.stop()
         self.rm()
         ok = True
-        for command in self.get_index_commands(files):
-            shell_result = self.run_shell_command(f"cd {data_dir};{command}")
-            if not shell_result.success:
-                self.log.log("❌", container_name, f"failed: {command}")
-                ok = False
-                break
+        try:
+            for command in self.get_index_commands(files):
+                shell_result = self.run_shell_command(f"cd {data_dir};{command}")
+                if not shell_result.success:
+                    self.log.log("❌", container_name, f"failed: {command}")
+                    ok = False
+                    break
+        finally:
+            # the server reads the index - not the inputs
+            self.release_bind_mounts()
         if ok:
             loaded_count = len(files)
+            meta_data_path = self.get_meta_data_path(qlever_file)
+            if meta_data_path.exists():
+                fingerprint.meta_data_mtime = meta_data_path.stat().st_mtime
+                fingerprint.save_to_json_file(str(fingerprint_path), indent=2)
             self.log.log("✅", container_name, f"index rebuilt from {loaded_count} file(s)")
         return loaded_count
 
-    def upload_request(self, file_content: bytes) -> Response:
-        """Upload request for QLever using SPARQL INSERT statements."""
-        turtle_data = file_content.decode("utf-8")
-        sparql_insert = self._convert_turtle_to_insert(turtle_data)
+    def get_meta_data_path(self, qlever_file: QLeverfile) -> Path:
+        """
+        the meta-data.json the qlever index command writes
+        """
+        name = qlever_file.get("data", "NAME") or self.config.dataset
+        meta_data_path = Path(self.config.data_dir) / f"{name}.meta-data.json"
+        return meta_data_path
 
+    def get_fingerprint_path(self, qlever_file: QLeverfile) -> Path:
+        """
+        the fingerprint of the inputs of the index - next to its meta-data.json
+        """
+        meta_data_path = self.get_meta_data_path(qlever_file)
+        fingerprint_path = meta_data_path.with_name(meta_data_path.name.replace(".meta-data.json", ".inputs.json"))
+        return fingerprint_path
+
+    def is_index_current(
+        self, qlever_file: QLeverfile, fingerprint: IndexFingerprint, previous: Optional[IndexFingerprint]
+    ) -> bool:
+        """
+        Check whether the index was built from inputs with the given fingerprint.
+
+        The meta-data.json must still be the one of that build - an index built
+        by other means or updated by liveload is not trusted. The force option
+        always rebuilds.
+
+        Args:
+            qlever_file: the Qleverfile
+            fingerprint: the fingerprint of the current input files
+            previous: the fingerprint recorded with the last build
+
+        Returns:
+            True if a rebuild would not change the index
+        """
+        meta_data_path = self.get_meta_data_path(qlever_file)
+        current = (
+            not self.env.force
+            and previous is not None
+            and meta_data_path.exists()
+            and previous.meta_data_mtime == meta_data_path.stat().st_mtime
+            and fingerprint.same_inputs(previous)
+        )
+        return current
+
+    def invalidate_fingerprint(self):
+        """
+        Forget the inputs of the last build - the index content changed otherwise.
+        """
+        self.invalidate_triple_count()
+        if self.config.data_dir:
+            qlever_file = QLeverfile.ofFile(Path(self.config.data_dir) / "Qleverfile")
+            if qlever_file:
+                self.get_fingerprint_path(qlever_file).unlink(missing_ok=True)
+
+    def get_native_triple_count(self) -> Optional[int]:
+        """
+        Get the number of triples the index command wrote to the meta-data.json -
+        only while the index is the one of its recorded build, since liveload
+        updates do not show up there.
+
+        Returns:
+            the number of triples or None if the meta-data can not be trusted
+        """
+        triple_count = None
+        qlever_file = QLeverfile.ofFile(Path(self.config.data_dir) / "Qleverfile") if self.config.data_dir else None
+        meta_data_path = self.get_meta_data_path(qlever_file) if qlever_file else None
+        if meta_data_path and meta_data_path.exists() and self.get_fingerprint_path(qlever_file).exists():
+            meta_data = json.loads(meta_data_path.read_text())
+            num_triples = meta_data.get("num-triples", meta_data.get("num-triples-normal"))
+            # newer index versions count the normal and the internal triples separately
+            if isinstance(num_triples, dict):
+                num_triples = num_triples.get("normal")
+            if num_triples is not None:
+                triple_count = int(num_triples)
+        return triple_count
+
+    def insert_request(self, sparql_insert: str) -> Response:
+        """
+        Send the given SPARQL INSERT DATA update with my access token.
+
+        Args:
+            sparql_insert: the update
+
+        Returns:
+            Response of the update request
+        """
         # Get access token - read from QLeverfile if not already set
         access_token = self._get_access_token()
 
@@ -362,9 +557,45 @@ class QLever(SparqlServer):
                 "Content-Type": "application/sparql-update",
                 "Authorization": f"Bearer {access_token}",
             },
-            data=sparql_insert,
+            data=sparql_insert.encode("utf-8"),
             timeout=self.config.upload_timeout,
         )
+        if response.success:
+            # the index no longer is what its inputs built
+            self.invalidate_fingerprint()
+        return response
+
+    def upload_batch(self, batch: DumpBatch) -> Response:
+        """
+        Upload a batch of statements as INSERT DATA - the statements are passed
+        through unparsed.
+        """
+        response = self.insert_request(batch.as_sparql_insert())
+        return response
+
+    def load_file(self, filepath: str, upload_request=None, show_progress: Optional[bool] = None) -> bool:
+        """
+        Load a single RDF file as INSERT DATA updates of bounded size.
+
+        N-Triples and Turtle are streamed through the DumpSplitter - other
+        formats go the rdflib way of upload_request.
+        """
+        if upload_request is None and DumpSplitter.syntax_of(filepath):
+            batch_size = self.config.liveload_batch_size or self.default_batch_size
+            load_success = self.load_file_batched(filepath, batch_size)
+        else:
+            load_success = super().load_file(filepath, upload_request=upload_request, show_progress=show_progress)
+        return load_success
+
+    def upload_request(self, file_content: UploadContent, content_encoding: Optional[str] = None) -> Response:
+        """
+        Upload request for QLever using SPARQL INSERT statements.
+
+        The payload is always handed over uncompressed - the turtle is converted here.
+        """
+        turtle_data = UploadStream.as_bytes(file_content).decode("utf-8")
+        sparql_insert = self._convert_turtle_to_insert(turtle_data)
+        response = self.insert_request(sparql_insert)
         return response
 
     def _convert_turtle_to_insert(self, turtle_data: str) -> str:
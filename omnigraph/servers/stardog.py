@@ -7,6 +7,7 @@ Stardog SPARQL support
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
 from omnigraph.server_config import ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import ServerConfig, ServerEnv, SparqlServer
@@ -74,6 +75,8 @@ class Stardog(SparqlServer):
     Dockerized Stardog SPARQL server
     """
 
+    ready_log_patterns = ["Stardog server started", "Server is ready"]
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the Stardog manager.
@@ -109,6 +112,17 @@ class Stardog(SparqlServer):
         else:
             raise RuntimeError(f"Failed to build {target}")
 
+    def get_native_triple_count(self) -> Optional[int]:
+        """
+        the size Stardog keeps per database - exact, since clear relies on zero after deleting
+        """
+        triple_count = None
+        size_url = f"{self.config.base_url}/{self.config.dataset}/size"
+        response = self.make_request("GET", size_url, params={"exact": "true"})
+        if response.success:
+            triple_count = int(response.response.text.strip())
+        return triple_count
+
     def status(self) -> ServerStatus:
         """
         Get server status information.
@@ -117,8 +131,6 @@ class Stardog(SparqlServer):
             ServerStatus object with status information
         """
         server_status = super().status()
-        logs = server_status.logs
-
-        if logs and "Stardog server started" in logs and "Server is ready" in logs:
+        if server_status.ready_logged:
             server_status.at = ServerLifecycleState.READY
         return server_status
\ No newline at end of file
@@ -13,6 +13,7 @@ from requests.auth import HTTPDigestAuth
 
 from omnigraph.server_config import ServerLifecycleState, ServerStatus
 from omnigraph.sparql_server import Response, ServerConfig, ServerEnv, SparqlServer, ShellResult
+from omnigraph.upload_stream import UploadContent
 
 
 @dataclass
@@ -72,6 +73,8 @@ class Virtuoso(SparqlServer):
     Dockerized OpenLink Virtuoso SPARQL server
     """
 
+    ready_log_patterns = ["Server online at", "HTTP/WebDAV server online at"]
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the Virtuoso manager.
@@ -81,6 +84,8 @@ class Virtuoso(SparqlServer):
             env: Server environment (includes log, shell, debug, verbose)
         """
         super().__init__(config=config, env=env)
+        # one digest auth for all requests - it keeps the nonce of the last challenge
+        self.digest_auth = None
 
     def post_create(self):
         """
@@ -128,11 +133,9 @@ class Virtuoso(SparqlServer):
             ServerStatus object with status information
         """
         server_status = super().status()
-        logs = server_status.logs
-
         # the log lines survive a restart, so they only qualify the container -
         # readiness is decided by the endpoint answering, as for jena and graphdb
-        if logs and "Server online at" in logs and "HTTP/WebDAV server online at" in logs:
+        if server_status.ready_logged:
             if self.endpoint_answers():
                 server_status.at = ServerLifecycleState.READY
 
@@ -153,14 +156,16 @@ class Virtuoso(SparqlServer):
 
     def get_digest_auth(self) -> Optional[HTTPDigestAuth]:
         """
-        Get the digest authentication for the /sparql-auth endpoint.
+        Get the digest authentication for the /sparql-auth endpoint - reused
+        so that requests after the first challenge send the Authorization
+        header right away.
 
         Returns:
             HTTPDigestAuth for the configured user or None if unconfigured
         """
-        digest_auth = None
-        if self.config.auth_user and self.config.auth_password:
-            digest_auth = HTTPDigestAuth(self.config.auth_user, self.config.auth_password)
+        if self.digest_auth is None and self.config.auth_user and self.config.auth_password:
+            self.digest_auth = HTTPDigestAuth(self.config.auth_user, self.config.auth_password)
+        digest_auth = self.digest_auth
         return digest_auth
 
     def execute_update_query(self, update_query: str) -> tuple[Optional[Any], Optional[Exception]]:
@@ -180,44 +185,45 @@ class Virtuoso(SparqlServer):
         result, error = self.execute_update_query_with_post(update_query, **kwargs)
         return result, error
 
-    def count_triples(self) -> int:
+    def get_count_query(self) -> str:
         """
-        Count the triples of my graph.
+        Get the COUNT(*) query for the triples of my graph - Virtuoso has
+        no native statistics count, so this query is always used.
 
         An unrestricted pattern would count the union of all graphs including
         the system graphs Virtuoso ships with.
 
         Returns:
-            Number of triples in the configured graph
+            the count query restricted to the configured graph
         """
         count_query = f"SELECT (COUNT(*) AS ?count) WHERE {{ GRAPH <{self.config.graph_uri}> {{ ?s ?p ?o }} }}"
-        try:
-            result = self.sparql.getValue(count_query, "count")
-            triple_count = int(result) if result else 0
-        except Exception as ex:
-            self.handle_exception("count_triples", ex)
-            triple_count = -1
-        return triple_count
+        return count_query
 
-    def upload_request(self, file_content: bytes) -> Response:
+    def upload_request(self, file_content: UploadContent, content_encoding: Optional[str] = None) -> Response:
         """
         Upload via the graph store protocol into my graph.
 
         Without a graph parameter Virtuoso answers 200 with an HTML page and stores nothing.
 
         Args:
-            file_content: the RDF payload to upload
+            file_content: the RDF payload to upload - bytes or a stream
+            content_encoding: the Content-Encoding of a compressed payload
 
         Returns:
             Response of the upload request
         """
+        digest_auth = self.get_digest_auth()
+        if digest_auth and not isinstance(file_content, (bytes, bytearray)):
+            # answer the digest challenge with a body-less request first - else the
+            # whole stream is sent to get the 401 and then rewound and sent again
+            self.make_request("HEAD", self.config.upload_url, auth=digest_auth)
         response = self.make_request(
             "POST",
             f"{self.config.upload_url}?graph-uri={self.config.graph_uri}",
-            headers={"Content-Type": self.rdf_format.mime_type},
+            headers=self.get_upload_headers(content_encoding),
             data=file_content,
             timeout=self.config.upload_timeout,
-            auth=self.get_digest_auth(),
+            auth=digest_auth,
         )
         return response
 
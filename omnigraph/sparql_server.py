@@ -4,14 +4,19 @@ Created on 2025-05-27
 @author: wf
 """
 
+import os
 import re
+import shutil
+import subprocess
 import sys
+import threading
 import time
 import traceback
 import webbrowser
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import psutil
 import requests
@@ -21,10 +26,19 @@ from lodstorage.prefix_config import PrefixConfigs
 from lodstorage.query import Endpoint
 from lodstorage.rdf_format import RdfFormat
 from lodstorage.sparql import SPARQL
+from requests.adapters import HTTPAdapter
+from tabulate import tabulate
 from tqdm import tqdm
+from urllib3.util.retry import Retry
 
+from omnigraph.async_http import AsyncHttp
+from omnigraph.container_watch import ContainerWatch, LogTail
+from omnigraph.docker_api import DockerApi, DockerApiUtil
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_splitter import DumpBatch, DumpSplitter
 from omnigraph.server_config import LoadPath, ServerConfig, ServerEnv, ServerLifecycleState, ServerStatus
 from omnigraph.software import SoftwareList
+from omnigraph.upload_stream import UploadContent, UploadStream
 
 
 class Response:
@@ -50,6 +64,29 @@ class Response:
         self.error = error
 
 
+@dataclass
+class StagingReport:
+    """
+    how dump files were staged for a native loader
+    """
+
+    methods: Dict[str, int] = field(default_factory=dict)
+    bytes_saved: int = 0  # not copied thanks to links, clones and mounts
+    bytes_copied: int = 0
+
+    def add(self, method: str, size: int):
+        self.methods[method] = self.methods.get(method, 0) + 1
+        if method == "copy":
+            self.bytes_copied += size
+        else:
+            self.bytes_saved += size
+
+    def __str__(self) -> str:
+        methods = ", ".join(f"{method} {count}" for method, count in sorted(self.methods.items()))
+        text = f"{methods} - {self.bytes_saved / 1e9:.2f} GB not copied, {self.bytes_copied / 1e9:.2f} GB copied"
+        return text
+
+
 @dataclass
 class Step:
     """
@@ -90,6 +127,16 @@ class SparqlServer:
     Base class for dockerized SPARQL servers
     """
 
+    # files from this size on show the bytes sent while uploading
+    upload_progress_size = 16 * 1024 * 1024
+    # seconds between the readiness probes - doubled per quiet probe
+    ready_probe_delay_min = 0.05
+    ready_probe_delay_max = 1.0
+    # regular expressions that all show up in the log of a boot once the server started
+    ready_log_patterns: List[str] = []
+    # recent log lines kept per server
+    log_tail_lines = 1000
+
     def __init__(self, config: ServerConfig, env: ServerEnv):
         """
         Initialize the SPARQL server manager.
@@ -104,14 +151,34 @@ class SparqlServer:
         self.shell = env.shell
         self.rdf_format = RdfFormat.by_label(self.config.rdf_format)
         self.current_status = None
+        # the ContainerWatch while waiting for readiness - see wait_until_ready
+        self.log_watch: Optional[ContainerWatch] = None
+        # the last triple count and its time.monotonic() - see count_triples
+        self.triple_count_cache: Optional[Tuple[int, float]] = None
+        # counted up by every invalidation - a count started before one is not cached
+        self.triple_count_generation = 0
+        self.triple_count_lock = threading.Lock()
+        # the recent log lines of the current boot - read incrementally
+        self.log_tail = LogTail(
+            self.config.container_name, ready_patterns=self.ready_log_patterns, max_lines=self.log_tail_lines
+        )
+        # dump files staged by bind_mount - released after loading
+        self.bind_mounts = []
         # while true connection errors are expected and not worth reporting
         self.expect_errors = False
-        self.docker_util = DockerUtil(
+        # pooled keep-alive session - created on first use, see get_session
+        self.session: Optional[requests.Session] = None
+        self.session_lock = threading.Lock()
+        self.docker_api = self.get_docker_api()
+        docker_util_class = DockerApiUtil if self.docker_api else DockerUtil
+        docker_util_kwargs = {"api": self.docker_api} if self.docker_api else {}
+        self.docker_util = docker_util_class(
             shell=self.shell,
             container_name=self.config.container_name,
             log=self.log,
             verbose=self.verbose,
             debug=self.debug,
+            **docker_util_kwargs,
         )
 
         # Subclasses must set these URLs
@@ -126,6 +193,25 @@ class SparqlServer:
             ):
                 self.sparql.addAuthentication(self.config.auth_user, self.config.auth_password)
 
+    def get_docker_api(self) -> Optional[DockerApi]:
+        """
+        Get the Docker Engine API client if the docker_backend of my environment
+        asks for it and the socket answers.
+
+        Returns:
+            the shared DockerApi or None for the docker CLI
+        """
+        docker_api = None
+        if getattr(self.env, "docker_backend", "cli") == "api":
+            api = DockerApi.get_instance()
+            if api.is_available():
+                docker_api = api
+            else:
+                self.log.log(
+                    "⚠️", self.config.container_name, f"docker socket {api.socket_path} not available - using the CLI"
+                )
+        return docker_api
+
     @property
     def full_name(self) -> str:
         full_name = f"{self.name} {self.config.container_name}"
@@ -212,24 +298,105 @@ class SparqlServer:
             Response
         """
         try:
-            #  add auth if we have auth_password and auth_user
-            if (
-                hasattr(self.config, "auth_password")
-                and self.config.auth_password
-                and hasattr(self.config, "auth_user")
-                and self.config.auth_user
-            ):
-                kwargs.setdefault("auth", (self.config.auth_user, self.config.auth_password))
+            # auth from auth_user and auth_password is attached to the session -
+            # an auth argument e.g. the digest auth of virtuoso overrides it
             # for Jena Fuseki we do this via url
             # Only set timeout if not already provided
             kwargs.setdefault("timeout", self.config.timeout)
-            response = requests.request(method, url, **kwargs)
+            response = self.get_session().request(method, url, **kwargs)
             response = Response(response)
         except Exception as ex:
             self.handle_exception(f"request {url}", ex)
             response = Response(None, ex)
         return response
 
+    def get_auth(self) -> Optional[Tuple[str, str]]:
+        """
+        Get the basic auth credentials of my config.
+
+        Returns:
+            (auth_user, auth_password) or None if not both are configured
+        """
+        auth = None
+        if getattr(self.config, "auth_user", None) and getattr(self.config, "auth_password", None):
+            auth = (self.config.auth_user, self.config.auth_password)
+        return auth
+
+    def get_session(self) -> requests.Session:
+        """
+        Get my pooled keep-alive session - created on first use with the
+        pool size and retries of my config and my auth attached once.
+
+        Returns:
+            the requests.Session shared by all my requests
+        """
+        with self.session_lock:
+            if self.session is None:
+                session = requests.Session()
+                retries = Retry(
+                    total=self.config.max_retries,
+                    backoff_factor=self.config.retry_backoff,
+                    status_forcelist=[502, 503, 504],
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=self.config.pool_size,
+                    pool_maxsize=self.config.pool_size,
+                    max_retries=retries,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.auth = self.get_auth()
+                self.session = session
+            session = self.session
+        return session
+
+    def close_session(self):
+        """
+        Close my session and its pooled connections.
+        """
+        with self.session_lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+    def async_session(self):
+        """
+        Create an aiohttp client session with my auth - share it between the
+        async calls of a batch to reuse its connections.
+
+        Returns:
+            the aiohttp.ClientSession - to be used as async context manager
+        """
+        session = AsyncHttp.session(auth=self.get_auth(), limit=self.config.pool_size)
+        return session
+
+    async def make_request_async(self, method: str, url: str, session=None, **kwargs) -> Response:
+        """
+        Async variant of make_request with the same error handling.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            url: Request URL
+            session: the aiohttp.ClientSession to use - a session of its own if None
+            **kwargs: Additional arguments as for make_request
+
+        Returns:
+            Response wrapping an AsyncResponse
+        """
+        try:
+            kwargs.setdefault("timeout", self.config.timeout)
+            if session is None:
+                async with self.async_session() as own_session:
+                    async_response = await AsyncHttp.request(own_session, method, url, **kwargs)
+            else:
+                async_response = await AsyncHttp.request(session, method, url, **kwargs)
+            response = Response(async_response)
+        except Exception as ex:
+            self.handle_exception(f"request {url}", ex)
+            response = Response(None, ex)
+        return response
+
     def get_web_url(self) -> str:
         """
         Return the service-specific Web UI URL.
@@ -314,19 +481,59 @@ class SparqlServer:
             answers = response.response is not None
         return answers
 
+    def endpoint_ready(self, response: Response) -> bool:
+        """
+        Check whether the given answer of my status url says that I am serving -
+        a 2xx, while e.g. a 503 or 404 may come from a server that is still booting.
+        may be overridden by servers whose status url answers otherwise while serving
+
+        Args:
+            response: the answer to a GET of my status url
+
+        Returns:
+            True if the answer says I am ready
+        """
+        ready = response.response is not None and 200 <= response.response.status_code < 300
+        return ready
+
     def refresh_logs(self, server_status=ServerStatus, since: str = None):
         """
-        refresh the logs for the given server status
+        refresh the logs for the given server status - only the lines after the
+        cursor of my log tail are read and matched against my ready_log_patterns
 
         Args:
-            server_status: the status to attach the logs to
-            since: only lines after this timestamp - the StartedAt of the current
-                boot, so that lines of earlier boots do not fake readiness
+            server_status: the status to attach the recent lines to
+            since: the StartedAt of the current boot, so that lines of earlier
+                boots do not fake readiness - a new boot restarts the tail
+        """
+        if self.log_watch is None:
+            self.log_tail.refresh(self.read_logs, boot=since)
+        # else the boot log is followed already - no need to read it
+        server_status.logs = self.log_tail.logs
+        server_status.ready_logged = self.log_tail.ready_logged
+
+    def read_logs(self, since: str = None) -> Tuple[str, str]:
+        """
+        Read the log lines of my container from the given timestamp on - each
+        prefixed with its timestamp.
+
+        Args:
+            since: the RFC3339 timestamp
+
+        Returns:
+            (stdout, stderr)
         """
-        since_option = f"--since {since} " if since else ""
-        proc = self.shell.run(f"docker logs {since_option}{self.config.container_name}", tee=False)
-        logs = f"stdout:{proc.stdout}\nstderr:{proc.stderr}"
-        server_status.logs = logs
+        output = None
+        if self.docker_api:
+            try:
+                output = self.docker_util.read_logs(since)
+            except Exception as ex:
+                self.handle_exception("read_logs", ex)
+        if output is None:
+            since_option = f"--since {since} " if since else ""
+            proc = self.shell.run(f"docker logs --timestamps {since_option}{self.config.container_name}", tee=False)
+            output = (proc.stdout, proc.stderr)
+        return output
 
     def add_triple_count2_server_status(self, server_status=ServerStatus):
         """
@@ -505,11 +712,7 @@ class SparqlServer:
                             container_name,
                             f"Container {container_name} exists, starting...",
                         )
-                        start_cmd = f"docker start {container_name}"
-                        start_result = self.docker_util.run_shell_command(
-                            start_cmd,
-                            error_msg=f"Failed to start container {container_name}",
-                        )
+                        start_result = self.run_docker_cmd("start")
                         operation_success = start_result
                     else:
                         operation_success = self.docker_create()
@@ -527,32 +730,98 @@ class SparqlServer:
                 start_success = False
         return start_success
 
+    def get_count_query(self) -> str:
+        """
+        the query counting my triples
+        may be overridden by specific SPARQL server implementations
+        """
+        count_query = "SELECT (COUNT(*) AS ?count) WHERE { ?s ?p ?o }"
+        return count_query
+
+    def get_native_triple_count(self) -> Optional[int]:
+        """
+        Get the number of triples from the statistics the store keeps anyway -
+        instead of a COUNT(*) scanning all triples.
+        may be overridden by specific SPARQL server implementations
+
+        Returns:
+            the number of triples or None if there are no such statistics
+        """
+        return None
+
+    def invalidate_triple_count(self):
+        """
+        Forget the cached triple count - my content changed.
+        """
+        with self.triple_count_lock:
+            self.triple_count_cache = None
+            self.triple_count_generation += 1
+
     def count_triples(self) -> int:
         """
         Count total triples in the SPARQL server.
 
+        A count younger than the triple_count_ttl of my config is reused. Else
+        the native statistics are asked and the count query is the fallback.
+
         Returns:
             Number of triples
         """
-        count_query = "SELECT (COUNT(*) AS ?count) WHERE { ?s ?p ?o }"
-        try:
-            result = self.sparql.getValue(count_query, "count")
-            triple_count = int(result) if result else 0
-        except Exception as ex:
-            self.handle_exception("count_triples", ex)
-            triple_count = -1
+        with self.triple_count_lock:
+            cached = self.triple_count_cache
+            generation = self.triple_count_generation
+        if cached and time.monotonic() - cached[1] < self.config.triple_count_ttl:
+            triple_count = cached[0]
+        else:
+            triple_count = None
+            try:
+                triple_count = self.get_native_triple_count()
+            except Exception as ex:
+                self.handle_exception("native triple count", ex)
+            if triple_count is None:
+                count_query = self.get_count_query()
+                try:
+                    result = self.sparql.getValue(count_query, "count")
+                    triple_count = int(result) if result else 0
+                except Exception as ex:
+                    self.handle_exception("count_triples", ex)
+                    triple_count = -1
+            with self.triple_count_lock:
+                # a concurrent upload may have changed the content while counting
+                if triple_count >= 0 and generation == self.triple_count_generation:
+                    self.triple_count_cache = (triple_count, time.monotonic())
         return triple_count
 
+    def watch_container(self) -> ContainerWatch:
+        """
+        Start following the log of the current boot and the lifecycle events of my container.
+
+        Returns:
+            the ContainerWatch - not active if docker is not available
+        """
+        state = self.docker_util.inspect()
+        boot = state.get("StartedAt") if state else None
+        if boot != self.log_tail.boot:
+            self.log_tail.reset(boot)
+        # lines read before are not followed again
+        watch = ContainerWatch(self.config.container_name, since=self.log_tail.cursor, log_tail=self.log_tail)
+        watch.start()
+        return watch
+
     def wait_until_ready(self, show_progress: bool = False) -> bool:
         """
         Wait for server to be ready.
 
+        The endpoint is probed with an exponential backoff from
+        ready_probe_delay_min to ready_probe_delay_max seconds - every new line
+        of the followed boot log wakes the wait up early and restarts the
+        backoff, a die event of the container ends it.
+
         Args:
-            timeout: Maximum seconds to wait
             show_progress: Show progress bar while waiting
 
         Returns:
-            True if ready within timeout
+            True if ready within the ready_timeout of my config
         """
         container_name = self.config.container_name
         base_url = self.config.base_url
@@ -571,47 +840,82 @@ class SparqlServer:
         ready_status = False
         died = False
         hint = "no connection yet"
+        boot_logs = None
+        watch = self.watch_container()
+        # status() takes the followed lines instead of re-reading the log
+        self.log_watch = watch if watch.active else None
         self.expect_errors = True
-        for secs in range(timeout):
-            # one cheap HTTP probe per tick - docker inspect and the log read only
-            # run when the endpoint answers, or every tenth tick to notice a
-            # container that died instead of waiting for the full timeout
-            if self.endpoint_answers():
-                server_status = self.status()
-                hint = server_status.at.value
-                if server_status.at == ServerLifecycleState.READY:
-                    if show_progress and pbar:
-                        pbar.close()
-                    self.log.log(
-                        "✅",
-                        container_name,
-                        f"{self.full_name} ready at {base_url} after {secs}s",
-                    )
-                    ready_status = True
-                    break
-            elif secs % 10 == 9:
-                server_status = self.status()
-                hint = server_status.at.value
-                if not server_status.running:
-                    died = True
-                    if show_progress and pbar:
-                        pbar.close()
-                    self.log.log(
-                        "❌",
-                        container_name,
-                        f"{self.full_name} container stopped while waiting - {server_status.at.value}",
-                    )
+        start_time = time.monotonic()
+        last_check = start_time
+        delay = self.ready_probe_delay_min
+        # status() inspects the container - while the endpoint answers before
+        # the server is ready it is checked with a backoff of its own, cut
+        # short when the boot log matches the readiness patterns
+        status_delay = self.ready_probe_delay_min
+        next_status_check = start_time
+        ready_logged = self.log_tail.ready_logged
+        try:
+            while True:
+                now = time.monotonic()
+                secs = now - start_time
+                if self.endpoint_answers():
+                    if now >= next_status_check or self.log_tail.ready_logged != ready_logged:
+                        ready_logged = self.log_tail.ready_logged
+                        server_status = self.status()
+                        hint = server_status.at.value
+                        if server_status.at == ServerLifecycleState.READY:
+                            self.log.log(
+                                "✅",
+                                container_name,
+                                f"{self.full_name} ready at {base_url} after {secs:.2f}s",
+                            )
+                            ready_status = True
+                            break
+                        next_status_check = time.monotonic() + status_delay
+                        status_delay = min(status_delay * 2, self.ready_probe_delay_max)
+                # without a watch a container that died is noticed by docker
+                # inspect every ten seconds instead of waiting for the timeout
+                elif watch.died.is_set() or watch.log_ended.is_set() or (not watch.active and now - last_check >= 10):
+                    last_check = now
+                    server_status = self.status()
+                    hint = server_status.at.value
+                    if not server_status.running:
+                        died = True
+                        self.log.log(
+                            "❌",
+                            container_name,
+                            f"{self.full_name} container stopped while waiting - {server_status.at.value}",
+                        )
+                        break
+                if secs >= timeout:
                     break
-
+                if show_progress and pbar:
+                    pbar.set_postfix_str(hint)
+                    pbar.n = min(timeout, round(secs, 1))
+                    pbar.refresh()
+                wait_secs = min(delay, timeout - secs)
+                if watch.active:
+                    woken = watch.wait(wait_secs)
+                else:
+                    woken = False
+                    time.sleep(wait_secs)
+                if woken:
+                    # the container made progress - probe soon, but not more
+                    # often than the minimum delay on a chatty boot log
+                    delay = self.ready_probe_delay_min
+                    time.sleep(max(0.0, start_time + secs + delay - time.monotonic()))
+                else:
+                    delay = min(delay * 2, self.ready_probe_delay_max)
+            if watch.active:
+                boot_logs = watch.logs
+        finally:
+            self.expect_errors = False
+            self.log_watch = None
+            watch.close()
             if show_progress and pbar:
-                pbar.set_postfix_str(hint)
-                pbar.update(1)
-            time.sleep(1)
-        self.expect_errors = False
+                pbar.close()
 
         if not ready_status and not died:
-            if show_progress and pbar:
-                pbar.close()
             self.log.log(
                 "⚠️",
                 container_name,
@@ -620,9 +924,10 @@ class SparqlServer:
         if not ready_status:
             # a timeout message without the why is worthless - show what the
             # container itself said in its current boot
-            server_status = self.status()
-            if server_status.logs:
-                tail = "\n".join(server_status.logs.splitlines()[-20:])
+            if boot_logs is None:
+                boot_logs = self.status().logs
+            if boot_logs:
+                tail = "\n".join(boot_logs.splitlines()[-20:])
                 self.log.log("⚠️", container_name, f"last boot log lines:\n{tail}")
 
         return ready_status
@@ -660,6 +965,7 @@ class SparqlServer:
                 timeout=self.config.upload_timeout,
                 **kwargs,
             )
+            self.invalidate_triple_count()
 
             result = resp.response
             if not resp.success:
@@ -684,6 +990,7 @@ class SparqlServer:
         Returns:
             Tuple of (response, exception)
         """
+        self.invalidate_triple_count()
         return self.sparql.insert(update_query)
 
     def clear_by_build(self) -> int:
@@ -711,6 +1018,7 @@ class SparqlServer:
             self.build_from_dump_files()
         finally:
             self.config.dumps_dir = dumps_dir
+            self.invalidate_triple_count()
         triple_count = self.count_triples()
         return triple_count
 
@@ -729,6 +1037,7 @@ class SparqlServer:
             clear_query = self.get_clear_query()
             try:
                 _response, ex = self.execute_update_query(clear_query)
+                self.invalidate_triple_count()
                 if ex:
                     self.handle_exception("DELETE", ex)
                 new_count = self.count_triples()
@@ -746,58 +1055,157 @@ class SparqlServer:
 
         return count_triples
 
-    def upload_request(self, file_content: bytes) -> Response:
-        """Default upload request for Blazegraph-style servers."""
+    def get_upload_headers(self, content_encoding: Optional[str] = None) -> dict:
+        """
+        Get the headers of an upload request.
+
+        Args:
+            content_encoding: the Content-Encoding of a compressed payload
+
+        Returns:
+            the headers dict
+        """
+        headers = {"Content-Type": self.rdf_format.mime_type}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+        return headers
+
+    def upload_request(self, file_content: UploadContent, content_encoding: Optional[str] = None) -> Response:
+        """Default upload request for Blazegraph-style servers - the content may be a stream."""
         response = self.make_request(
             "POST",
             self.config.upload_url,
-            headers={"Content-Type": self.rdf_format.mime_type},
+            headers=self.get_upload_headers(content_encoding),
             data=file_content,
             timeout=self.config.upload_timeout,
         )
         return response
 
-    def load_file(self, filepath: str, upload_request=None) -> bool:
+    def open_upload_stream(self, filepath: str, show_progress: Optional[bool] = None) -> UploadStream:
         """
-        Load a single RDF file into the RDF server.
+        Open the given dump file as streamed upload payload.
+
+        Args:
+            filepath: the dump file
+            show_progress: show the bytes sent - for files of upload_progress_size and more if None
+
+        Returns:
+            the UploadStream - with the Content-Encoding to send it with or None for plain
+        """
+        content_encoding = DumpCompression.of_path(filepath).content_encoding
+        if content_encoding not in (self.config.upload_content_encodings or []):
+            # decompressed client side - only an accepting server gets the compressed bytes
+            content_encoding = None
+        if show_progress is None:
+            show_progress = Path(filepath).stat().st_size >= self.upload_progress_size
+        upload_stream = UploadStream(filepath, content_encoding=content_encoding, show_progress=show_progress)
+        return upload_stream
+
+    def check_load_response(self, filepath: str, response: Response) -> bool:
+        """
+        Log the outcome of the upload of the given file.
+
+        Args:
+            filepath: the uploaded file
+            response: the Response of the upload
+
+        Returns:
+            True if the upload succeeded
         """
         container_name = self.config.container_name
-        load_success = False
+        # failed uploads may have loaded part of the file as well
+        self.invalidate_triple_count()
+        if response.success:  # Changed from result["success"]
+            self.log.log("✅", container_name, f"Loaded {filepath}")
+            load_success = True
+        else:
+            if response.error:
+                error_msg = str(response.error)
+            else:
+                status_code = response.response.status_code
+                content = response.response.text
+                error_msg = f"HTTP {status_code} → {content}"
+            self.log.log("❌", container_name, f"Failed to load {filepath}: {error_msg}")
+            load_success = False
+        return load_success
+
+    def load_file(self, filepath: str, upload_request=None, show_progress: Optional[bool] = None) -> bool:
+        """
+        Load a single RDF file into the RDF server.
 
+        The file is streamed to the upload request - memory stays flat whatever its size.
+        """
         if upload_request is None:
             upload_request_callback = self.upload_request
         else:
             upload_request_callback = upload_request
 
         try:
-            with open(filepath, "rb") as f:
-                file_content = f.read()
+            with self.open_upload_stream(filepath, show_progress=show_progress) as upload_stream:
+                content_encoding = upload_stream.content_encoding
+                if content_encoding:
+                    response = upload_request_callback(upload_stream, content_encoding=content_encoding)
+                else:
+                    response = upload_request_callback(upload_stream)
+            load_success = self.check_load_response(filepath, response)
+        except Exception as ex:
+            self.handle_exception(f"loading {filepath}", ex)
+            load_success = False
 
-            response = upload_request_callback(file_content)
+        return load_success
 
-            if response.success:  # Changed from result["success"]
-                self.log.log("✅", container_name, f"Loaded {filepath}")
-                load_success = True
-            else:
-                if response.error:
-                    error_msg = str(response.error)
-                else:
-                    status_code = response.response.status_code
-                    content = response.response.text
-                    error_msg = f"HTTP {status_code} → {content}"
-                self.log.log("❌", container_name, f"Failed to load {filepath}: {error_msg}")
-                load_success = False
+    def upload_batch(self, batch: DumpBatch) -> Response:
+        """
+        Upload a batch of a split dump file.
+        may be overridden by servers that load another way
 
+        Args:
+            batch: the DumpBatch
+
+        Returns:
+            Response of the upload request
+        """
+        response = self.upload_request(batch.as_turtle())
+        return response
+
+    def load_file_batched(self, filepath: str, batch_size: int) -> bool:
+        """
+        Load a single N-Triples or Turtle file in batches of about batch_size
+        triples - each batch a request of its own carrying the prefixes.
+
+        Args:
+            filepath: the dump file
+            batch_size: the number of triples per request
+
+        Returns:
+            True if all batches were loaded
+        """
+        container_name = self.config.container_name
+        load_success = True
+        batch_count = 0
+        try:
+            splitter = DumpSplitter(batch_size)
+            for batch in splitter.batches(Path(filepath)):
+                response = self.upload_batch(batch)
+                batch_count += 1
+                if not response.success:
+                    # later batches would load - but the file is incomplete either way
+                    load_success = self.check_load_response(f"{filepath} batch {batch.index}", response)
+                    break
+            if load_success:
+                self.log.log("✅", container_name, f"Loaded {filepath} in {batch_count} batches")
         except Exception as ex:
             self.handle_exception(f"loading {filepath}", ex)
             load_success = False
-
         return load_success
 
     def get_dump_files(self, file_pattern: str = None) -> List[Path]:
         """
         Get the dump files matching the given pattern.
 
+        Without a pattern the files of my rdf format are matched - plain, gzip
+        or zstd compressed.
+
         Args:
             file_pattern: Glob pattern for dump files
 
@@ -806,10 +1214,154 @@ class SparqlServer:
         """
         dump_path: Path = Path(self.config.dumps_dir)
         if file_pattern is None:
-            file_pattern = f"*{self.rdf_format.extension}"
-        files = sorted(dump_path.glob(file_pattern))
+            patterns = [f"*{self.rdf_format.extension}{compression.suffix}" for compression in DumpCompression]
+        else:
+            patterns = [file_pattern]
+        files = sorted({file for pattern in patterns for file in dump_path.glob(pattern)})
         return files
 
+    def stage_decompressed(
+        self, files: List[Path], stage_dir: Path, native: tuple = (DumpCompression.NONE,)
+    ) -> List[Path]:
+        """
+        Decompress the dump files a native loader can not read into the stage directory.
+
+        Args:
+            files: the dump files
+            stage_dir: the directory for the decompressed files
+            native: the compressions the loader reads itself
+
+        Returns:
+            the files to hand to the loader - the natively readable ones unchanged
+        """
+        container_name = self.config.container_name
+        loader_files = []
+        for file in files:
+            compression = DumpCompression.of_path(file)
+            if compression in native:
+                loader_files.append(file)
+            else:
+                stage_dir.mkdir(parents=True, exist_ok=True)
+                target = stage_dir / compression.strip_suffix(file.name)
+                if not target.exists() or target.stat().st_mtime < file.stat().st_mtime:
+                    compression.decompress(file, target)
+                    self.log.log("✅", container_name, f"decompressed {file.name} for the native loader")
+                loader_files.append(target)
+        return loader_files
+
+    @staticmethod
+    def reflink(source: Path, target: Path):
+        """
+        Clone the given file copy-on-write - btrfs, xfs and other reflink capable filesystems.
+
+        Args:
+            source: the file to clone
+            target: the clone to create
+
+        Raises:
+            OSError: if the filesystem or platform can not clone
+        """
+        try:
+            import fcntl
+        except ImportError as ex:
+            raise OSError(f"no reflink support on {sys.platform}") from ex
+        FICLONE = 0x40049409
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            target.unlink(missing_ok=True)
+            raise
+
+    def bind_mount(self, source: Path, target: Path):
+        """
+        Bind-mount the given file onto target - needs root, Linux only.
+
+        Args:
+            source: the file to mount
+            target: the mount point - created as empty file
+
+        Raises:
+            OSError: if the file can not be mounted
+        """
+        if not sys.platform.startswith("linux") or os.geteuid() != 0:
+            raise OSError("bind mounts need root on Linux")
+        target.touch()
+        result = subprocess.run(["mount", "--bind", str(source), str(target)], capture_output=True, text=True)
+        if result.returncode != 0:
+            target.unlink(missing_ok=True)
+            raise OSError(f"mount --bind failed: {result.stderr.strip()}")
+        self.bind_mounts.append(target)
+
+    def release_bind_mounts(self):
+        """
+        Unmount the dump files staged by bind_mount - the mount points stay as empty files.
+        """
+        while self.bind_mounts:
+            target = self.bind_mounts.pop()
+            subprocess.run(["umount", str(target)], capture_output=True)
+
+    def stage_file(self, source: Path, target: Path, allow_bind_mount: bool = False) -> str:
+        """
+        Make the given dump file available as target without copying where possible -
+        a hard link, else a reflink, else a bind mount, else a copy.
+
+        Args:
+            source: the dump file
+            target: the path the loader reads
+            allow_bind_mount: True if the loader's container starts after staging -
+                a mount below a volume of a running container does not propagate into it
+
+        Returns:
+            the method used: existing, hardlink, reflink, bind-mount or copy
+        """
+        if target in self.bind_mounts:
+            self.release_bind_mounts()
+        if target.exists() and os.path.samefile(source, target):
+            method = "existing"
+        else:
+            target.unlink(missing_ok=True)
+            try:
+                os.link(source, target)
+                method = "hardlink"
+            except OSError:
+                try:
+                    self.reflink(source, target)
+                    method = "reflink"
+                except OSError:
+                    try:
+                        if not allow_bind_mount:
+                            raise OSError("bind mount not applicable")
+                        self.bind_mount(source, target)
+                        method = "bind-mount"
+                    except OSError:
+                        shutil.copy2(source, target)
+                        method = "copy"
+        return method
+
+    def stage_files(self, files: List[Path], stage_dir: Path, allow_bind_mount: bool = False) -> StagingReport:
+        """
+        Stage the given dump files in the directory a native loader reads -
+        files already in the stage directory stay where they are.
+
+        Args:
+            files: the dump files
+            stage_dir: the directory the loader reads
+            allow_bind_mount: see stage_file
+
+        Returns:
+            the StagingReport
+        """
+        report = StagingReport()
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        for file in files:
+            if file.parent != stage_dir:
+                method = self.stage_file(file, stage_dir / file.name, allow_bind_mount=allow_bind_mount)
+                report.add(method, file.stat().st_size)
+        if report.methods:
+            self.log.log("✅", self.config.container_name, f"staged {len(files)} dump file(s): {report}")
+        return report
+
     def upload_dump_files(self, file_pattern: str = None) -> int:
         """
         legacy delegate - superseded by the load path dispatcher of issue #50
@@ -839,6 +1391,7 @@ class SparqlServer:
         """
         can_address = self.supports_datasets
         if can_address:
+            self.invalidate_triple_count()
             self.config.dataset = dataset
             # no directory is created here - a dataset is a graph or a repository
             # for the backends that support switching, and the data directory of a
@@ -909,7 +1462,10 @@ class SparqlServer:
             LoadPath.BULKLOAD: self.bulkload_dump_files,
             LoadPath.BUILD: self.build_from_dump_files,
         }[path]
-        loaded_count = loader(file_pattern)
+        try:
+            loaded_count = loader(file_pattern)
+        finally:
+            self.invalidate_triple_count()
         return loaded_count
 
     def bulkload_dump_files(self, file_pattern: str = None) -> int:
@@ -940,9 +1496,50 @@ class SparqlServer:
         """
         raise NotImplementedError(f"{self.name} has no build path")
 
+    def get_load_workers(self) -> int:
+        """
+        Get the number of files to liveload concurrently.
+
+        Returns:
+            the load_workers of the environment if my config declares
+            concurrent_writes safe - else 1
+        """
+        load_workers = self.env.load_workers
+        if load_workers > 1 and not self.config.concurrent_writes:
+            msg = f"concurrent writes are not declared safe - loading one file at a time instead of {load_workers}"
+            self.log.log("⚠️", self.config.container_name, msg)
+            load_workers = 1
+        return load_workers
+
+    def load_file_timed(self, filepath: Path, show_progress: Optional[bool] = None) -> dict:
+        """
+        Load the given file and time it - called from the load workers.
+
+        Args:
+            filepath: the dump file
+            show_progress: show the bytes sent - see open_upload_stream
+
+        Returns:
+            the row of the file in the load table
+        """
+        start_time = time.monotonic()
+        batch_size = self.config.liveload_batch_size
+        if batch_size and DumpSplitter.syntax_of(filepath):
+            success = self.load_file_batched(filepath, batch_size)
+        else:
+            success = self.load_file(filepath, show_progress=show_progress)
+        row = {
+            "file": filepath.name,
+            "loaded": "✅" if success else "❌",
+            "MB": round(filepath.stat().st_size / 1024 / 1024, 1),
+            "secs": round(time.monotonic() - start_time, 1),
+        }
+        return row
+
     def liveload_dump_files(self, file_pattern: str = None) -> int:
         """
-        Load all dump files matching pattern through the running server.
+        Load all dump files matching pattern through the running server -
+        up to get_load_workers() files concurrently.
 
         Args:
             file_pattern: Glob pattern for dump files
@@ -957,15 +1554,39 @@ class SparqlServer:
         if not files:
             self.log.log("⚠️", container_name, f"No files found matching pattern: {file_pattern}")
         else:
-            self.log.log("✅", container_name, f"Found {len(files)} files to load")
-            pbar = tqdm(files, dynamic_ncols=True)
-            for filepath in pbar:
-                pbar.set_description(f"Mem: {self.avail_mem_gb():.1f} GB → {filepath.name}")
-                file_result = self.load_file(filepath)
-                if file_result:
-                    loaded_count += 1
-                else:
-                    self.log.log("❌", container_name, f"Failed to load: {filepath}")
+            load_workers = self.get_load_workers()
+            self.log.log("✅", container_name, f"Found {len(files)} files to load with {load_workers} worker(s)")
+            # a count may scan the whole store - only on request
+            triples_before = self.count_triples() if self.env.count_triples else -1
+            start_time = time.monotonic()
+            rows = []
+            pbar = tqdm(total=len(files), dynamic_ncols=True)
+            # a single worker loads in file order just like the former sequential loop
+            with ThreadPoolExecutor(max_workers=load_workers) as executor:
+                # byte progress bars of concurrent uploads would overwrite each other
+                show_progress = None if load_workers == 1 else False
+                futures = [executor.submit(self.load_file_timed, filepath, show_progress) for filepath in files]
+                for future in as_completed(futures):
+                    row = future.result()
+                    rows.append(row)
+                    if row["loaded"] == "✅":
+                        loaded_count += 1
+                    else:
+                        self.log.log("❌", container_name, f"Failed to load: {row['file']}")
+                    pbar.set_description(f"Mem: {self.avail_mem_gb():.1f} GB → {row['file']}")
+                    pbar.update(1)
+            pbar.close()
+            elapsed = time.monotonic() - start_time
+            # the per file outcome is lost in the interleaved progress of concurrent loads
+            print(tabulate(sorted(rows, key=lambda row: row["file"]), headers="keys"))
+            summary = f"loaded {loaded_count}/{len(files)} files in {elapsed:.1f} s"
+            if triples_before >= 0 and elapsed > 0:
+                triples_after = self.count_triples()
+                if triples_after >= 0:
+                    added = triples_after - triples_before
+                    summary += f" - {added} triples, {added / elapsed:.0f} triples/s"
+            marker = "✅" if loaded_count == len(files) else "⚠️"
+            self.log.log(marker, container_name, summary)
 
         return loaded_count
 
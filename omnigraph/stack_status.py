@@ -0,0 +1,219 @@
+"""
+Created on 2026-10-17
+
+Status of the whole server stack in one table
+
+@author: wf
+"""
+
+import asyncio
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from tabulate import tabulate
+
+from omnigraph.async_http import AsyncHttp
+from omnigraph.server_config import ServerLifecycleState
+from omnigraph.sparql_server import SparqlServer
+
+
+@dataclass
+class StackStatusRow:
+    """
+    the status of one server of the stack
+    """
+
+    server: str
+    container: str
+    state: str = ServerLifecycleState.UNKNOWN.value
+    docker: str = "-"  # the docker state e.g. running, exited or - for no container
+    http_status: Optional[int] = None
+    probe_ms: Optional[float] = None
+    uptime: str = "-"
+    triples: Optional[int] = None
+
+
+class StackStatus:
+    """
+    Collects the status of all servers with a single docker ps for the whole
+    stack and concurrent endpoint probes - instead of an inspect, a log read
+    and a triple count per server. The probes share one event loop of the
+    async request layer if aiohttp is installed.
+    """
+
+    def __init__(self, servers: Dict[str, SparqlServer], count_triples: bool = False, probe_timeout: float = 5.0):
+        """
+        Initialize the collector.
+
+        Args:
+            servers: the servers of the stack
+            count_triples: also count the triples of the answering servers - expensive on big stores
+            probe_timeout: seconds an endpoint probe may take
+        """
+        self.servers = servers
+        self.count_triples = count_triples
+        self.probe_timeout = probe_timeout
+        self.use_async = AsyncHttp.is_available()
+
+    def list_containers(self) -> Dict[str, dict]:
+        """
+        List all containers with one docker ps - or one API call with the Docker Engine API backend.
+
+        Returns:
+            the docker ps entries by container name with the keys State and Status
+        """
+        containers = {}
+        listed = False
+        server = next(iter(self.servers.values()), None)
+        if server and server.docker_api:
+            try:
+                for entry in server.docker_api.containers(all_containers=True):
+                    for name in entry.get("Names", []):
+                        containers[name.lstrip("/")] = entry
+                listed = True
+            except (OSError, http.client.HTTPException) as ex:
+                server.handle_exception("docker ps", ex)
+        if server and not listed:
+            proc = server.shell.run('docker ps -a --no-trunc --format "{{json .}}"', tee=False)
+            if proc.returncode == 0:
+                for line in proc.stdout.splitlines():
+                    if line.strip():
+                        entry = json.loads(line)
+                        for name in entry.get("Names", "").split(","):
+                            containers[name] = entry
+        return containers
+
+    def probe(self, server: SparqlServer, row: StackStatusRow):
+        """
+        Probe the endpoint of the given server - and count its triples if asked for.
+
+        Args:
+            server: the server to probe
+            row: the row to fill in
+        """
+        url = server.config.status_url or server.config.base_url
+        server.expect_errors = True
+        start_time = time.perf_counter()
+        response = server.make_request("GET", url, timeout=self.probe_timeout)
+        row.probe_ms = (time.perf_counter() - start_time) * 1000
+        server.expect_errors = False
+        if response.response is not None:
+            row.http_status = response.response.status_code
+        # a 503 or 404 of a booting server keeps the row up
+        if server.endpoint_ready(response):
+            row.state = ServerLifecycleState.READY.value
+            if self.count_triples:
+                row.triples = server.count_triples()
+
+    async def probe_async(self, server: SparqlServer, row: StackStatusRow, session):
+        """
+        Async variant of probe - the triples are counted in a thread since
+        count_triples asks the native statistics and keeps its cache.
+
+        Args:
+            server: the server to probe
+            row: the row to fill in
+            session: the aiohttp.ClientSession shared by all probes
+        """
+        url = server.config.status_url or server.config.base_url
+        kwargs = {}
+        auth = server.get_auth()
+        if auth:
+            kwargs["auth"] = auth
+        server.expect_errors = True
+        start_time = time.perf_counter()
+        response = await server.make_request_async("GET", url, session=session, timeout=self.probe_timeout, **kwargs)
+        row.probe_ms = (time.perf_counter() - start_time) * 1000
+        server.expect_errors = False
+        if response.response is not None:
+            row.http_status = response.response.status_code
+        if server.endpoint_ready(response):
+            row.state = ServerLifecycleState.READY.value
+            if self.count_triples:
+                row.triples = await asyncio.to_thread(server.count_triples)
+
+    async def probe_all_async(self, probes: List[Tuple[SparqlServer, StackStatusRow]]):
+        # one client session for the whole stack - the auth is given per probe
+        async with AsyncHttp.session(limit=len(probes)) as session:
+            await asyncio.gather(*(self.probe_async(server, row, session) for server, row in probes))
+
+    def probe_all(self, probes: List[Tuple[SparqlServer, StackStatusRow]]):
+        """
+        Probe the given servers concurrently - on one event loop if aiohttp
+        is installed, else with a thread per server.
+
+        Args:
+            probes: the servers with the rows to fill in
+        """
+        if self.use_async:
+            asyncio.run(self.probe_all_async(probes))
+        else:
+            with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+                list(executor.map(lambda probe: self.probe(*probe), probes))
+
+    def collect(self) -> List[StackStatusRow]:
+        """
+        Collect the status of all servers.
+
+        Returns:
+            one row per server
+        """
+        containers = self.list_containers()
+        rows = []
+        probes = []
+        for server in self.servers.values():
+            container_name = server.config.container_name
+            row = StackStatusRow(server=server.name, container=container_name)
+            entry = containers.get(container_name)
+            if entry:
+                row.docker = entry.get("State", "-")
+                status_text = entry.get("Status", "")
+                if row.docker == "running":
+                    # the endpoint decides between up and ready
+                    row.state = ServerLifecycleState.UP.value
+                    row.uptime = status_text[len("Up ") :] if status_text.startswith("Up ") else status_text
+                    probes.append((server, row))
+                elif row.docker == "created":
+                    row.state = ServerLifecycleState.STARTING.value
+                elif row.docker == "exited" and not status_text.startswith("Exited (0)"):
+                    row.state = ServerLifecycleState.ERROR.value
+                else:
+                    row.state = ServerLifecycleState.STOPPED.value
+            rows.append(row)
+        if probes:
+            self.probe_all(probes)
+        return rows
+
+    @staticmethod
+    def as_table(rows: List[StackStatusRow], table_format: str = "simple") -> str:
+        """
+        Get the given rows as table.
+
+        Args:
+            rows: the status rows
+            table_format: the tabulate format
+
+        Returns:
+            the table markup
+        """
+        table_rows = []
+        for row in rows:
+            table_rows.append(
+                [
+                    row.server,
+                    row.container,
+                    row.state,
+                    row.docker,
+                    row.http_status if row.http_status is not None else "-",
+                    f"{row.probe_ms:.1f}" if row.probe_ms is not None else "-",
+                    row.uptime,
+                    f"{row.triples:,}" if row.triples is not None else "-",
+                ]
+            )
+        headers = ["server", "container", "state", "docker", "HTTP", "probe ms", "uptime", "triples"]
+        markup = tabulate(table_rows, headers=headers, tablefmt=table_format)
+        return markup
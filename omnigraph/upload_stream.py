@@ -0,0 +1,167 @@
+"""
+Created on 2026-10-17
+
+Streamed uploads of RDF dump files
+
+@author: wf
+"""
+
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+from tqdm import tqdm
+
+from omnigraph.dump_compression import DumpCompression
+
+# what an upload_request accepts as payload
+UploadContent = Union[bytes, BinaryIO]
+
+
+class UploadStream(io.RawIOBase):
+    """
+    A dump file handed to requests as upload body - read block by block so
+    that memory stays flat whatever the file size, with the bytes sent shown
+    in a progress bar.
+    """
+
+    block_size = 1024 * 1024
+
+    def __init__(self, filepath: Union[str, Path], content_encoding: Optional[str] = None, show_progress: bool = False):
+        """
+        Open the given dump file for upload.
+
+        Args:
+            filepath: the dump file
+            content_encoding: the Content-Encoding the server decompresses itself -
+                the compressed bytes are sent as is, else the content is decompressed
+            show_progress: show the bytes sent in a progress bar
+        """
+        super().__init__()
+        self.filepath = Path(filepath)
+        self.content_encoding = content_encoding
+        compression = DumpCompression.of_path(self.filepath)
+        self.decompress = not content_encoding and compression != DumpCompression.NONE
+        self.compression = compression
+        self.stream = self.open()
+        # requests sends a Content-Length for a known length - chunked otherwise
+        self.len = None if self.decompress else self.filepath.stat().st_size
+        self.bytes_read = 0
+        self.pbar = None
+        if show_progress:
+            self.pbar = tqdm(total=self.len, unit="B", unit_scale=True, desc=f"↑ {self.filepath.name}", leave=False)
+
+    def open(self) -> BinaryIO:
+        """
+        Open the payload at its start.
+
+        Returns:
+            the raw file or the decompressing stream
+        """
+        if self.decompress:
+            stream = self.compression.open_read(self.filepath)
+        else:
+            stream = open(self.filepath, "rb")
+        return stream
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        # requests rewinds the body to resend it e.g. after a digest auth challenge
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """
+        Move to the given position of the payload - a decompressing stream
+        is reopened to go back and skips ahead to go forward.
+
+        Args:
+            offset: the position relative to whence
+            whence: io.SEEK_SET, io.SEEK_CUR or io.SEEK_END - the end is only known
+                for a payload that is not decompressed
+
+        Returns:
+            the new position
+        """
+        if whence == io.SEEK_CUR:
+            offset += self.bytes_read
+        elif whence == io.SEEK_END:
+            if self.len is None:
+                raise io.UnsupportedOperation("the end of a decompressed upload is unknown")
+            offset += self.len
+        if not self.decompress:
+            self.stream.seek(offset)
+        else:
+            if offset < self.bytes_read:
+                self.stream.close()
+                self.stream = self.open()
+                self.bytes_read = 0
+            skip = offset - self.bytes_read
+            while skip > 0:
+                block = self.stream.read(min(skip, self.block_size))
+                if not block:
+                    break
+                skip -= len(block)
+            offset -= skip
+        self.bytes_read = offset
+        if self.pbar is not None:
+            self.pbar.n = offset
+            self.pbar.refresh()
+        return offset
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the next block of the payload.
+
+        Args:
+            size: the maximum number of bytes - all remaining for -1
+
+        Returns:
+            the bytes read - empty at the end
+        """
+        block = self.stream.read(size)
+        self.bytes_read += len(block)
+        if self.pbar is not None:
+            self.pbar.update(len(block))
+        return block
+
+    def readall(self) -> bytes:
+        content = self.read(-1)
+        return content
+
+    def readinto(self, buffer) -> int:
+        block = self.read(len(buffer))
+        buffer[: len(block)] = block
+        return len(block)
+
+    def tell(self) -> int:
+        return self.bytes_read
+
+    def __iter__(self) -> Iterator[bytes]:
+        for block in iter(lambda: self.read(self.block_size), b""):
+            yield block
+
+    def close(self):
+        if not self.closed:
+            self.stream.close()
+            if self.pbar is not None:
+                self.pbar.close()
+        super().close()
+
+    @staticmethod
+    def as_bytes(file_content: UploadContent) -> bytes:
+        """
+        Get the complete payload for servers that need it as a whole e.g. to convert it.
+
+        Args:
+            file_content: the bytes or stream handed to an upload_request
+
+        Returns:
+            the payload bytes
+        """
+        if isinstance(file_content, (bytes, bytearray)):
+            content = bytes(file_content)
+        else:
+            content = file_content.read()
+        return content
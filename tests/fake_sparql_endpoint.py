@@ -0,0 +1,113 @@
+"""
+Created on 2026-10-17
+
+a configurable fake SPARQL endpoint shared by the tests
+
+@author: wf
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple, Union
+
+# status, content type and payload of an answer
+Answer = Tuple[int, str, bytes]
+# a route answers with a fixed Answer or computes it from the request body
+Route = Union[Answer, Callable[[bytes], Answer]]
+
+
+class FakeSparqlHandler(BaseHTTPRequestHandler):
+    """
+    lets the FakeSparqlEndpoint answer every GET and POST
+    """
+
+    def do_GET(self):
+        self.server.respond(self, b"")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.respond(self, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSparqlEndpoint(ThreadingHTTPServer):
+    """
+    a local SPARQL endpoint answering every request with a count query result -
+    routes override the answer for the paths ending with their key and
+    all requests are recorded
+    """
+
+    def __init__(self, triple_count: int = 0, port: int = 0, routes: Dict[str, Route] = None):
+        """
+        constructor
+
+        Args:
+            triple_count: the count to answer queries with
+            port: the port to listen on - 0 picks a free one
+            routes: answers by path suffix (without the query string)
+        """
+        super().__init__(("localhost", port), FakeSparqlHandler)
+        self.triple_count = triple_count
+        self.routes = routes or {}
+        self.requests: List[Tuple[str, str, bytes]] = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        base_url = f"http://localhost:{self.server_port}"
+        return base_url
+
+    @property
+    def paths(self) -> List[str]:
+        paths = [path for _method, path, _body in self.requests]
+        return paths
+
+    def start(self) -> "FakeSparqlEndpoint":
+        """
+        serve in a daemon thread
+
+        Returns:
+            FakeSparqlEndpoint: me for chaining
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """
+        stop serving and release the port
+        """
+        self.shutdown()
+        self.server_close()
+
+    def count_answer(self) -> Answer:
+        """
+        get the SPARQL JSON result of a count query
+        """
+        bindings = [{"count": {"type": "literal", "value": str(self.triple_count)}}]
+        payload = json.dumps({"head": {"vars": ["count"]}, "results": {"bindings": bindings}}).encode()
+        answer = (200, "application/sparql-results+json", payload)
+        return answer
+
+    def respond(self, handler: BaseHTTPRequestHandler, body: bytes):
+        """
+        record the request and send the answer of the matching route
+        """
+        with self.lock:
+            self.requests.append((handler.command, handler.path, body))
+        path = handler.path.split("?")[0]
+        route = next((route for suffix, route in self.routes.items() if path.endswith(suffix)), None)
+        if route is None:
+            answer = self.count_answer()
+        elif callable(route):
+            answer = route(body)
+        else:
+            answer = route
+        status, content_type, payload = answer
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
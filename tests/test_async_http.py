@@ -0,0 +1,69 @@
+"""
+Created on 2026-10-17
+
+test the asyncio request layer
+
+@author: wf
+"""
+
+import asyncio
+
+from omnigraph.async_http import AsyncHttp
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+from tests.fake_sparql_endpoint import FakeSparqlEndpoint
+
+
+class TestAsyncHttp(Basetest):
+    """
+    test the async variant of the SparqlServer requests
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        try:
+            AsyncHttp.aiohttp()
+        except ImportError:
+            self.skipTest("aiohttp is not installed")
+        self.ogp = OmnigraphPaths()
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.fake = FakeSparqlEndpoint(triple_count=4).start()
+        self.server = servers["oxigraph"]
+        self.server.config.status_url = f"{self.fake.base_url}/"
+
+    def tearDown(self):
+        self.fake.stop()
+        Basetest.tearDown(self)
+
+    def test_async_requests(self):
+        """
+        concurrent requests share one client session and are wrapped like make_request does
+        """
+
+        async def run():
+            async with AsyncHttp.session(limit=4) as session:
+                responses = await asyncio.gather(
+                    *[
+                        self.server.make_request_async("GET", f"{self.fake.base_url}/probe{i}", session=session)
+                        for i in range(4)
+                    ]
+                )
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertTrue(all(response.success for response in responses))
+        counts = [response.response.json()["results"]["bindings"][0]["count"]["value"] for response in responses]
+        self.assertEqual(["4"] * 4, counts)
+        self.assertEqual([f"/probe{i}" for i in range(4)], sorted(self.fake.paths))
+
+    def test_async_request_error(self):
+        """
+        a refused connection is wrapped like make_request does
+        """
+        self.server.expect_errors = True
+        response = asyncio.run(self.server.make_request_async("GET", "http://localhost:1/"))
+        self.assertIsNone(response.response)
+        self.assertIsNotNone(response.error)
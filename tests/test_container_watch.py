@@ -0,0 +1,200 @@
+"""
+Created on 2026-10-17
+
+test waiting for readiness with a followed boot log
+
+@author: wf
+"""
+
+import socket
+import threading
+import time
+
+from omnigraph.container_watch import ContainerWatch, LogTail
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.servers.oxigraph import Oxigraph
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+from tests.fake_sparql_endpoint import FakeSparqlEndpoint
+
+
+class FakeLogs:
+    """
+    answers the log reads with the configured output and records the cursors
+    """
+
+    def __init__(self):
+        self.stdout = ""
+        self.stderr = ""
+        self.sinces = []
+
+    def read_logs(self, since: str = None):
+        self.sinces.append(since)
+        return self.stdout, self.stderr
+
+
+class FakeWatch(ContainerWatch):
+    """
+    follows shell commands instead of docker logs -f and docker events
+    """
+
+    def __init__(self, logs_script: str, events_script: str):
+        super().__init__("fake")
+        self.logs_script = logs_script
+        self.events_script = events_script
+
+    def get_logs_cmd(self):
+        return ["sh", "-c", self.logs_script]
+
+    def get_events_cmd(self):
+        return ["sh", "-c", self.events_script]
+
+
+class WatchedOxigraph(Oxigraph):
+    """
+    an Oxigraph whose container is faked by a docker state and a FakeWatch
+    """
+
+    def __init__(self, config, env, state: dict, watch: FakeWatch):
+        super().__init__(config=config, env=env)
+        self.state = state
+        self.watch = watch
+        self.docker_util.inspect = lambda: self.state
+        self.status_calls = 0
+
+    def watch_container(self) -> ContainerWatch:
+        self.watch.log_tail = self.log_tail
+        self.watch.start()
+        return self.watch
+
+    def status(self):
+        self.status_calls += 1
+        return super().status()
+
+
+class TestContainerWatch(Basetest):
+    """
+    test that readiness follows the boot log and the container events
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        ogp = OmnigraphPaths()
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.config = servers["oxigraph"].config
+        with socket.socket() as sock:
+            sock.bind(("localhost", 0))
+            self.port = sock.getsockname()[1]
+        base_url = f"http://localhost:{self.port}"
+        self.config.base_url = base_url
+        self.config.status_url = base_url
+        self.config.sparql_url = f"{base_url}/query"
+        self.config.ready_timeout = 10
+        self.fake = None
+
+    def tearDown(self):
+        if self.fake:
+            self.fake.stop()
+        Basetest.tearDown(self)
+
+    def serve_later(self, delay: float):
+        def serve():
+            time.sleep(delay)
+            self.fake = FakeSparqlEndpoint(port=self.port).start()
+
+        threading.Thread(target=serve, daemon=True).start()
+
+    def test_ready_within_subsecond(self):
+        """
+        a server answering after 0.3 s is reported ready well before the next full second
+        """
+        watch = FakeWatch("sleep 0.3; echo Listening for requests at; exec sleep 30", "exec sleep 30")
+        state = {"Running": True, "Status": "running", "StartedAt": "2026-10-17T00:00:00Z"}
+        server = WatchedOxigraph(self.config, ServerEnv(), state, watch)
+        self.serve_later(0.3)
+        start_time = time.monotonic()
+        ready = server.wait_until_ready()
+        secs = time.monotonic() - start_time
+        server.close_session()
+        self.assertTrue(ready)
+        self.assertLess(secs, 1.0)
+        self.assertFalse(watch.active)
+        self.assertIsNone(server.log_watch)
+
+    def test_status_backoff(self):
+        """
+        a chatty boot log of a server whose endpoint answers early does not
+        trigger a status check per line - the ready line does
+        """
+        chatter = "i=0; while [ $i -lt 50 ]; do echo loading $i; i=$((i+1)); sleep 0.02; done"
+        watch = FakeWatch(f"{chatter}; echo Listening for requests at; exec sleep 30", "exec sleep 30")
+        state = {"Running": True, "Status": "running", "StartedAt": "2026-10-17T00:00:00Z"}
+        server = WatchedOxigraph(self.config, ServerEnv(), state, watch)
+        self.serve_later(0)
+        time.sleep(0.1)
+        start_time = time.monotonic()
+        ready = server.wait_until_ready()
+        secs = time.monotonic() - start_time
+        server.close_session()
+        self.assertTrue(ready)
+        self.assertLess(secs, 3.0)
+        self.assertLessEqual(server.status_calls, 8)
+
+    def test_died(self):
+        """
+        a die event ends the wait without waiting for the timeout
+        """
+        watch = FakeWatch("echo starting; exec sleep 30", "sleep 0.2; echo die")
+        state = {"Running": False, "Status": "exited", "ExitCode": 1}
+        server = WatchedOxigraph(self.config, ServerEnv(), state, watch)
+        start_time = time.monotonic()
+        ready = server.wait_until_ready()
+        secs = time.monotonic() - start_time
+        self.assertFalse(ready)
+        self.assertLess(secs, 2.0)
+        self.assertEqual("die", watch.end_action)
+
+    def test_log_tail(self):
+        """
+        only lines after the cursor are added and matched, the ring buffer is bounded
+        and a new boot starts over
+        """
+        logs = FakeLogs()
+        tail = LogTail("fake", ready_patterns=["Server online at", "HTTP/WebDAV server online at"], max_lines=3)
+        boot = "2026-10-17T10:00:00.5Z"
+        logs.stdout = "2026-10-17T10:00:01.1Z Server online at 1111\n"
+        logs.stderr = "2026-10-17T10:00:01.05Z starting\n"
+        self.assertEqual(2, tail.refresh(logs.read_logs, boot))
+        self.assertEqual("2026-10-17T10:00:00.500000000Z", logs.sinces[0])
+        self.assertFalse(tail.ready_logged)
+        self.assertEqual("stdout:Server online at 1111\n\nstderr:starting\n", tail.logs)
+        # docker logs --since is inclusive - the line at the cursor is not added twice
+        logs.stderr = ""
+        logs.stdout = (
+            "2026-10-17T10:00:01.1Z Server online at 1111\n2026-10-17T10:00:02Z HTTP/WebDAV server online at 8890\n"
+        )
+        self.assertEqual(1, tail.refresh(logs.read_logs, boot))
+        self.assertEqual("2026-10-17T10:00:01.100000000Z", logs.sinces[1])
+        self.assertTrue(tail.ready_logged)
+        logs.stdout = "".join(f"2026-10-17T10:00:0{i}Z line {i}\n" for i in range(3, 8))
+        self.assertEqual(5, tail.refresh(logs.read_logs, boot))
+        self.assertEqual(3, len(tail.lines))
+        self.assertTrue(tail.ready_logged)
+        # a followed log delivers the streams on separate threads - out of order
+        logs.stdout = ""
+        tail.add_line("stdout", "2026-10-17T10:00:09.002Z later on stdout\n")
+        self.assertTrue(tail.add_line("stderr", "2026-10-17T10:00:09.001Z earlier on stderr\n"))
+        self.assertFalse(tail.add_line("stderr", "2026-10-17T10:00:09.001Z earlier on stderr\n"))
+        self.assertEqual("2026-10-17T10:00:09.002000000Z", tail.cursor)
+        follow_tail = LogTail("fake", ready_patterns=["Server online at"])
+        follow_tail.reset(boot)
+        follow_tail.add_line("stdout", "2026-10-17T10:00:01.002Z starting\n")
+        follow_tail.add_line("stderr", "2026-10-17T10:00:01.001Z Server online at 1111\n")
+        self.assertTrue(follow_tail.ready_logged)
+        # a restart is a new boot
+        logs.stdout = "2026-10-17T11:00:01Z Server online at 1111\n"
+        self.assertEqual(1, tail.refresh(logs.read_logs, "2026-10-17T11:00:00Z"))
+        self.assertFalse(tail.ready_logged)
+        self.assertEqual(1, len(tail.lines))
@@ -0,0 +1,157 @@
+"""
+Created on 2026-10-17
+
+test the Docker Engine API backend against a fake daemon
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingUnixStreamServer
+
+from basemkit.shell import Shell
+
+from omnigraph.docker_api import DockerApi, DockerApiUtil
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """
+    answers the container API calls of a single running container
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def reply(self, status: int, body: bytes = b"", content_type: str = "application/json"):
+        self.server.requests.append(f"{self.command} {self.path}")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        name = self.server.container_name
+        if self.path == "/_ping":
+            self.reply(200, b"OK", "text/plain")
+        elif self.path == f"/containers/{name}/json":
+            state = {"Running": True, "Status": "running", "StartedAt": "2026-10-17T10:00:00Z"}
+            self.reply(200, json.dumps({"Name": f"/{name}", "State": state}).encode())
+        elif self.path.startswith(f"/containers/{name}/logs"):
+            frames = b""
+            for stream, text in [
+                (1, "2026-10-17T10:00:01Z Listening for requests at\n"),
+                (2, "2026-10-17T10:00:02Z warn\n"),
+            ]:
+                data = text.encode()
+                frames += bytes([stream, 0, 0, 0]) + len(data).to_bytes(4, "big") + data
+            self.reply(200, frames, "application/vnd.docker.raw-stream")
+        else:
+            self.reply(404, b'{"message": "No such container"}')
+
+    def do_POST(self):
+        self.reply(204 if self.path == f"/containers/{self.server.container_name}/stop" else 404)
+
+    def do_DELETE(self):
+        self.reply(204 if self.path == f"/containers/{self.server.container_name}" else 404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RecordingShell(Shell):
+    """
+    records the commands run
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cmds = []
+
+    def run(self, cmd: str, *args, **kwargs):
+        self.cmds.append(cmd)
+        return super().run(cmd, *args, **kwargs)
+
+
+class TestDockerApi(Basetest):
+    """
+    test talking to docker over its unix socket
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, "docker.sock")
+        self.daemon = ThreadingUnixStreamServer(self.socket_path, DaemonHandler)
+        self.daemon.container_name = "oxigraph-omnigraph"
+        self.daemon.requests = []
+        self.daemon.connections = 0
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        self.tmp.cleanup()
+        Basetest.tearDown(self)
+
+    def test_demux(self):
+        """
+        the multiplexed log stream is split and a tty stream is taken as stdout
+        """
+        body = bytes([1, 0, 0, 0, 0, 0, 0, 3]) + b"out" + bytes([2, 0, 0, 0, 0, 0, 0, 3]) + b"err"
+        self.assertEqual(("out", "err"), DockerApi.demux(body))
+        self.assertEqual(("plain\n", ""), DockerApi.demux(b"plain\n"))
+        self.assertEqual("1792231200.500000000", DockerApi.to_unix_timestamp("2026-10-17T10:00:00.5Z"))
+
+    def test_api_util(self):
+        """
+        inspect, stop and rm go over one persistent connection
+        """
+        api = DockerApi(self.socket_path)
+        self.assertTrue(api.is_available())
+        util = DockerApiUtil(api=api, shell=RecordingShell(), container_name="oxigraph-omnigraph", log=ServerEnv().log)
+        self.assertTrue(util.inspect()["Running"])
+        self.assertTrue(util.stop().success)
+        self.assertTrue(util.rm().success)
+        self.assertEqual([], util.shell.cmds)
+        self.assertEqual(1, self.daemon.connections)
+        self.assertIsNone(DockerApi(self.socket_path).inspect("missing"))
+        self.assertFalse(DockerApi(os.path.join(self.tmp.name, "missing.sock")).is_available())
+
+    def test_server_status(self):
+        """
+        the status of a server with the api backend spawns no process
+        """
+        os.environ["DOCKER_HOST"] = f"unix://{self.socket_path}"
+        DockerApi.instances.clear()
+        try:
+            shell = RecordingShell()
+            env = ServerEnv(shell=shell, docker_backend="api")
+            omni_server = OmniServer(env=env)
+            ogp = OmnigraphPaths()
+            servers = omni_server.servers(str(ogp.examples_dir / "servers.yaml"), filter_active=False)
+            server = servers["oxigraph"]
+            self.assertIsInstance(server.docker_util, DockerApiUtil)
+            server.config.status_url = None
+            server_status = server.status()
+            server_status = server.status()
+            self.assertTrue(server_status.running)
+            self.assertTrue(server_status.ready_logged)
+            self.assertIn("stderr:warn", server_status.logs)
+            self.assertEqual([], shell.cmds)
+            logs_requests = [request for request in self.daemon.requests if "/logs" in request]
+            self.assertIn("since=1792231202.000000000", logs_requests[-1])
+        finally:
+            del os.environ["DOCKER_HOST"]
+            DockerApi.instances.clear()
@@ -0,0 +1,80 @@
+"""
+Created on 2026-10-17
+
+test compressed dump files
+
+@author: wf
+"""
+
+import tempfile
+from pathlib import Path
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+
+
+class TestDumpCompression(Basetest):
+    """
+    test gzip and zstd compressed dumps
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+        self.royals = (self.ogp.examples_dir / "royals.ttl").read_bytes()
+        omni_server = OmniServer(env=ServerEnv())
+        self.servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+
+    def available_compressions(self):
+        """
+        the compressions usable here - zstd is an optional dependency
+        """
+        compressions = [DumpCompression.NONE, DumpCompression.GZ]
+        try:
+            DumpCompression.zstandard()
+            compressions.append(DumpCompression.ZST)
+        except ImportError:
+            pass
+        return compressions
+
+    def test_round_trip(self):
+        """
+        what is written compressed reads back unchanged
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            for compression in self.available_compressions():
+                path = Path(tmp) / f"royals.ttl{compression.suffix}"
+                with compression.open_write(path) as f:
+                    f.write(self.royals)
+                self.assertEqual(compression, DumpCompression.of_path(path))
+                with compression.open_read(path) as f:
+                    self.assertEqual(self.royals, f.read())
+                if compression != DumpCompression.NONE:
+                    self.assertLess(path.stat().st_size, len(self.royals))
+
+    def test_dump_files_and_staging(self):
+        """
+        compressed dumps are found and decompressed for loaders that can
+        not read them
+        """
+        jena = self.servers["jena"]
+        with tempfile.TemporaryDirectory() as tmp:
+            dumps_dir = Path(tmp) / "dumps"
+            dumps_dir.mkdir()
+            for i, compression in enumerate(self.available_compressions()):
+                with compression.open_write(dumps_dir / f"dump_{i:06d}.ttl{compression.suffix}") as f:
+                    f.write(self.royals)
+            (dumps_dir / "notes.txt").write_text("not a dump")
+            jena.config.dumps_dir = str(dumps_dir)
+            files = jena.get_dump_files()
+            self.assertEqual(len(self.available_compressions()), len(files))
+            stage_dir = Path(tmp) / "stage"
+            loader_files = jena.stage_decompressed(files, stage_dir)
+            for loader_file in loader_files:
+                self.assertEqual(DumpCompression.NONE, DumpCompression.of_path(loader_file))
+                self.assertEqual(self.royals, loader_file.read_bytes())
+            staged = sorted(path.name for path in stage_dir.iterdir())
+            self.assertEqual([file.name for file in loader_files if file.parent == stage_dir], staged)
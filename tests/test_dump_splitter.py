@@ -0,0 +1,199 @@
+"""
+Created on 2026-10-17
+
+test splitting dumps into batches
+
+@author: wf
+"""
+
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import rdflib
+from rdflib.compare import isomorphic
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_splitter import DumpBatch, DumpSplitter
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+from tests.test_upload_stream import UploadHandler
+
+TRICKY_TURTLE = '''@prefix ex: <http://example.org/> .
+# a comment with a dot .
+ex:a ex:label "a dot . in a string" ;
+    ex:note """a long string
+spanning lines . with "quotes" and ' ending .""" .
+PREFIX foaf: <http://xmlns.com/foaf/0.1/>
+ex:b foaf:name 'single \\' quoted .' , "second" ;
+    ex:value 1.5 ; ex:iri <http://example.org/x.y#z> . # trailing comment
+ex:c ex:list ( ex:d ex:e ) ; ex:node [ ex:p "nested ." ] .
+@prefix ex: <http://example.com/other/> .
+ex:f ex:g ex:h .
+'''
+
+
+class TestDumpSplitter(Basetest):
+    """
+    test the N-Triples and Turtle splitter
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+
+    def check_batches(self, path: Path, batch_size: int, rdf_format: str) -> list:
+        """
+        split the given file and check that the batches hold the same graph
+        """
+        batches = list(DumpSplitter(batch_size).batches(path))
+        merged = rdflib.Graph()
+        for batch in batches:
+            # every batch is a self contained document
+            merged.parse(data=batch.as_turtle().decode(), format="turtle")
+        with DumpCompression.of_path(path).open_read(path) as f:
+            original = rdflib.Graph().parse(data=f.read().decode(), format=rdf_format)
+        self.assertTrue(isomorphic(original, merged))
+        return batches
+
+    def test_turtle(self):
+        """
+        Turtle batches end at statement boundaries and carry their prefixes
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tricky.ttl"
+            path.write_text(TRICKY_TURTLE)
+            batches = self.check_batches(path, batch_size=2, rdf_format="turtle")
+            self.assertEqual(4, len(batches))
+            self.assertEqual(["@prefix ex: <http://example.org/> ."], batches[0].directives)
+            self.assertEqual(2, len(batches[2].directives))
+            self.assertEqual([2, 4, 2, 1], [batch.triple_count for batch in batches])
+            royals = self.ogp.examples_dir / "royals.ttl"
+            batches = self.check_batches(royals, batch_size=20, rdf_format="turtle")
+            self.assertGreater(len(batches), 1)
+
+    def test_ntriples(self):
+        """
+        N-Triples batches hold exactly batch_size statements - compressed input too
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "dump_000000.nt.gz"
+            with DumpCompression.GZ.open_write(path) as f:
+                for i in range(25):
+                    f.write(f'<http://example.org/s{i}> <http://example.org/p> "o {i} ." .\n'.encode())
+            self.assertEqual("ntriples", DumpSplitter.syntax_of(path))
+            batches = self.check_batches(path, batch_size=10, rdf_format="nt")
+            self.assertEqual([10, 10, 5], [batch.triple_count for batch in batches])
+            self.assertIsNone(DumpSplitter.syntax_of(Path(tmp) / "dump.rdf"))
+
+    def test_blank_node_labels(self):
+        """
+        statements of one blank node label in different batches still share their node
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bnodes.nt"
+            path.write_text(
+                '_:b1 <http://example.org/p> "o1 _:b1" .\n'
+                "_:b1 <http://example.org/p> <http://example.org/_:o2> .\n"
+                "<http://example.org/s> <http://example.org/q> _:b2.\n"
+            )
+            graph = rdflib.Graph()
+            batches = list(DumpSplitter(batch_size=1).batches(path))
+            self.assertEqual(3, len(batches))
+            for batch in batches:
+                graph.update(batch.as_sparql_insert())
+            p = rdflib.URIRef("http://example.org/p")
+            subjects = set(graph.subjects(p, None))
+            self.assertEqual(1, len(subjects))
+            # labels in strings and IRIs are left alone
+            self.assertEqual({"o1 _:b1", "http://example.org/_:o2"}, {str(o) for o in graph.objects(None, p)})
+            b2 = graph.value(rdflib.URIRef("http://example.org/s"), rdflib.URIRef("http://example.org/q"))
+            self.assertTrue(str(b2).endswith(":b2"))
+            skolem = str(next(iter(subjects)))
+            self.assertTrue(skolem.startswith(DumpSplitter.genid_base) and skolem.endswith(":b1"))
+            # every split file gets nodes of its own
+            other = next(DumpSplitter(batch_size=1).batches(path)).statements[0]
+            self.assertNotIn(skolem, other)
+            # a file that fits into a single batch keeps its blank nodes
+            single = list(DumpSplitter(batch_size=10).batches(path))
+            self.assertEqual(1, len(single))
+            self.assertEqual(path.read_text(), single[0].as_turtle().decode())
+            # a prefix name ending with _ is no blank node label
+            self.assertEqual("ex_:b1 ex:p ex:o .", DumpSplitter(1).skolemize("ex_:b1 ex:p ex:o .", "urn:x:"))
+
+    def test_sparql_insert(self):
+        """
+        batches convert to INSERT DATA updates without parsing the statements
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tricky.ttl"
+            path.write_text(TRICKY_TURTLE)
+            graph = rdflib.Graph()
+            for batch in DumpSplitter(batch_size=2).batches(path):
+                sparql_insert = batch.as_sparql_insert()
+                self.assertNotIn("@prefix", sparql_insert)
+                graph.update(sparql_insert)
+            original = rdflib.Graph().parse(data=TRICKY_TURTLE, format="turtle")
+            self.assertTrue(isomorphic(original, graph))
+        self.assertEqual("BASE <http://example.org/>", DumpBatch.as_sparql_directive("@base <http://example.org/> ."))
+
+    def test_qlever_liveload(self):
+        """
+        QLever gets a dump as bounded INSERT DATA updates with its access token
+        """
+        fake = ThreadingHTTPServer(("localhost", 0), UploadHandler)
+        fake.uploads = []
+        threading.Thread(target=fake.serve_forever, daemon=True).start()
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        server = servers["qlever"]
+        try:
+            server.config.sparql_url = f"http://localhost:{fake.server_port}/"
+            server.config.access_token = "secret"
+            server.config.liveload_batch_size = 20
+            royals_path = self.ogp.examples_dir / "royals.ttl"
+            self.assertTrue(server.load_file(str(royals_path)))
+            self.assertGreater(len(fake.uploads), 1)
+            graph = rdflib.Graph()
+            for _transfer_encoding, _content_encoding, body in fake.uploads:
+                graph.update(body.decode())
+            # the SPARQL parser normalizes dateTime literals other than the Turtle parser
+            expected = rdflib.Graph()
+            expected.update(f"INSERT DATA {{ {royals_path.read_text()} }}")
+            self.assertTrue(isomorphic(expected, graph))
+        finally:
+            server.close_session()
+            fake.shutdown()
+            fake.server_close()
+
+    def test_liveload_batched(self):
+        """
+        a server with a liveload_batch_size uploads big files in batches
+        """
+        fake = ThreadingHTTPServer(("localhost", 0), UploadHandler)
+        fake.uploads = []
+        threading.Thread(target=fake.serve_forever, daemon=True).start()
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        server = servers["oxigraph"]
+        try:
+            server.config.upload_url = f"http://localhost:{fake.server_port}/store?default"
+            server.config.liveload_batch_size = 20
+            with tempfile.TemporaryDirectory() as tmp:
+                shutil.copy(self.ogp.examples_dir / "royals.ttl", tmp)
+                server.config.dumps_dir = tmp
+                self.assertEqual(1, server.liveload_dump_files())
+            self.assertGreater(len(fake.uploads), 1)
+            merged = rdflib.Graph()
+            for _transfer_encoding, _content_encoding, body in fake.uploads:
+                merged.parse(data=body.decode(), format="turtle")
+            royals = rdflib.Graph().parse(self.ogp.examples_dir / "royals.ttl")
+            self.assertTrue(isomorphic(royals, merged))
+        finally:
+            server.close_session()
+            fake.shutdown()
+            fake.server_close()
@@ -0,0 +1,119 @@
+"""
+Created on 2026-10-17
+
+test the load benchmark
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from omnigraph.load_benchmark import ContainerMemorySampler, LoadBenchmark
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.rdfgen import RdfGenerator
+from omnigraph.server_config import LoadPath
+from omnigraph.servers.oxigraph import Oxigraph
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+
+
+class CountingOxigraph(Oxigraph):
+    """
+    loads by counting the lines of the dumps instead of talking to a container
+    """
+
+    def clear(self) -> int:
+        # refuses like the real clear above the unforced_clear_limit
+        self.clears.append(self.env.force)
+        if self.env.force or self.triples < 200:
+            self.triples = 0
+        return self.triples
+
+    def load_dump_files(self, file_pattern: str = None, path: LoadPath = None) -> int:
+        files = self.get_dump_files(file_pattern)
+        for file in files:
+            self.triples += len(file.read_text().splitlines())
+        return len(files)
+
+    def count_triples(self) -> int:
+        return self.triples
+
+
+class TestLoadBenchmark(Basetest):
+    """
+    test timing the load paths on synthetic datasets
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+
+    def test_parse_mem_usage(self):
+        """
+        the MemUsage column of docker stats is parsed to MB
+        """
+        self.assertEqual(123.5, ContainerMemorySampler.parse_mem_usage("123.5MiB / 7.6GiB"))
+        self.assertEqual(2048, ContainerMemorySampler.parse_mem_usage("2GiB / 7.6GiB"))
+        self.assertIsNone(ContainerMemorySampler.parse_mem_usage("--"))
+
+    def test_loader_containers(self):
+        """
+        the peak includes the containers started while sampling but not those that ran before
+        """
+        sampler = ContainerMemorySampler("oxigraph-omnigraph")
+        sampler.others = {"jena-omnigraph"}
+        stats = "oxigraph-omnigraph\t100MiB / 1GiB\njena-omnigraph\t500MiB / 1GiB\nloader\t50MiB / 1GiB\n"
+        sampler.add_sample(ContainerMemorySampler.parse_stats(stats))
+        self.assertEqual(150, sampler.peak_mb)
+        # an offline loader runs while the server container is stopped
+        sampler.add_sample({"jena-omnigraph": 500, "loader": 300})
+        self.assertEqual(300, sampler.peak_mb)
+
+    def test_benchmark(self):
+        """
+        every load path and size is measured and saved as json and csv
+        """
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        config = servers["oxigraph"].config
+        server = CountingOxigraph(config=config, env=ServerEnv())
+        server.triples = 0
+        server.clears = []
+        with tempfile.TemporaryDirectory() as tmp:
+            config.base_data_dir = f"{tmp}/data"
+            os.makedirs(config.base_data_dir)
+            benchmark = LoadBenchmark({"oxigraph": server}, Path(tmp), sizes=[100, 250])
+            result = benchmark.run()
+            self.assertEqual([100, 250], [record.triples for record in result.records])
+            self.assertTrue(all(record.error is None for record in result.records))
+            # the data of the benchmark itself is cleared with force
+            self.assertEqual([False, True], server.clears)
+            self.assertFalse(server.env.force)
+            json_path, csv_path = result.save(Path(tmp) / "results")
+            self.assertEqual(2, len(json.loads(json_path.read_text())["records"]))
+            self.assertEqual(3, len(csv_path.read_text().splitlines()))
+            self.assertIn("triples/s", result.as_table())
+            # a second generation of the same size and seed is identical
+            dumps_dir = benchmark.dataset_dir(100)
+            again = RdfGenerator(100).generate(Path(tmp) / "again")
+            self.assertEqual((dumps_dir / "dump_000000.ttl").read_bytes(), again[0].read_bytes())
+
+    def test_dir_size(self):
+        """
+        hard links to the excluded dumps and to each other are not counted
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            dumps_dir = Path(tmp) / "dumps"
+            data_dir = Path(tmp) / "data"
+            dumps_dir.mkdir()
+            data_dir.mkdir()
+            (dumps_dir / "dump.ttl").write_bytes(b"x" * 100)
+            os.link(dumps_dir / "dump.ttl", data_dir / "dump.ttl")
+            (data_dir / "store.db").write_bytes(b"y" * 10)
+            os.link(data_dir / "store.db", data_dir / "store.link")
+            self.assertEqual(10, LoadBenchmark.dir_size(data_dir, exclude=dumps_dir))
+            self.assertEqual(110, LoadBenchmark.dir_size(data_dir))
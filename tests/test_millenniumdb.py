@@ -0,0 +1,105 @@
+"""
+Created on 2026-10-17
+
+test the MillenniumDB build pipeline
+
+@author: wf
+"""
+
+import tempfile
+from pathlib import Path
+from typing import List
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.servers.millenniumdb import BuildHistory
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+
+
+class TestMillenniumDB(Basetest):
+    """
+    test staging, validation, progress and timing of mdb import builds
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.server = servers["millenniumdb"]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server.config.base_data_dir = f"{self.tmp.name}/data"
+        self.server.config.dumps_dir = f"{self.tmp.name}/dumps"
+        self.dumps_dir = Path(self.server.config.dumps_dir)
+        self.dumps_dir.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        Basetest.tearDown(self)
+
+    def write_dump(self, name: str, compression: DumpCompression, text: str) -> Path:
+        path = self.dumps_dir / f"{name}{compression.suffix}"
+        with compression.open_write(path) as f:
+            f.write(text.encode())
+        return path
+
+    def fake_import(self, output: str, exit_code: int = 0):
+        """
+        let the import command print the given output instead of running docker
+        """
+
+        def fake_import_command(import_files: List[Path], data_dir: Path) -> List[str]:
+            self.import_cmd = type(self.server).get_import_command(self.server, import_files, data_dir)
+            return ["sh", "-c", f"printf '{output}'; exit {exit_code}"]
+
+        self.server.get_import_command = fake_import_command
+
+    def test_prepare_dumps(self):
+        """
+        dumps are staged and decompressed in parallel and truncated ones are rejected
+        """
+        triple = "<http://example.org/s> <http://example.org/p> 1 .\n"
+        self.write_dump("dump_000000.ttl", DumpCompression.NONE, triple)
+        self.write_dump("dump_000001.ttl", DumpCompression.GZ, triple + "# done\n")
+        stage_dir = Path(self.server.config.base_data_dir) / "staged_dumps"
+        files = self.server.get_import_files()
+        staged = self.server.prepare_dumps(files, stage_dir)
+        self.assertEqual(["dump_000000.ttl", "dump_000001.ttl"], [path.name for path in staged])
+        # a plain dump is read where it is - only the compressed one is staged
+        self.assertEqual(files[0], staged[0])
+        self.assertEqual(["dump_000001.ttl"], [path.name for path in stage_dir.iterdir()])
+        self.assertEqual(triple, staged[0].read_text())
+        self.write_dump(
+            "dump_000002.ttl", DumpCompression.NONE, triple + '<http://example.org/s> <http://example.org/p> "cut'
+        )
+        with self.assertRaises(ValueError) as context:
+            self.server.prepare_dumps(self.server.get_import_files(), stage_dir)
+        self.assertIn("dump_000002.ttl", str(context.exception))
+
+    def test_build_database(self):
+        """
+        the import progress is parsed and every build is recorded for comparison
+        """
+        self.write_dump("dump_000000.ttl", DumpCompression.NONE, "<http://example.org/s> <http://example.org/p> 1 .\n")
+        self.fake_import("parsing\\n500 triples\\n1,000 triples\\ndone\\n")
+        for _run in range(2):
+            record = self.server.build_database()
+            self.assertEqual(1000, record.triples)
+            self.server.record_build(record)
+        self.write_dump("dump_000001.ttl", DumpCompression.GZ, "<http://example.org/s> <http://example.org/p> 2 .\n")
+        self.fake_import("1,000 triples\n")
+        self.server.build_database()
+        # the plain dump is mounted read-only, the decompressed one is staged
+        self.assertIn(f"{self.dumps_dir.resolve()}:/import:ro", self.import_cmd)
+        import_index = self.import_cmd.index("import")
+        self.assertEqual(
+            ["/import/dump_000000.ttl", "/data/staged_dumps/dump_000001.ttl", f"/data/{self.server.config.dataset}"],
+            self.import_cmd[import_index + 1 :],
+        )
+        history = BuildHistory.of_path(self.server.get_build_history_path())
+        self.assertEqual(2, len(history.builds))
+        self.assertGreater(history.builds[0].triples_per_sec, 0)
+        self.fake_import("error: bad file\\n", exit_code=1)
+        self.assertIsNone(self.server.build_database())
@@ -4,6 +4,9 @@ Created on 2025-06-04
 @author: wf
 """
 
+import io
+import sys
+import time
 from pathlib import Path
 
 from lodstorage.prefix_config import PrefixConfigs
@@ -12,7 +15,7 @@ from omnigraph.ominigraph_paths import OmnigraphPaths
 from omnigraph.omnigraph_cmd import OmnigraphCmd
 from omnigraph.omniserver import OmniServer
 from omnigraph.rdf_dataset import RdfDatasets
-from omnigraph.server_config import ServerEnv
+from omnigraph.server_config import ServerCmd, ServerEnv
 from omnigraph.sparql_server import SparqlServer
 from tests.basetest import Basetest
 
@@ -187,3 +190,36 @@ class TestOmniServer(Basetest):
             print(f"Actual dumps_dir: {actual_dumps_dir}")
 
         self.assertEqual(actual_dumps_dir, expected_dumps_dir)
+
+    def test_parallel_cmds(self):
+        """
+        --parallel runs the command sequences of the servers concurrently with prefixed output
+        """
+        cmd = OmnigraphCmd()
+        cmd.args = cmd.get_arg_parser("test", "test").parse_args(["--parallel", "3"])
+        servers_dict = self.omni_server.servers(self.servers_yaml_path, filter_active=False)
+        cmd.servers = {name: servers_dict[name] for name in ["jena", "oxigraph", "qlever"]}
+        cmd.server_cmds["nap"] = lambda s: ServerCmd(f"nap {s.name}", lambda: time.sleep(0.5) or s.name)
+        output = io.StringIO()
+        stdout = sys.stdout
+        sys.stdout = output
+        try:
+            start_time = time.time()
+            rows = cmd.run_cmds_parallel(["nap"], workers=3)
+            elapsed = time.time() - start_time
+        finally:
+            sys.stdout = stdout
+        self.assertLess(elapsed, 1.2)
+        self.assertEqual(["✅"] * 3, [row["result"] for row in rows])
+        lines = output.getvalue().splitlines()
+        self.assertIn("[qlever] nap qlever: qlever", lines)
+        self.assertTrue(any(line.startswith("server") for line in lines))
+        # a command reporting False fails the server in the summary
+        cmd.server_cmds["fail"] = lambda s: ServerCmd(f"fail {s.name}", lambda: s.name != "oxigraph")
+        sys.stdout = io.StringIO()
+        try:
+            rows = cmd.run_cmds_parallel(["fail", "nap"], workers=3)
+        finally:
+            sys.stdout = stdout
+        results = {row["server"]: row["result"] for row in rows}
+        self.assertEqual({"jena": "✅", "oxigraph": "❌ fail", "qlever": "✅"}, results)
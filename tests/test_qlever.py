@@ -5,12 +5,41 @@ Created on 2025-05-29
 """
 
 import json
+import os
+import tempfile
+from pathlib import Path
+
+from basemkit.shell import ShellResult
 
 from omnigraph.ominigraph_paths import OmnigraphPaths
-from omnigraph.servers.qlever import QLeverfile
+from omnigraph.omniserver import OmniServer
+from omnigraph.servers.qlever import QLever, QLeverfile
+from omnigraph.sparql_server import ServerEnv
 from tests.basetest import Basetest
 
 
+class IndexRecordingQLever(QLever):
+    """
+    records the qlever commands instead of running them - an index command
+    writes the meta-data.json as the qlever CLI would
+    """
+
+    def run_shell_command(self, command: str, success_msg: str = None, error_msg: str = None) -> ShellResult:
+        self.commands.append(command)
+        if "qlever index" in command:
+            (Path(self.config.data_dir) / "olympics.meta-data.json").write_text("{}")
+        return ShellResult(None, True)
+
+    def stop(self):
+        pass
+
+    def rm(self):
+        pass
+
+    def endpoint_answers(self) -> bool:
+        return True
+
+
 class TestQLever(Basetest):
     """
     test qlever haandling
@@ -36,3 +65,70 @@ class TestQLever(Basetest):
         access_token = qlever_file.get("server", "ACCESS_TOKEN")
         if self.debug:
             print(f"access_token: {access_token}")
+
+    def test_incremental_build(self):
+        """
+        an unchanged input set skips the rebuild and dumps are linked not copied
+        """
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        config = servers["qlever"].config
+        with tempfile.TemporaryDirectory() as tmp:
+            config.data_dir = f"{tmp}/data"
+            config.dumps_dir = f"{tmp}/dumps"
+            os.makedirs(config.data_dir)
+            os.makedirs(config.dumps_dir)
+            Path(config.data_dir, "Qleverfile").write_text("[data]\nNAME = olympics\n\n[index]\n\n[server]\n")
+            dump = Path(config.dumps_dir) / "dump_000000.ttl"
+            dump.write_text("<http://example.org/s> <http://example.org/p> 1 .\n")
+            qlever = IndexRecordingQLever(config=config, env=ServerEnv())
+            qlever.commands = []
+            self.assertEqual(1, qlever.build_from_dump_files())
+            staged = Path(config.data_dir) / dump.name
+            self.assertTrue(os.path.samefile(dump, staged))
+            self.assertTrue(any("qlever index" in command for command in qlever.commands))
+            # unchanged - even when touched
+            qlever.commands = []
+            os.utime(dump)
+            self.assertEqual(1, qlever.build_from_dump_files())
+            self.assertEqual([], qlever.commands)
+            # changed content rebuilds
+            dump.write_text("<http://example.org/s> <http://example.org/p> 2 .\n")
+            self.assertEqual(1, qlever.build_from_dump_files())
+            self.assertTrue(any("qlever index" in command for command in qlever.commands))
+            # forced rebuilds
+            qlever.commands = []
+            qlever.env.force = True
+            self.assertEqual(1, qlever.build_from_dump_files())
+            self.assertTrue(any("qlever index" in command for command in qlever.commands))
+
+    def test_native_triple_count(self):
+        """
+        the triple count of the meta-data.json is only trusted while the index is the one of its build
+        """
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        config = servers["qlever"].config
+        with tempfile.TemporaryDirectory() as tmp:
+            config.data_dir = f"{tmp}/data"
+            config.dumps_dir = f"{tmp}/dumps"
+            os.makedirs(config.data_dir)
+            os.makedirs(config.dumps_dir)
+            Path(config.data_dir, "Qleverfile").write_text("[data]\nNAME = olympics\n\n[index]\n\n[server]\n")
+            Path(config.dumps_dir, "dump_000000.ttl").write_text("<http://example.org/s> <http://example.org/p> 1 .\n")
+            qlever = IndexRecordingQLever(config=config, env=ServerEnv())
+            qlever.commands = []
+            self.assertIsNone(qlever.get_native_triple_count())
+            self.assertEqual(1, qlever.build_from_dump_files())
+            meta_data_path = Path(config.data_dir) / "olympics.meta-data.json"
+            meta_data_path.write_text(json.dumps({"num-triples": {"normal": 3, "internal": 7}}))
+            self.assertEqual(3, qlever.get_native_triple_count())
+            meta_data_path.write_text(json.dumps({"num-triples-normal": 4}))
+            self.assertEqual(4, qlever.get_native_triple_count())
+            # an index removed by hand
+            meta_data_path.unlink()
+            self.assertIsNone(qlever.get_native_triple_count())
+            meta_data_path.write_text(json.dumps({"num-triples-normal": 4}))
+            # a liveload update is not in the meta-data
+            qlever.invalidate_fingerprint()
+            self.assertIsNone(qlever.get_native_triple_count())
@@ -0,0 +1,111 @@
+"""
+Created on 2026-10-17
+
+test the query benchmark
+
+@author: wf
+"""
+
+import functools
+import json
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.query_benchmark import QueryBenchmark
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+from tests.fake_sparql_endpoint import FakeSparqlEndpoint
+
+
+class TestQueryBenchmark(Basetest):
+    """
+    test latency statistics, timeouts and result count agreement
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+        omni_server = OmniServer(env=ServerEnv())
+        all_servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.fakes = []
+        self.servers = {}
+        for name, bindings in [("oxigraph", 3), ("jena", 3), ("graphdb", 2)]:
+            fake = FakeSparqlEndpoint()
+            fake.delay = 0
+            fake.routes["/sparql"] = functools.partial(self.answer_bindings, fake, bindings)
+            self.fakes.append(fake.start())
+            server = all_servers[name]
+            server.config.sparql_url = f"{fake.base_url}/sparql"
+            self.servers[name] = server
+        self.queries = QueryBenchmark.load_queries(self.ogp.examples_dir / "queries.yaml", ["ClassHistogram"])
+
+    def answer_bindings(self, fake: FakeSparqlEndpoint, bindings: int, _body: bytes, start: int = 0):
+        """
+        answer with the given number of bindings counting from start after the delay of the fake
+        """
+        time.sleep(fake.delay)
+        rows = [{"x": {"type": "literal", "value": str(start + i)}} for i in range(bindings)]
+        payload = json.dumps({"head": {"vars": ["x"]}, "results": {"bindings": rows}}).encode()
+        answer = (200, "application/sparql-results+json", payload)
+        return answer
+
+    def tearDown(self):
+        for server in self.servers.values():
+            server.close_session()
+        for fake in self.fakes:
+            fake.stop()
+        Basetest.tearDown(self)
+
+    def test_query_benchmark(self):
+        """
+        every server gets warmup and measured runs and disagreeing counts are flagged
+        """
+        benchmark = QueryBenchmark(self.servers, self.queries, runs=4, warmup=2, clients=2, params={"limit": "7"})
+        result = benchmark.run()
+        agrees = {timing.server: timing.agrees for timing in result.timings}
+        self.assertEqual({"oxigraph": False, "jena": False, "graphdb": False}, agrees)
+        for timing in result.timings:
+            self.assertEqual(4, timing.runs)
+            self.assertLessEqual(timing.min_ms, timing.median_ms)
+            self.assertLessEqual(timing.p95_ms, timing.max_ms)
+        for fake in self.fakes:
+            queries = [parse_qs(body.decode())["query"][0] for _method, _path, body in fake.requests]
+            self.assertEqual(6, len(queries))
+            self.assertIn("LIMIT 7", queries[0])
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path, _csv_path = result.save(Path(tmp))
+            self.assertEqual(3, len(json.loads(json_path.read_text())["timings"]))
+        self.assertIn("p95 ms", result.as_table())
+
+    def test_single_row_values(self):
+        """
+        a single row result like an aggregate count agrees by its values, not by its row count
+        """
+        for fake, start in zip(self.fakes, [42, 42, 41]):
+            fake.routes["/sparql"] = functools.partial(self.answer_bindings, fake, 1, start=start)
+        result = QueryBenchmark(self.servers, self.queries, runs=1, warmup=0).run()
+        timings = {timing.server: timing for timing in result.timings}
+        self.assertEqual({1}, {timing.result_count for timing in timings.values()})
+        self.assertEqual(timings["oxigraph"].result_hash, timings["jena"].result_hash)
+        self.assertNotEqual(timings["oxigraph"].result_hash, timings["graphdb"].result_hash)
+        self.assertFalse(timings["oxigraph"].agrees)
+        del self.servers["graphdb"]
+        result = QueryBenchmark(self.servers, self.queries, runs=1, warmup=0).run()
+        self.assertEqual([True, True], [timing.agrees for timing in result.timings])
+
+    def test_timeout(self):
+        """
+        a query slower than its timeout counts as timeout, not as run
+        """
+        self.fakes[2].delay = 0.5
+        del self.servers["jena"]
+        benchmark = QueryBenchmark(self.servers, self.queries, runs=2, warmup=0, timeouts={"ClassHistogram": 0.2})
+        result = benchmark.run()
+        timings = {timing.server: timing for timing in result.timings}
+        self.assertEqual(2, timings["graphdb"].timeouts)
+        self.assertEqual(0, timings["graphdb"].runs)
+        self.assertTrue(timings["oxigraph"].agrees)
@@ -4,15 +4,96 @@ Created on 2025-05-26
 @author: wf
 """
 
+import re
+import tempfile
+import threading
+import time
 from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
+from lodstorage.rdf_format import RdfFormat
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_manifest import DumpManifest
 from omnigraph.ominigraph_paths import OmnigraphPaths
 from omnigraph.rdf_dataset import RdfDataset, RdfDatasets
-from omnigraph.rdfdump import RdfDumpDownloader
+from omnigraph.rdfdump import PageFetchError, RdfDumpDownloader, RetryPolicy, TokenBucket
 from tests.basetest import Basetest
 
 
+class FakeChunkDownloader(RdfDumpDownloader):
+    """
+    a downloader that answers chunks locally instead of asking an endpoint
+    """
+
+    def __init__(self, solution_count: int, **kwargs):
+        super().__init__(**kwargs)
+        self.dataset.get_solution_count = lambda: solution_count
+        self.offsets = []
+
+    def fetch_chunk_to_file(self, offset: int, filename: Path, query: str = None) -> int:
+        self.offsets.append(offset)
+        content = f"<http://example.org/s{offset}> <http://example.org/p> {offset} .\n"
+        filename.write_text(content)
+        return len(content)
+
+
+class SheddingChunkDownloader(FakeChunkDownloader):
+    """
+    a fake downloader whose endpoint sheds pages above a given size with a 502
+    """
+
+    def __init__(self, shed_above: int, **kwargs):
+        super().__init__(**kwargs)
+        self.shed_above = shed_above
+        self.pages = []
+
+    def fetch_chunk_to_file(self, offset: int, filename: Path, query: str = None) -> int:
+        limit = int(re.search(r"LIMIT (\d+)", query).group(1))
+        self.pages.append((offset, limit))
+        if limit > self.shed_above:
+            raise PageFetchError(502, "Bad Gateway")
+        byte_count = super().fetch_chunk_to_file(offset, filename, query)
+        return byte_count
+
+
+class FlakyChunkDownloader(FakeChunkDownloader):
+    """
+    a fake downloader whose endpoint answers pages with a 503 a given number of times
+    """
+
+    def __init__(self, failures: dict, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def fetch_chunk_to_file(self, offset: int, filename: Path, query: str = None) -> int:
+        if self.failures.get(offset, 0) > 0:
+            self.failures[offset] -= 1
+            raise PageFetchError(503, "Service Unavailable")
+        byte_count = super().fetch_chunk_to_file(offset, filename, query)
+        return byte_count
+
+
+class FakeEndpointHandler(BaseHTTPRequestHandler):
+    """
+    answers every POST with the body configured on the server
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = self.server.body
+        self.send_response(200)
+        self.send_header("Content-Type", "text/turtle")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
 class TestRdfDumpDownloader(Basetest):
     """
     Test RDF Dump Downloader
@@ -141,3 +222,299 @@ class TestRdfDumpDownloader(Basetest):
         if self.debug:
             print(f"Expanded path: {expanded_path}")
             print(f"File parent: {expanded_path.parent}")
+
+    def get_fake_downloader(
+        self,
+        output_path: str,
+        workers: int,
+        solution_count: int = 45,
+        pagination: str = "offset",
+        downloader_class=FakeChunkDownloader,
+        **kwargs,
+    ) -> FakeChunkDownloader:
+        """
+        get a downloader for a local fake endpoint
+        """
+        dataset = RdfDataset(
+            name="fake", endpoint_url="http://localhost:1/sparql", calls_per_minute=60000, pagination=pagination
+        )
+        args = Namespace(
+            limit=10,
+            max_count=None,
+            no_progress=True,
+            force=False,
+            rdf_format="turtle",
+            debug=False,
+            workers=workers,
+        )
+        downloader = downloader_class(
+            solution_count=solution_count, dataset=dataset, output_path=output_path, args=args, **kwargs
+        )
+        return downloader
+
+    def test_token_bucket(self):
+        """
+        the token bucket paces requests to its calls per minute
+        """
+        bucket = TokenBucket(calls_per_minute=600)
+        start = time.monotonic()
+        for _i in range(4):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+        # the first token is available at once, the three others take 0.1 s each
+        self.assertGreaterEqual(elapsed, 0.25)
+
+    def test_concurrent_download(self):
+        """
+        concurrent workers keep the chunk naming and skip existing chunks
+        """
+        with tempfile.TemporaryDirectory() as output_path:
+            downloader = self.get_fake_downloader(output_path, workers=4)
+            chunks = downloader.download()
+            self.assertEqual(5, chunks)
+            names = sorted(path.name for path in Path(output_path).glob("dump_*"))
+            self.assertEqual([f"dump_{i:06d}.ttl" for i in range(5)], names)
+            self.assertIn("s20", (Path(output_path) / "dump_000002.ttl").read_text())
+            # resume - only the missing chunk is fetched again
+            (Path(output_path) / "dump_000003.ttl").unlink()
+            downloader = self.get_fake_downloader(output_path, workers=4)
+            chunks = downloader.download()
+            self.assertEqual(1, chunks)
+            self.assertEqual([30], downloader.offsets)
+
+    def test_keyset_queries(self):
+        """
+        keyset pages are closed by the key of the limit-th solution and
+        restricted by key ranges instead of OFFSET
+        """
+        dataset = RdfDataset(name="keyset", endpoint_url="http://localhost:1/sparql", pagination="keyset")
+        boundary_query = dataset.get_keyset_boundary_query('http://example.org/"a"', 1000)
+        self.assertIn('FILTER(STR(?s) > "http://example.org/\\"a\\"")', boundary_query)
+        self.assertIn("ORDER BY STR(?s)", boundary_query)
+        self.assertIn("OFFSET 999", boundary_query)
+        construct_query = dataset.get_keyset_construct_query("http://a", "http://b")
+        self.assertIn('FILTER(STR(?s) > "http://a" && STR(?s) <= "http://b")', construct_query)
+        self.assertNotIn("OFFSET", construct_query)
+        gov_full = self.datasets.datasets["gov_full"]
+        self.assertEqual("offset", gov_full.pagination_strategy.value)
+
+    def test_keyset_download(self):
+        """
+        a keyset dump fetches one chunk per key range
+        """
+
+        class FakeKeys:
+            def __init__(self, keys):
+                self.keys = keys
+                self.fetched = threading.Event()
+                # whether the first page was fetched before the walk ended
+                self.overlapped = None
+
+            def getValue(self, query, attr):
+                if not self.keys:
+                    self.overlapped = self.fetched.wait(timeout=5)
+                return self.keys.pop(0) if self.keys else None
+
+        class KeysetDownloader(FakeChunkDownloader):
+            def fetch_chunk_to_file(self, offset: int, filename: Path, query: str = None) -> int:
+                byte_count = super().fetch_chunk_to_file(offset, filename, query)
+                self.dataset.sparql.fetched.set()
+                return byte_count
+
+        with tempfile.TemporaryDirectory() as output_path:
+            downloader = self.get_fake_downloader(
+                output_path, workers=2, pagination="keyset", downloader_class=KeysetDownloader
+            )
+            downloader.dataset.sparql = FakeKeys(["http://example.org/s1", "http://example.org/s2"])
+            chunks = downloader.download()
+            self.assertEqual(3, chunks)
+            self.assertTrue(downloader.dataset.sparql.overlapped)
+            self.assertEqual(
+                [
+                    (None, "http://example.org/s1"),
+                    ("http://example.org/s1", "http://example.org/s2"),
+                    ("http://example.org/s2", None),
+                ],
+                downloader.key_ranges,
+            )
+            # a resume takes the ranges of the manifest without walking again
+            resumed = self.get_fake_downloader(output_path, workers=2, pagination="keyset")
+            resumed.dataset.sparql = None
+            self.assertEqual(0, resumed.download())
+            self.assertEqual(downloader.key_ranges, resumed.key_ranges)
+
+    def test_fetch_chunk_to_file(self):
+        """
+        a page is streamed to disk in blocks and renamed into place - an
+        error page and an empty answer leave no chunk file behind
+        """
+        server = HTTPServer(("127.0.0.1", 0), FakeEndpointHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with tempfile.TemporaryDirectory() as output_path:
+                downloader = self.get_fake_downloader(output_path, workers=1)
+                downloader.endpoint_url = f"http://127.0.0.1:{server.server_port}/sparql"
+                downloader.block_size = 16
+                filename = Path(output_path) / "dump_000000.ttl"
+                triples = "".join(f"<http://example.org/s{i}> <http://example.org/p> {i} .\n" for i in range(100))
+                server.body = triples.encode()
+                byte_count = RdfDumpDownloader.fetch_chunk_to_file(downloader, 0, filename)
+                self.assertEqual(len(triples), byte_count)
+                self.assertEqual(triples, filename.read_text())
+                filename.unlink()
+                # a compressed dump holds the same content
+                downloader.compression = DumpCompression.GZ
+                gz_filename = Path(output_path) / "dump_000000.ttl.gz"
+                RdfDumpDownloader.fetch_chunk_to_file(downloader, 0, gz_filename)
+                with DumpCompression.GZ.open_read(gz_filename) as f:
+                    self.assertEqual(triples, f.read().decode())
+                gz_filename.unlink()
+                downloader.compression = DumpCompression.NONE
+                server.body = b"<HTML><body>slow down</body></html>"
+                with self.assertRaises(Exception):
+                    RdfDumpDownloader.fetch_chunk_to_file(downloader, 0, filename)
+                server.body = b"  \n"
+                byte_count = RdfDumpDownloader.fetch_chunk_to_file(downloader, 0, filename)
+                self.assertEqual(0, byte_count)
+                self.assertEqual([], list(Path(output_path).iterdir()))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_manifest(self):
+        """
+        the manifest records every chunk - a truncated or unrecorded file is
+        refetched and verify names the chunks that do not match their record
+        """
+        with tempfile.TemporaryDirectory() as output_path:
+            downloader = self.get_fake_downloader(output_path, workers=2)
+            downloader.download()
+            manifest = DumpManifest.of_dir(Path(output_path))
+            self.assertEqual(5, len(manifest.chunks))
+            record = manifest.chunks["dump_000001.ttl"]
+            self.assertEqual(10, record.offset)
+            self.assertEqual(1, record.approx_triple_count)
+            self.assertEqual({}, manifest.verify(Path(output_path)))
+            summary = manifest.summary()
+            if self.debug:
+                print(summary)
+            self.assertIn("triples", summary)
+            # a killed process may have left a truncated file
+            chunk_path = Path(output_path) / "dump_000002.ttl"
+            chunk_path.write_text("<http://example.org/s20>")
+            self.assertIn("dump_000002.ttl", manifest.verify(Path(output_path)))
+            downloader = self.get_fake_downloader(output_path, workers=2)
+            downloader.download()
+            self.assertEqual([20], downloader.offsets)
+            manifest = DumpManifest.of_dir(Path(output_path))
+            self.assertEqual({}, manifest.verify(Path(output_path)))
+
+    def test_estimate_triples(self):
+        """
+        chunk triples are estimated by streaming the statements - None for formats that are not scanned
+        """
+        with tempfile.TemporaryDirectory() as output_path:
+            downloader = self.get_fake_downloader(output_path, workers=1)
+            filename = Path(output_path) / "dump_000000.ttl"
+            filename.write_text(
+                "@prefix ex: <http://example.org/> .\n"
+                'ex:s ex:p ex:o1, ex:o2 ;\n    ex:q "a . b ; c" .\n'
+                "ex:t ex:p ex:o .  # a comment ; with separators\n"
+            )
+            self.assertEqual(4, downloader.estimate_triples(filename))
+            # the five triples of a collection count as one - an estimate only
+            filename.write_text("@prefix ex: <http://example.org/> .\nex:s ex:p (ex:a ex:b) .\n")
+            self.assertEqual(1, downloader.estimate_triples(filename))
+            downloader.rdf_format = RdfFormat.JSON_LD
+            self.assertIsNone(downloader.estimate_triples(filename))
+
+    def test_adaptive_download(self):
+        """
+        adaptive pages grow while fast, halve when shed and resume
+        from the page boundaries in the manifest
+        """
+        with tempfile.TemporaryDirectory() as output_path:
+            dataset = RdfDataset(name="fake", endpoint_url="http://localhost:1/sparql", calls_per_minute=60000)
+            args = Namespace(
+                limit=10,
+                max_count=None,
+                no_progress=True,
+                force=False,
+                rdf_format="turtle",
+                debug=False,
+                adaptive=True,
+                target_latency=1000,
+                min_limit=5,
+                max_limit=80,
+            )
+            downloader = SheddingChunkDownloader(
+                shed_above=20, solution_count=100, dataset=dataset, output_path=output_path, args=args
+            )
+            chunks = downloader.download()
+            self.assertEqual(6, chunks)
+            self.assertIsNone(downloader.endpoint_error)
+            # the shed size 40 is not tried again
+            expected_pages = [(0, 10), (10, 20), (30, 40), (30, 20), (50, 20), (70, 20), (90, 20)]
+            self.assertEqual(expected_pages, downloader.pages)
+            manifest = DumpManifest.of_dir(Path(output_path))
+            record = manifest.chunks["dump_000002.ttl"]
+            self.assertEqual((30, 20), (record.offset, record.limit))
+            downloader = SheddingChunkDownloader(
+                shed_above=20, solution_count=130, dataset=dataset, output_path=output_path, args=args
+            )
+            chunks = downloader.download()
+            self.assertEqual(1, chunks)
+            self.assertEqual([(110, 20)], downloader.pages)
+            # fixed size pages do not line up with the adaptive ones - skipping by name would drop triples
+            fixed = self.get_fake_downloader(output_path, workers=2, solution_count=130)
+            with self.assertRaises(ValueError):
+                fixed.download()
+            self.assertEqual([], fixed.offsets)
+            fixed.force = True
+            self.assertEqual(13, fixed.download())
+            # a resume with another page size is refused as well
+            other_limit = self.get_fake_downloader(output_path, workers=2, solution_count=130)
+            other_limit.limit = 20
+            with self.assertRaises(ValueError):
+                other_limit.download()
+            self.assertEqual(0, self.get_fake_downloader(output_path, workers=2, solution_count=130).download())
+
+    def test_retry_policy(self):
+        """
+        backoff doubles per attempt with jitter and a Retry-After wins
+        """
+        policy = RetryPolicy(max_attempts=4, backoff_base=2.0, backoff_jitter=0.5)
+        delay = policy.get_delay(3)
+        self.assertTrue(8.0 <= delay <= 12.0, delay)
+        self.assertEqual(7.0, policy.get_delay(1, PageFetchError(429, "Too Many Requests", "7")))
+        http_date = PageFetchError(503, "busy", "Wed, 21 Oct 2015 07:28:00 GMT")
+        self.assertEqual(0.0, http_date.retry_after)
+        self.assertTrue(policy.is_retryable(PageFetchError(429, "Too Many Requests")))
+        self.assertTrue(policy.is_retryable(PageFetchError(502, "Bad Gateway")))
+        self.assertFalse(policy.is_retryable(PageFetchError(400, "Bad Request")))
+        dataset = RdfDataset(name="fake", max_attempts=2, backoff_base=0.5)
+        self.assertEqual(RetryPolicy(max_attempts=2, backoff_base=0.5), RetryPolicy.of_dataset(dataset))
+
+    def test_retry_download(self):
+        """
+        transient failures are retried, pages still failing are queued for
+        a later pass instead of ending the dump
+        """
+        with tempfile.TemporaryDirectory() as output_path:
+            downloader = self.get_fake_downloader(
+                output_path, workers=2, downloader_class=FlakyChunkDownloader, failures={10: 1, 20: 3}
+            )
+            downloader.retry_policy = RetryPolicy(max_attempts=2, backoff_base=0.01, backoff_jitter=0.1)
+            chunks = downloader.download()
+            self.assertEqual(5, chunks)
+            self.assertIsNone(downloader.endpoint_error)
+            self.assertGreater(downloader.backoff_time, 0)
+        with tempfile.TemporaryDirectory() as output_path:
+            downloader = self.get_fake_downloader(
+                output_path, workers=2, downloader_class=FlakyChunkDownloader, failures={20: 10}
+            )
+            downloader.retry_policy = RetryPolicy(max_attempts=2, backoff_base=0.01, backoff_jitter=0.1)
+            chunks = downloader.download()
+            self.assertEqual(4, chunks)
+            self.assertIn("offsets [20]", downloader.endpoint_error)
@@ -0,0 +1,79 @@
+"""
+Created on 2026-10-17
+
+test the synthetic RDF generator
+
+@author: wf
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+import rdflib
+from rdflib.namespace import RDF, XSD
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.dump_manifest import DumpManifest
+from omnigraph.rdfgen import RdfGenConfig, RdfGenerator
+from tests.basetest import Basetest
+
+
+class TestRdfGen(Basetest):
+    """
+    test seeded generation of synthetic dumps
+    """
+
+    def parse(self, paths) -> rdflib.Graph:
+        graph = rdflib.Graph()
+        for path in paths:
+            with DumpCompression.of_path(path).open_read(path) as f:
+                graph.parse(data=f.read().decode(), format="turtle")
+        return graph
+
+    def test_generate(self):
+        """
+        the dump has the requested shape, is valid and verifies against its manifest
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            config = RdfGenConfig(triples=1000, chunk_size=300, fan_out=5, predicates=4, classes=2, typed_ratio=1.0)
+            paths = RdfGenerator(config=config, link_ratio=0.0).generate(Path(tmp), DumpCompression.GZ)
+            self.assertEqual([f"dump_{i:06d}.ttl.gz" for i in range(4)], [path.name for path in paths])
+            graph = self.parse(paths)
+            self.assertEqual(1000, len(graph))
+            self.assertEqual(200, len(set(graph.subjects())))
+            self.assertEqual(5, len(set(graph.predicates())))
+            self.assertEqual(2, len(set(graph.objects(predicate=RDF.type))))
+            datatypes = {obj.datatype for obj in graph.objects() if isinstance(obj, rdflib.Literal)}
+            self.assertLessEqual({XSD.integer, XSD.date}, datatypes)
+            manifest = DumpManifest.of_dir(Path(tmp))
+            self.assertEqual({}, manifest.verify(Path(tmp)))
+            self.assertEqual(1000, sum(record.approx_triple_count for record in manifest.chunks.values()))
+
+    def test_deterministic(self):
+        """
+        the same seed gives the same dump whatever the chunk size - another seed another one
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            a = RdfGenerator(500, seed=7, chunk_size=500).generate(Path(tmp) / "a")
+            b = RdfGenerator(500, seed=7, chunk_size=100).generate(Path(tmp) / "b")
+            c = RdfGenerator(500, seed=8, chunk_size=500).generate(Path(tmp) / "c")
+            self.assertEqual(a[0].read_bytes(), b"".join(path.read_bytes() for path in b))
+            self.assertNotEqual(a[0].read_bytes(), c[0].read_bytes())
+
+    def test_literal_sizes(self):
+        """
+        fixed literal sizes are exact, exponential ones vary around the mean
+        """
+        for distribution in RdfGenerator.literal_distributions:
+            generator = RdfGenerator(200, literal_size=20, literal_distribution=distribution)
+            generator.rng = random.Random(1)
+            lengths = [generator.literal_length() for _i in range(1000)]
+            mean = sum(lengths) / len(lengths)
+            self.assertAlmostEqual(20, mean, delta=3)
+            if distribution == "fixed":
+                self.assertEqual({20}, set(lengths))
+            else:
+                self.assertGreater(len(set(lengths)), 10)
+        with self.assertRaises(ValueError):
+            RdfGenerator(10, literal_distribution="normal")
@@ -0,0 +1,134 @@
+"""
+Created on 2026-10-17
+
+test the pooled keep-alive session of a SparqlServer
+
+@author: wf
+"""
+
+import base64
+import io
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    answers every GET and records the client port and auth header it came with
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.client_address[1], self.headers.get("Authorization")))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.server.lock:
+            self.server.posts.append(self.path)
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(0.1)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        body = b"loaded"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestServerSession(Basetest):
+    """
+    test connection reuse, auth and retries of the server session
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.fake = ThreadingHTTPServer(("localhost", 0), KeepAliveHandler)
+        self.fake.requests = []
+        self.fake.statuses = []
+        self.fake.posts = []
+        self.fake.lock = threading.Lock()
+        self.fake.in_flight = 0
+        self.fake.max_in_flight = 0
+        threading.Thread(target=self.fake.serve_forever, daemon=True).start()
+        self.server = servers["oxigraph"]
+        self.server.config.status_url = f"http://localhost:{self.fake.server_port}/"
+
+    def tearDown(self):
+        self.server.close_session()
+        self.fake.shutdown()
+        self.fake.server_close()
+        Basetest.tearDown(self)
+
+    def test_keep_alive(self):
+        """
+        a probe loop reuses one connection and sends the auth of the config
+        """
+        self.server.config.auth_user = "admin"
+        self.server.config.auth_password = "secret"
+        for _i in range(5):
+            self.assertTrue(self.server.make_request("GET", self.server.config.status_url).success)
+        client_ports = {port for port, _auth in self.fake.requests}
+        self.assertEqual(1, len(client_ports))
+        expected_auth = "Basic " + base64.b64encode(b"admin:secret").decode()
+        self.assertEqual({expected_auth}, {auth for _port, auth in self.fake.requests})
+
+    def test_retries(self):
+        """
+        configured retries pass a transient 503 on an idempotent request
+        """
+        self.server.config.max_retries = 2
+        self.server.config.retry_backoff = 0
+        self.fake.statuses = [503]
+        response = self.server.make_request("GET", self.server.config.status_url)
+        self.assertTrue(response.success)
+        self.assertEqual(2, len(self.fake.requests))
+
+    def test_concurrent_liveload(self):
+        """
+        load workers upload files concurrently only where concurrent writes are declared safe
+        """
+        config = self.server.config
+        config.upload_url = f"http://localhost:{self.fake.server_port}/store?default"
+        config.sparql_url = f"http://localhost:{self.fake.server_port}/query"
+        self.server.env.load_workers = 4
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(8):
+                path = Path(tmp) / f"dump_{i:06d}.ttl"
+                path.write_text(f"<http://example.org/s{i}> <http://example.org/p> {i} .\n")
+            config.dumps_dir = tmp
+            for concurrent_writes, expect_concurrent in [(True, True), (False, False)]:
+                config.concurrent_writes = concurrent_writes
+                self.fake.max_in_flight = 0
+                with redirect_stdout(io.StringIO()) as stdout:
+                    loaded = self.server.liveload_dump_files()
+                # the per file table comes out even without verbose
+                self.assertIn("dump_000007.ttl", stdout.getvalue())
+                self.assertEqual(8, loaded)
+                self.assertEqual(expect_concurrent, self.fake.max_in_flight > 1, self.fake.max_in_flight)
+            # the triples are only counted on request
+            self.assertNotIn("/query", self.fake.posts)
@@ -4,6 +4,8 @@ Created on 2025-05-26
 @author: wf
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 from omnigraph.ominigraph_paths import OmnigraphPaths
@@ -137,3 +139,27 @@ class TestSparqlServer(Basetest):
             0,
             f"{server.full_name}: Expected triples after loading, got {final_count}",
         )
+
+    def test_stage_files(self):
+        """
+        dumps are staged by link instead of copy and the saved bytes are reported
+        """
+        server = self.all_servers["blazegraph"]
+        with tempfile.TemporaryDirectory() as tmp:
+            dumps_dir = Path(tmp) / "dumps"
+            dumps_dir.mkdir()
+            files = []
+            for i in range(2):
+                path = dumps_dir / f"dump_{i:06d}.ttl"
+                path.write_text(f"<http://example.org/s{i}> <http://example.org/p> {i} .\n")
+                files.append(path)
+            stage_dir = Path(tmp) / "stage"
+            report = server.stage_files(files, stage_dir)
+            total = sum(path.stat().st_size for path in files)
+            self.assertEqual({"hardlink": 2}, report.methods)
+            self.assertEqual((total, 0), (report.bytes_saved, report.bytes_copied))
+            for path in files:
+                self.assertTrue(os.path.samefile(path, stage_dir / path.name))
+            report = server.stage_files(files, stage_dir)
+            self.assertEqual({"existing": 2}, report.methods)
+            self.assertIn("GB not copied", str(report))
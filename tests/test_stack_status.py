@@ -0,0 +1,150 @@
+"""
+Created on 2026-10-17
+
+test the stack status collector
+
+@author: wf
+"""
+
+import json
+import subprocess
+
+import requests
+from basemkit.shell import Shell
+
+from omnigraph.async_http import AsyncHttp
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omnigraph_cmd import OmnigraphCmd
+from omnigraph.omniserver import OmniServer
+from omnigraph.server_config import ServerLifecycleState
+from omnigraph.sparql_server import Response, ServerEnv
+from omnigraph.stack_status import StackStatus
+from tests.basetest import Basetest
+from tests.fake_sparql_endpoint import FakeSparqlEndpoint
+
+
+class PsShell(Shell):
+    """
+    answers docker ps with the configured containers and records the commands
+    """
+
+    def __init__(self, containers: list):
+        super().__init__()
+        self.containers = containers
+        self.cmds = []
+
+    def run(self, cmd: str, *args, **kwargs):
+        self.cmds.append(cmd)
+        stdout = "\n".join(json.dumps(container) for container in self.containers) + "\n"
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+
+class TestStackStatus(Basetest):
+    """
+    test collecting the status of the stack with one docker ps
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.fake = FakeSparqlEndpoint(triple_count=42).start()
+        containers = [
+            {"Names": "oxigraph-omnigraph", "State": "running", "Status": "Up 3 hours"},
+            {"Names": "jena-omnigraph", "State": "exited", "Status": "Exited (1) 2 minutes ago"},
+            {"Names": "some-other-container", "State": "running", "Status": "Up 5 days"},
+        ]
+        self.shell = PsShell(containers)
+        omni_server = OmniServer(env=ServerEnv(shell=self.shell), patch_config=self.patch_config)
+        ogp = OmnigraphPaths()
+        all_servers = omni_server.servers(str(ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.servers = {name: all_servers[name] for name in ["oxigraph", "jena", "graphdb"]}
+        self.qlever = all_servers["qlever"]
+
+    def patch_config(self, config):
+        if config.name == "oxigraph":
+            config.host = "localhost"
+            config.port = self.fake.server_port
+            config.base_url = None
+
+    def tearDown(self):
+        for server in self.servers.values():
+            server.close_session()
+        self.fake.stop()
+        Basetest.tearDown(self)
+
+    def test_collect(self):
+        """
+        one docker ps for the stack, probes for the running containers only
+        """
+        rows = {row.server: row for row in StackStatus(self.servers).collect()}
+        self.assertEqual(1, len(self.shell.cmds))
+        self.assertIn("docker ps -a", self.shell.cmds[0])
+        oxigraph = rows["oxigraph"]
+        self.assertEqual(ServerLifecycleState.READY.value, oxigraph.state)
+        self.assertEqual(200, oxigraph.http_status)
+        self.assertEqual("3 hours", oxigraph.uptime)
+        self.assertIsNotNone(oxigraph.probe_ms)
+        self.assertIsNone(oxigraph.triples)
+        self.assertEqual(ServerLifecycleState.ERROR.value, rows["jena"].state)
+        self.assertIsNone(rows["jena"].probe_ms)
+        self.assertEqual(ServerLifecycleState.UNKNOWN.value, rows["graphdb"].state)
+        self.assertEqual("-", rows["graphdb"].docker)
+        markup = StackStatus.as_table(list(rows.values()))
+        self.assertIn("probe ms", markup)
+
+    def test_thread_probes(self):
+        """
+        without aiohttp the probes run in threads with the same outcome
+        """
+        if not AsyncHttp.is_available():
+            self.skipTest("aiohttp not installed - the thread probes are covered by test_collect")
+        stack_status = StackStatus(self.servers, count_triples=True)
+        self.assertTrue(stack_status.use_async)
+        async_rows = {row.server: row for row in stack_status.collect()}
+        stack_status.use_async = False
+        thread_rows = {row.server: row for row in stack_status.collect()}
+        for rows in (async_rows, thread_rows):
+            self.assertEqual(ServerLifecycleState.READY.value, rows["oxigraph"].state)
+            self.assertEqual(200, rows["oxigraph"].http_status)
+            self.assertEqual(42, rows["oxigraph"].triples)
+
+    def test_booting_endpoint(self):
+        """
+        an endpoint answering 503 while booting keeps the server up - with or without aiohttp
+        """
+        self.fake.routes["/"] = (503, "text/plain", b"booting")
+        stack_status = StackStatus(self.servers, count_triples=True)
+        for use_async in {False, stack_status.use_async}:
+            stack_status.use_async = use_async
+            oxigraph = {row.server: row for row in stack_status.collect()}["oxigraph"]
+            self.assertEqual(ServerLifecycleState.UP.value, oxigraph.state)
+            self.assertEqual(503, oxigraph.http_status)
+            self.assertIsNone(oxigraph.triples)
+        # the root of a serving qlever answers 404
+        not_found = requests.Response()
+        not_found.status_code = 404
+        self.assertFalse(self.servers["oxigraph"].endpoint_ready(Response(not_found)))
+        self.assertTrue(self.qlever.endpoint_ready(Response(not_found)))
+
+    def test_count_triples(self):
+        """
+        triple counts are only collected when asked for
+        """
+        rows = {row.server: row for row in StackStatus(self.servers, count_triples=True).collect()}
+        self.assertEqual(42, rows["oxigraph"].triples)
+        self.assertIn("42", StackStatus.as_table(list(rows.values())))
+
+    def test_status_position(self):
+        """
+        the stack status shows up at every position of status in the command sequence
+        """
+        cmd = OmnigraphCmd()
+        cmd.args = cmd.get_arg_parser("test", "test").parse_args([])
+        cmd.servers = self.servers
+        calls = []
+        cmd.run_servers_cmds = lambda cmds: calls.append(cmds) if cmds else None
+        cmd.stack_status = lambda: calls.append("stack")
+        cmd.run_cmd_sequence(["start", "status"])
+        self.assertEqual([["start"], "stack"], calls)
+        calls.clear()
+        cmd.run_cmd_sequence(["status", "stop", "status"])
+        self.assertEqual(["stack", ["stop"], "stack"], calls)
@@ -0,0 +1,91 @@
+"""
+Created on 2026-10-17
+
+test the cached and native triple counts
+
+@author: wf
+"""
+
+import json
+
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from tests.basetest import Basetest
+from tests.fake_sparql_endpoint import FakeSparqlEndpoint
+
+
+class TestTripleCount(Basetest):
+    """
+    test that triple counts come from the native statistics, are cached and
+    are invalidated by updates
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        # GraphDB answers the repository size with 5, queries with 42 and updates with 204
+        size = json.dumps({"total": 5, "explicit": 5, "inferred": 0}).encode()
+        routes = {"/size": (200, "application/json", size), "/statements": (204, "text/plain", b"")}
+        self.fake = FakeSparqlEndpoint(triple_count=42, routes=routes).start()
+        omni_server = OmniServer(env=ServerEnv(), patch_config=self.patch_config)
+        ogp = OmnigraphPaths()
+        servers = omni_server.servers(str(ogp.examples_dir / "servers.yaml"), filter_active=False)
+        self.graphdb = servers["graphdb"]
+        self.size_path = "/rest/repositories/repo1/size"
+
+    def patch_config(self, config):
+        if config.name == "graphdb":
+            config.host = "localhost"
+            config.port = self.fake.server_port
+            config.base_url = None
+            config.auth_password = None
+
+    def tearDown(self):
+        self.graphdb.close_session()
+        self.fake.stop()
+        Basetest.tearDown(self)
+
+    def test_cached_native_count(self):
+        """
+        the repository size is asked once within the ttl and again after an update
+        """
+        self.assertEqual(5, self.graphdb.count_triples())
+        self.assertEqual(5, self.graphdb.count_triples())
+        self.assertEqual([self.size_path], self.fake.paths)
+        _result, error = self.graphdb.execute_update_query("INSERT DATA { <http://e.org/s> <http://e.org/p> 1 }")
+        self.assertIsNone(error)
+        self.assertEqual(5, self.graphdb.count_triples())
+        self.assertEqual(2, self.fake.paths.count(self.size_path))
+        # no caching with a ttl of zero
+        self.graphdb.config.triple_count_ttl = 0
+        self.graphdb.count_triples()
+        self.assertEqual(3, self.fake.paths.count(self.size_path))
+
+    def test_invalidated_while_counting(self):
+        """
+        a count started before an invalidation of a concurrent upload is not cached
+        """
+        get_native_triple_count = self.graphdb.get_native_triple_count
+
+        def racing_count():
+            triple_count = get_native_triple_count()
+            self.graphdb.invalidate_triple_count()
+            return triple_count
+
+        self.graphdb.get_native_triple_count = racing_count
+        self.assertEqual(5, self.graphdb.count_triples())
+        self.assertIsNone(self.graphdb.triple_count_cache)
+        self.graphdb.get_native_triple_count = get_native_triple_count
+        self.graphdb.count_triples()
+        self.graphdb.count_triples()
+        self.assertEqual(2, self.fake.paths.count(self.size_path))
+
+    def test_count_query_fallback(self):
+        """
+        without native statistics the count query is the fallback
+        """
+        self.fake.routes["/size"] = (404, "text/plain", b"")
+        self.graphdb.expect_errors = True
+        self.assertEqual(42, self.graphdb.count_triples())
+        self.assertEqual(self.size_path, self.fake.paths[0])
+        self.assertTrue(any(path.startswith("/repositories/repo1") for path in self.fake.paths[1:]))
@@ -0,0 +1,173 @@
+"""
+Created on 2026-10-17
+
+test streamed uploads
+
+@author: wf
+"""
+
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from requests.auth import HTTPDigestAuth
+
+from omnigraph.dump_compression import DumpCompression
+from omnigraph.ominigraph_paths import OmnigraphPaths
+from omnigraph.omniserver import OmniServer
+from omnigraph.sparql_server import ServerEnv
+from omnigraph.upload_stream import UploadStream
+from tests.basetest import Basetest
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    """
+    records the body and framing of every upload - plain or chunked
+    """
+
+    def read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            size = int(self.rfile.readline().strip(), 16)
+            while size:
+                body += self.rfile.read(size)
+                self.rfile.readline()
+                size = int(self.rfile.readline().strip(), 16)
+            self.rfile.readline()
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        return body
+
+    def challenged(self) -> bool:
+        """
+        answer a digest challenge if the server asks for digest auth and the request has none
+        """
+        challenged = getattr(self.server, "digest", False) and "Authorization" not in self.headers
+        if challenged:
+            self.send_response(401)
+            self.send_header("WWW-Authenticate", 'Digest realm="SPARQL", nonce="4711", qop="auth"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        return challenged
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", None))
+        if not self.challenged():
+            self.send_response(400)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def do_POST(self):
+        body = self.read_body()
+        if hasattr(self.server, "requests"):
+            self.server.requests.append(("POST", body))
+        if not self.challenged():
+            self.server.uploads.append(
+                (self.headers.get("Transfer-Encoding"), self.headers.get("Content-Encoding"), body)
+            )
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestUploadStream(Basetest):
+    """
+    test that dump files are streamed to the upload request
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.ogp = OmnigraphPaths()
+        self.royals = (self.ogp.examples_dir / "royals.ttl").read_bytes()
+
+    def test_upload_stream(self):
+        """
+        the stream yields the decompressed content block by block
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            for compression in (DumpCompression.NONE, DumpCompression.GZ):
+                path = Path(tmp) / f"royals.ttl{compression.suffix}"
+                with compression.open_write(path) as f:
+                    f.write(self.royals)
+                with UploadStream(path) as upload_stream:
+                    upload_stream.block_size = 1024
+                    blocks = list(upload_stream)
+                    expected_len = len(self.royals) if compression == DumpCompression.NONE else None
+                    self.assertEqual(expected_len, upload_stream.len)
+                self.assertEqual(self.royals, b"".join(blocks))
+                self.assertTrue(all(len(block) <= 1024 for block in blocks))
+                with UploadStream(path, content_encoding=compression.content_encoding) as upload_stream:
+                    self.assertEqual(path.stat().st_size, upload_stream.len)
+                self.assertEqual(self.royals, UploadStream.as_bytes(UploadStream(path)))
+
+    def test_load_file_streamed(self):
+        """
+        load_file sends a plain file with Content-Length and a decompressed one chunked
+        """
+        fake = ThreadingHTTPServer(("localhost", 0), UploadHandler)
+        fake.uploads = []
+        threading.Thread(target=fake.serve_forever, daemon=True).start()
+        try:
+            omni_server = OmniServer(env=ServerEnv())
+            servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+            server = servers["oxigraph"]
+            server.config.upload_url = f"http://localhost:{fake.server_port}/store?default"
+            with tempfile.TemporaryDirectory() as tmp:
+                for compression in (DumpCompression.NONE, DumpCompression.GZ):
+                    path = Path(tmp) / f"royals.ttl{compression.suffix}"
+                    with compression.open_write(path) as f:
+                        f.write(self.royals)
+                    self.assertTrue(server.load_file(str(path), show_progress=True))
+                server.config.upload_content_encodings = ["gzip"]
+                self.assertTrue(server.load_file(str(Path(tmp) / "royals.ttl.gz")))
+            plain, decompressed, compressed = fake.uploads
+            self.assertEqual((None, None, self.royals), plain)
+            self.assertEqual(("chunked", None, self.royals), decompressed)
+            self.assertEqual("gzip", compressed[1])
+            self.assertLess(len(compressed[2]), len(self.royals))
+        finally:
+            server.close_session()
+            fake.shutdown()
+            fake.server_close()
+
+    def test_digest_challenge(self):
+        """
+        a streamed upload is rewound and resent after a digest challenge and
+        Virtuoso answers the challenge before sending the stream
+        """
+        fake = ThreadingHTTPServer(("localhost", 0), UploadHandler)
+        fake.uploads = []
+        fake.requests = []
+        fake.digest = True
+        threading.Thread(target=fake.serve_forever, daemon=True).start()
+        upload_url = f"http://localhost:{fake.server_port}/sparql-graph-crud"
+        omni_server = OmniServer(env=ServerEnv())
+        servers = omni_server.servers(str(self.ogp.examples_dir / "servers.yaml"), filter_active=False)
+        server = servers["virtuoso"]
+        server.config.upload_url = upload_url
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                for compression in (DumpCompression.NONE, DumpCompression.GZ):
+                    path = Path(tmp) / f"royals.ttl{compression.suffix}"
+                    with compression.open_write(path) as f:
+                        f.write(self.royals)
+                    # without the pre-authentication the stream is sent twice
+                    with UploadStream(path) as upload_stream:
+                        response = requests.post(upload_url, data=upload_stream, auth=HTTPDigestAuth("dba", "dba"))
+                    self.assertEqual(200, response.status_code)
+                    self.assertEqual([self.royals, self.royals], [body for _method, body in fake.requests])
+                    fake.requests.clear()
+                    self.assertTrue(server.load_file(str(path)))
+                    # the nonce of the first challenge is reused for the second file
+                    self.assertEqual(["POST"], [method for method, _body in fake.requests if method != "HEAD"])
+                    fake.requests.clear()
+            self.assertEqual([self.royals] * 4, [body for _te, _ce, body in fake.uploads])
+        finally:
+            server.close_session()
+            fake.shutdown()
+            fake.server_close()